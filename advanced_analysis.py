@@ -1,16 +1,27 @@
 import pandas as pd
 import numpy as np
-import plotly.express as px
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
-from scipy import stats
+from data_processing import load_validated_data, add_derived_metrics
+from daily_facts import build_daily_facts, fill_business_gaps
+from instrumentation import traced
+from query_backends import get_backend
+from lazy_imports import lazy_import
+from significance_testing import pairwise_campaign_tests
+from time_rollups import calendar_keys, day_of_week, period_starts
+from shapley_attribution import shapley_attribution
 import warnings
 warnings.filterwarnings('ignore')
 
+# Plotly is only needed for charts, so headless callers never pay for importing it
+px = lazy_import('plotly.express')
+go = lazy_import('plotly.graph_objects')
+plotly_subplots = lazy_import('plotly.subplots')
+
 class MarketingAnalyzer:
     """Advanced marketing data analysis class"""
     
-    def __init__(self, business_df=None, marketing_df=None):
+    def __init__(self, business_df=None, marketing_df=None, backend=None, daily_facts=None):
+        self.backend = get_backend(backend)
+        self._daily_facts = daily_facts
         if business_df is None or marketing_df is None:
             self.load_data()
         else:
@@ -21,67 +32,64 @@ class MarketingAnalyzer:
     def load_data(self):
         """Load data from CSV files"""
         try:
-            # Load business data
-            self.business_df = pd.read_csv('Business.csv')
-            
-            # Load marketing data from all platforms
-            facebook_df = pd.read_csv('Facebook.csv')
-            google_df = pd.read_csv('Google.csv')
-            tiktok_df = pd.read_csv('TikTok.csv')
-            
-            # Add platform column and combine
-            facebook_df['platform'] = 'Facebook'
-            google_df['platform'] = 'Google'
-            tiktok_df['platform'] = 'TikTok'
-            
-            self.marketing_df = pd.concat([facebook_df, google_df, tiktok_df], ignore_index=True)
+            self.business_df, self.marketing_df, quarantine_df = load_validated_data()
             
             print("✅ Data loaded successfully!")
             print(f"Business data: {self.business_df.shape[0]} rows")
             print(f"Marketing data: {self.marketing_df.shape[0]} rows")
+            if not quarantine_df.empty:
+                print(f"⚠️  Quarantined {len(quarantine_df)} invalid rows")
             
         except Exception as e:
             print(f"❌ Error loading data: {e}")
             raise
     
+    @traced
     def prepare_data(self):
         """Prepare and clean data for analysis"""
         # Convert dates first
         self.business_df['date'] = pd.to_datetime(self.business_df['date'])
         self.marketing_df['date'] = pd.to_datetime(self.marketing_df['date'])
         
-        # Calculate additional metrics
-        self.marketing_df['ctr'] = (self.marketing_df['clicks'] / self.marketing_df['impression'] * 100).round(2)
-        self.marketing_df['cpc'] = (self.marketing_df['spend'] / self.marketing_df['clicks']).round(2)
-        self.marketing_df['roas'] = (self.marketing_df['attributed revenue'] / self.marketing_df['spend']).round(2)
-        self.marketing_df['cpm'] = (self.marketing_df['spend'] / self.marketing_df['impression'] * 1000).round(2)
+        # Calculate additional marketing and business metrics (NaN rather than inf on zero denominators)
+        add_derived_metrics(self.business_df, self.marketing_df)
         
-        # Business metrics
-        self.business_df['aov'] = (self.business_df['total revenue'] / self.business_df['# of orders']).round(2)
-        self.business_df['conversion_rate'] = (self.business_df['# of new orders'] / self.business_df['# of orders'] * 100).round(2)
-        self.business_df['profit_margin'] = (self.business_df['gross profit'] / self.business_df['total revenue'] * 100).round(2)
-        
-        # Add time-based features
-        self.business_df['month'] = self.business_df['date'].dt.month
-        self.business_df['day_of_week'] = self.business_df['date'].dt.day_name()
-        self.marketing_df['month'] = self.marketing_df['date'].dt.month
-        self.marketing_df['day_of_week'] = self.marketing_df['date'].dt.day_name()
+        # Add time-based features: integer YYYYMM months so years never merge,
+        # weekday names as a categorical rather than a string per row
+        for df in (self.business_df, self.marketing_df):
+            df['month'] = calendar_keys(df['date'], 'month')
+            df['day_of_week'] = day_of_week(df['date'])
+    
+    @property
+    def daily_facts(self):
+        """Daily business x marketing fact table shared by the date-level analyses, built on first use"""
+        if self._daily_facts is None:
+            self._daily_facts = build_daily_facts(self.business_df, self.marketing_df, backend=self.backend)
+        return self._daily_facts
     
+    @traced
     def calculate_attribution_analysis(self):
         """Calculate attribution analysis across platforms"""
-        attribution = self.marketing_df.groupby(['platform', 'tactic']).agg({
+        attribution = self.backend.aggregate(self.marketing_df, ['platform', 'tactic'], {
             'spend': 'sum',
             'attributed revenue': 'sum',
             'clicks': 'sum',
             'impression': 'sum',
             'roas': 'mean'
-        }).reset_index()
+        })
         
         attribution['revenue_share'] = (attribution['attributed revenue'] / attribution['attributed revenue'].sum() * 100).round(2)
         attribution['spend_share'] = (attribution['spend'] / attribution['spend'].sum() * 100).round(2)
         
         return attribution.sort_values('revenue_share', ascending=False)
     
+    @traced
+    def calculate_shapley_attribution(self, channel_col='platform', method='auto'):
+        """Attribute daily business revenue to channels with Shapley values"""
+        facts = self.daily_facts if channel_col == 'platform' else None
+        return shapley_attribution(self.business_df, self.marketing_df, channel_col=channel_col, method=method, facts=facts)
+    
+    @traced
     def calculate_cohort_analysis(self):
         """Perform cohort analysis on customer acquisition"""
         # Group by acquisition month
@@ -96,35 +104,26 @@ class MarketingAnalyzer:
         
         return cohort_data
     
+    @traced
     def calculate_correlation_analysis(self):
         """Calculate correlations between marketing spend and business metrics"""
-        # Merge marketing and business data by date
-        daily_marketing = self.marketing_df.groupby('date').agg({
-            'spend': 'sum',
-            'attributed revenue': 'sum',
-            'clicks': 'sum',
-            'impression': 'sum'
-        }).reset_index()
-        
-        merged_data = pd.merge(
-            self.business_df[['date', 'total revenue', '# of orders', 'new customers', 'gross profit']],
-            daily_marketing,
-            on='date',
-            how='inner'
-        )
+        # Days with both business and marketing data
+        facts = self.daily_facts
+        merged_data = facts[facts['business_observed'] & facts['marketing_observed']]
         
         # Calculate correlations
         correlation_matrix = merged_data[['spend', 'attributed revenue', 'total revenue', '# of orders', 'new customers']].corr()
         
         return correlation_matrix
     
+    @traced
     def calculate_roi_optimization(self):
         """Calculate ROI optimization recommendations"""
-        platform_roi = self.marketing_df.groupby('platform').agg({
+        platform_roi = self.backend.aggregate(self.marketing_df, ['platform'], {
             'spend': 'sum',
             'attributed revenue': 'sum',
             'roas': 'mean'
-        }).reset_index()
+        })
         
         platform_roi['roi'] = ((platform_roi['attributed revenue'] - platform_roi['spend']) / platform_roi['spend'] * 100).round(2)
         platform_roi['efficiency_score'] = (platform_roi['roas'] * platform_roi['attributed revenue']).round(2)
@@ -136,14 +135,15 @@ class MarketingAnalyzer:
         
         return platform_roi.sort_values('roi', ascending=False)
     
+    @traced
     def calculate_seasonality_analysis(self):
         """Analyze seasonal patterns in marketing performance"""
-        monthly_performance = self.marketing_df.groupby('month').agg({
+        monthly_performance = self.backend.aggregate(self.marketing_df, ['month'], {
             'spend': 'sum',
             'attributed revenue': 'sum',
             'roas': 'mean',
             'ctr': 'mean'
-        }).reset_index()
+        })
         
         monthly_business = self.business_df.groupby('month').agg({
             'total revenue': 'sum',
@@ -153,41 +153,36 @@ class MarketingAnalyzer:
         
         return monthly_performance, monthly_business
     
+    @traced
     def calculate_forecasting_data(self):
         """Prepare data for forecasting analysis"""
-        # Create daily aggregated data
-        daily_data = self.business_df.groupby('date').agg({
-            'total revenue': 'sum',
-            '# of orders': 'sum',
-            'new customers': 'sum',
-            'gross profit': 'sum'
-        }).reset_index()
-        
-        daily_marketing = self.marketing_df.groupby('date').agg({
-            'spend': 'sum',
-            'attributed revenue': 'sum',
-            'clicks': 'sum',
-            'impression': 'sum'
-        }).reset_index()
-        
-        # Merge and create time series
-        forecast_data = pd.merge(daily_data, daily_marketing, on='date', how='outer').fillna(0)
+        # Complete daily series: business gaps interpolated, days without marketing at zero spend
+        forecast_data = fill_business_gaps(self.daily_facts)[[
+            'date', 'total revenue', '# of orders', 'new customers', 'gross profit',
+            'spend', 'attributed revenue', 'clicks', 'impression'
+        ]]
         forecast_data['roas'] = (forecast_data['attributed revenue'] / forecast_data['spend']).replace([np.inf, -np.inf], 0)
         
         return forecast_data
     
+    @traced
+    def calculate_campaign_significance(self, method='welch', alpha=0.05):
+        """Test daily ROAS differences between campaigns within each platform & tactic"""
+        return pairwise_campaign_tests(self.marketing_df, method=method, alpha=alpha)
+    
+    @traced
     def generate_insights(self):
         """Generate comprehensive insights and recommendations"""
         insights = []
         
         # ROAS Analysis
         avg_roas = self.marketing_df['roas'].mean()
-        best_platform = self.marketing_df.groupby('platform')['roas'].mean().idxmax()
-        best_tactic = self.marketing_df.groupby('tactic')['roas'].mean().idxmax()
+        best_platform = self.marketing_df.groupby('platform', observed=True)['roas'].mean().idxmax()
+        best_tactic = self.marketing_df.groupby('tactic', observed=True)['roas'].mean().idxmax()
         
         insights.append(f"Average ROAS across all campaigns: {avg_roas:.2f}x")
-        insights.append(f"Best performing platform: {best_platform} with {self.marketing_df.groupby('platform')['roas'].mean().max():.2f}x ROAS")
-        insights.append(f"Best performing tactic: {best_tactic} with {self.marketing_df.groupby('tactic')['roas'].mean().max():.2f}x ROAS")
+        insights.append(f"Best performing platform: {best_platform} with {self.marketing_df.groupby('platform', observed=True)['roas'].mean().max():.2f}x ROAS")
+        insights.append(f"Best performing tactic: {best_tactic} with {self.marketing_df.groupby('tactic', observed=True)['roas'].mean().max():.2f}x ROAS")
         
         # Revenue Analysis
         total_revenue = self.business_df['total revenue'].sum()
@@ -206,6 +201,7 @@ class MarketingAnalyzer:
         
         return insights
     
+    @traced
     def create_advanced_visualizations(self):
         """Create advanced visualization charts"""
         charts = {}
@@ -236,7 +232,9 @@ class MarketingAnalyzer:
         
         # 3. Seasonal Analysis
         monthly_perf, monthly_business = self.calculate_seasonality_analysis()
-        fig_seasonal = make_subplots(
+        monthly_perf = monthly_perf.assign(month=period_starts(monthly_perf['month'], 'month'))
+        monthly_business = monthly_business.assign(month=period_starts(monthly_business['month'], 'month'))
+        fig_seasonal = plotly_subplots.make_subplots(
             rows=2, cols=1,
             subplot_titles=('Monthly Marketing Performance', 'Monthly Business Performance'),
             vertical_spacing=0.1
@@ -266,19 +264,23 @@ class MarketingAnalyzer:
         
         return charts
 
-def run_advanced_analysis(business_df, marketing_df):
+def run_advanced_analysis(business_df, marketing_df, include_charts=True):
     """Run advanced analysis and return results"""
     analyzer = MarketingAnalyzer(business_df, marketing_df)
     
     results = {
         'attribution': analyzer.calculate_attribution_analysis(),
+        'shapley_attribution': analyzer.calculate_shapley_attribution(),
         'cohort': analyzer.calculate_cohort_analysis(),
         'correlation': analyzer.calculate_correlation_analysis(),
         'roi_optimization': analyzer.calculate_roi_optimization(),
         'seasonality': analyzer.calculate_seasonality_analysis(),
         'forecast_data': analyzer.calculate_forecasting_data(),
-        'insights': analyzer.generate_insights(),
-        'charts': analyzer.create_advanced_visualizations()
+        'campaign_significance': analyzer.calculate_campaign_significance(),
+        'insights': analyzer.generate_insights()
     }
     
+    if include_charts:
+        results['charts'] = analyzer.create_advanced_visualizations()
+    
     return results
@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""
+Local JSON API for the dashboard aggregations
+Serves the same KPIs and breakdowns the dashboard shows over plain HTTP using
+only the standard library, so other tools don't have to scrape Streamlit.
+
+Endpoints (all GET, filters: start_date, end_date, platform=<name> repeatable):
+    /api/version              dataset version
+    /api/kpis                 headline KPIs
+    /api/platforms            platform metrics
+    /api/campaigns            campaign analysis
+    /api/tactics              tactic analysis
+    /api/geo                  geographic analysis
+    /api/analysis/<group>     advanced analysis tables (see marketing_intel.ANALYSES)
+
+Responses carry an ETag derived from the dataset version plus the normalized
+query; clients sending If-None-Match get 304 Not Modified, and rendered bodies
+are cached server-side.
+"""
+
+import argparse
+import hashlib
+import json
+import math
+import threading
+from collections import OrderedDict
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+import pandas as pd
+
+from data_processing import (
+    prepare_data,
+    dataset_version,
+    filter_data,
+    calculate_kpis,
+    calculate_platform_metrics,
+    create_campaign_analysis,
+    create_tactic_analysis,
+    create_geographic_analysis,
+)
+from lazy_imports import lazy_import
+
+marketing_intel = lazy_import('marketing_intel')
+advanced_analysis = lazy_import('advanced_analysis')
+
+DEFAULT_CACHE_SIZE = 256
+
+TABLE_ENDPOINTS = {
+    'platforms': calculate_platform_metrics,
+    'campaigns': create_campaign_analysis,
+    'tactics': create_tactic_analysis,
+    'geo': create_geographic_analysis,
+}
+
+
+class NotFound(Exception):
+    pass
+
+
+class BadRequest(Exception):
+    pass
+
+
+def _frame_records(frame):
+    frame = marketing_intel.to_serializable(frame)
+    return json.loads(frame.to_json(orient='records', date_format='iso'))
+
+
+def _json_default(value):
+    if hasattr(value, 'item'):
+        return _finite(value.item())
+    return str(value)
+
+
+def _finite(value):
+    """``value`` with NaN and infinite floats replaced by None, since JSON has no literal for them"""
+    if isinstance(value, dict):
+        return {key: _finite(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_finite(item) for item in value]
+    if isinstance(value, (float, np.floating)) and not math.isfinite(value):
+        return None
+    return value
+
+
+class AggregationService:
+    """Loads data per dataset version and renders endpoint responses with an LRU cache"""
+
+    def __init__(self, data_dir='.', cache_size=DEFAULT_CACHE_SIZE):
+        self.data_dir = data_dir
+        self.cache_size = cache_size
+        self._lock = threading.Lock()
+        self._version = None
+        self._data = None
+        self._responses = OrderedDict()
+
+    def current_data(self):
+        """Return (version, business_df, marketing_df), reloading when the source files change"""
+        version = dataset_version(self.data_dir)
+        with self._lock:
+            if version != self._version:
+                self._data = prepare_data(self.data_dir)
+                self._version = version
+                self._responses.clear()
+            return self._version, *self._data
+
+    @staticmethod
+    def normalize_query(query):
+        """Canonical filter parameters so equivalent URLs share an ETag"""
+        filters = {}
+        if query.get('start_date') or query.get('end_date'):
+            try:
+                start = query.get('start_date', [None])[0]
+                end = query.get('end_date', [None])[0]
+                filters['start_date'] = pd.Timestamp(start).date().isoformat() if start else None
+                filters['end_date'] = pd.Timestamp(end).date().isoformat() if end else None
+            except ValueError as e:
+                raise BadRequest(f"Invalid date: {e}")
+        if query.get('platform'):
+            filters['platform'] = sorted(set(query['platform']))
+        return filters
+
+    @staticmethod
+    def etag(version, path, filters):
+        digest = hashlib.sha256(json.dumps([version, path, filters], sort_keys=True).encode())
+        return f'"{digest.hexdigest()[:32]}"'
+
+    def respond(self, path, query, if_none_match=()):
+        """Return (etag, body bytes), or (etag, None) when the client's copy is current"""
+        filters = self.normalize_query(query)
+        version, business_df, marketing_df = self.current_data()
+        etag = self.etag(version, path, filters)
+        if etag in if_none_match:
+            return etag, None
+
+        with self._lock:
+            body = self._responses.get(etag)
+            if body is not None:
+                self._responses.move_to_end(etag)
+                return etag, body
+
+        payload = {
+            'dataset_version': version,
+            'filters': filters,
+            'data': self._render(path, filters, business_df, marketing_df),
+        }
+        # Ratios over an empty selection (e.g. ROAS with zero spend) are NaN or infinite
+        body = json.dumps(_finite(payload), default=_json_default, allow_nan=False).encode()
+
+        with self._lock:
+            self._responses[etag] = body
+            while len(self._responses) > self.cache_size:
+                self._responses.popitem(last=False)
+        return etag, body
+
+    def _render(self, path, filters, business_df, marketing_df):
+        parts = [part for part in path.split('/') if part]
+        if len(parts) < 2 or parts[0] != 'api':
+            raise NotFound(path)
+        endpoint = parts[1]
+
+        if endpoint == 'version' and len(parts) == 2:
+            return {'dataset_version': self._version}
+
+        start = filters.get('start_date') or business_df['date'].min()
+        end = filters.get('end_date') or business_df['date'].max()
+        business_df, marketing_df = filter_data(
+            business_df, marketing_df, start, end, filters.get('platform')
+        )
+
+        if endpoint == 'kpis' and len(parts) == 2:
+            return calculate_kpis(business_df, marketing_df)
+        if endpoint in TABLE_ENDPOINTS and len(parts) == 2:
+            return _frame_records(TABLE_ENDPOINTS[endpoint](marketing_df))
+        if endpoint == 'analysis' and len(parts) == 3 and parts[2] in marketing_intel.ANALYSES:
+            analyzer = advanced_analysis.MarketingAnalyzer(business_df.copy(), marketing_df.copy())
+            tables = marketing_intel.ANALYSES[parts[2]](business_df, marketing_df, analyzer)
+            return {name: _frame_records(frame) for name, frame in tables.items()}
+
+        raise NotFound(path)
+
+
+def make_handler(service):
+    """Bind a request handler class to ``service``"""
+
+    class AggregationRequestHandler(BaseHTTPRequestHandler):
+        server_version = 'MarketingIntelAPI/1.0'
+
+        def do_GET(self):
+            url = urlsplit(self.path)
+            if_none_match = [tag.strip() for tag in self.headers.get('If-None-Match', '').split(',')]
+            try:
+                etag, body = service.respond(url.path, parse_qs(url.query), if_none_match)
+            except NotFound:
+                return self._send_error(HTTPStatus.NOT_FOUND, f"Unknown endpoint: {url.path}")
+            except BadRequest as e:
+                return self._send_error(HTTPStatus.BAD_REQUEST, str(e))
+            except Exception as e:
+                self.log_error("Error rendering %s: %r", url.path, e)
+                return self._send_error(HTTPStatus.INTERNAL_SERVER_ERROR, f"Internal error: {e}")
+
+            if body is None:
+                self.send_response(HTTPStatus.NOT_MODIFIED)
+                self.send_header('ETag', etag)
+                self.end_headers()
+                return
+
+            self.send_response(HTTPStatus.OK)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.send_header('ETag', etag)
+            self.send_header('Cache-Control', 'no-cache')
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _send_error(self, status, message):
+            body = json.dumps({'error': message}).encode()
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            if not self.server.quiet:
+                super().log_message(format, *args)
+
+    return AggregationRequestHandler
+
+
+def create_server(host='localhost', port=8600, data_dir='.', cache_size=DEFAULT_CACHE_SIZE, quiet=False):
+    """Build (but don't start) a threaded HTTP server for the aggregation API"""
+    service = AggregationService(data_dir, cache_size)
+    server = ThreadingHTTPServer((host, port), make_handler(service))
+    server.quiet = quiet
+    server.service = service
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve dashboard aggregations as JSON")
+    parser.add_argument("--host", default="localhost", help="Host to bind")
+    parser.add_argument("--port", type=int, default=8600, help="Port to listen on")
+    parser.add_argument("--data-dir", default=".", help="Directory containing the source CSV files")
+    parser.add_argument("--cache-size", type=int, default=DEFAULT_CACHE_SIZE, help="Cached responses to keep")
+    args = parser.parse_args()
+
+    server = create_server(args.host, args.port, args.data_dir, args.cache_size)
+    print(f"Marketing Intelligence API available at: http://{args.host}:{args.port}/api/kpis")
+    print("Press Ctrl+C to stop the server")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nAPI server stopped by user")
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
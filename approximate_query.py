@@ -0,0 +1,131 @@
+"""
+Stratified sample of the marketing rows for progressive, approximate queries
+At load, about SAMPLE_ROWS marketing rows are drawn at random within each
+platform x date stratum, in proportion to its size but at least
+MIN_STRATUM_ROWS, so every day of every platform is represented. Each
+sampled row carries its stratum's population (N) and sample size (n), so a
+total over any filtered subset is estimated by expanding the sample, with
+the stratified-sampling variance as its confidence margin:
+
+    total = sum over strata of N / n * sum(y)
+    var   = sum over strata of N^2 * (1 - n / N) * s^2 / n
+
+Rows outside the filter count as zeros in their stratum (domain estimation),
+so one sample serves every filter combination. Ratios such as ROAS use the
+linearised ratio estimator. The sample keeps the marketing frame's row
+labels, so the bitmap index selects from it like from the full frame.
+
+The dashboard renders these estimates first while the exact aggregation runs
+on a background worker (submit_exact), then swaps in the exact results.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from instrumentation import traced
+
+SAMPLE_ROWS = 50_000
+MIN_STRATUM_ROWS = 2
+STRATA = ['platform', 'date']
+SAMPLE_MEASURES = ['spend', 'attributed revenue', 'clicks', 'impression']
+# Ratio of estimated totals -> (numerator, denominator, scale)
+SAMPLE_RATIOS = {'roas': ('attributed revenue', 'spend', 1), 'ctr': ('clicks', 'impression', 100)}
+# Two-sided 95% normal quantile
+CONFIDENCE_Z = 1.96
+EXACT_WORKERS = 2
+
+_executor = ThreadPoolExecutor(max_workers=EXACT_WORKERS, thread_name_prefix='exact-query')
+
+
+@traced
+def stratified_sample(marketing_df, sample_rows=SAMPLE_ROWS, seed=0):
+    """Random rows of every platform x date stratum plus their stratum, stratum_rows (N) and stratum_sample (n)"""
+    strata = marketing_df.groupby(STRATA, observed=True, sort=False, dropna=False).ngroup().to_numpy()
+    population = np.bincount(strata)
+    fraction = min(1.0, sample_rows / max(len(marketing_df), 1))
+    sample_sizes = np.minimum(population, np.maximum(np.rint(population * fraction), MIN_STRATUM_ROWS)).astype(np.int64)
+
+    # Rank each row within its stratum in random order; the first n of each stratum are sampled
+    order = np.lexsort((np.random.default_rng(seed).random(len(strata)), strata))
+    starts = np.r_[0, np.cumsum(population)[:-1]]
+    rank = np.empty(len(strata), dtype=np.int64)
+    rank[order] = np.arange(len(strata)) - starts[strata[order]]
+    keep = rank < sample_sizes[strata]
+
+    sample = marketing_df[keep].copy()
+    sample['stratum'] = strata[keep]
+    sample['stratum_rows'] = population[strata[keep]]
+    sample['stratum_sample'] = sample_sizes[strata[keep]]
+    return sample
+
+
+def _group_codes(sample, by):
+    """Each row's ``by`` group code and a frame of the groups' values, in sorted order"""
+    if not by:
+        return np.zeros(len(sample), dtype=np.int64), pd.DataFrame(index=[0])
+    factorized = [pd.factorize(sample[column], sort=True, use_na_sentinel=False) for column in by]
+    shape = [max(len(uniques), 1) for _, uniques in factorized]
+    keys, codes = np.unique(np.ravel_multi_index([codes for codes, _ in factorized], shape), return_inverse=True)
+    positions = np.unravel_index(keys, shape)
+    groups = pd.DataFrame({
+        column: uniques.take(position) for column, (_, uniques), position in zip(by, factorized, positions)
+    })
+    return codes.reshape(-1), groups
+
+
+@traced
+def estimate(sample, by=None, measures=SAMPLE_MEASURES, ratios=SAMPLE_RATIOS, z=CONFIDENCE_Z):
+    """Estimated totals of ``measures`` and ``ratios``, each with a ``<name>_margin`` at confidence ``z``, overall or per ``by``"""
+    group_codes, result = _group_codes(sample, list(by or []))
+    # Cells are (group, stratum) pairs; every sum below is a bincount over cells or groups
+    stratum = sample['stratum'].to_numpy()
+    n_strata = int(stratum.max()) + 1 if len(stratum) else 1
+    cell_keys, first, cells = np.unique(group_codes * n_strata + stratum, return_index=True, return_inverse=True)
+    cells = cells.reshape(-1)
+    cell_groups = cell_keys // n_strata
+    population = sample['stratum_rows'].to_numpy(float)[first]
+    sampled = sample['stratum_sample'].to_numpy(float)[first]
+    # Variance of a stratum total per unit of the stratum's sum of squared deviations
+    variance_factor = np.where(
+        sampled > 1, population ** 2 * (1 - sampled / population) / (sampled * np.maximum(sampled - 1, 1)), 0
+    )
+
+    def cell_sum(values):
+        return np.bincount(cells, values, minlength=len(cell_keys))
+
+    def group_sum(values):
+        return np.bincount(cell_groups, values, minlength=len(result))
+
+    def margin(total, squares):
+        return z * np.sqrt(group_sum(variance_factor * np.maximum(squares - total ** 2 / sampled, 0)))
+
+    values = {measure: sample[measure].to_numpy(float) for measure in measures}
+    sums = {measure: cell_sum(values[measure]) for measure in measures}
+    squares = {measure: cell_sum(values[measure] ** 2) for measure in measures}
+    totals = {}
+    for measure in measures:
+        totals[measure] = group_sum(population / sampled * sums[measure])
+        result[measure] = totals[measure]
+        result[f'{measure}_margin'] = margin(sums[measure], squares[measure])
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for name, (numerator, denominator, scale) in ratios.items():
+            ratio = totals[numerator] / totals[denominator]
+            # Linearised ratio variance: the variance of the residual total y - R x, over X^2
+            cell_ratio = ratio[cell_groups]
+            residual = sums[numerator] - cell_ratio * sums[denominator]
+            residual_squares = (
+                squares[numerator] - 2 * cell_ratio * cell_sum(values[numerator] * values[denominator])
+                + cell_ratio ** 2 * squares[denominator]
+            )
+            result[name] = ratio * scale
+            result[f'{name}_margin'] = margin(residual, residual_squares) / totals[denominator] * scale
+
+    return result.reset_index(drop=True)
+
+
+def submit_exact(compute, *args):
+    """Run the exact aggregation on a background thread; returns a Future"""
+    return _executor.submit(compute, *args)
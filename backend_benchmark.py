@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Query backend crossover benchmark
+Times the dashboard and analyzer aggregations on each installed query backend
+at increasing synthetic data sizes, both over in-memory frames ("memory") and
+directly over a Parquet file ("scan"), checks every result against pandas and
+reports the smallest size at which each backend beats pandas.
+
+    python backend_benchmark.py --scales 1e4 1e5 1e6 1e7 --output bench/backends.json
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from advanced_analysis import MarketingAnalyzer
+from data_processing import (
+    prepare_data,
+    calculate_platform_metrics,
+    create_campaign_analysis,
+    create_tactic_analysis,
+    create_geographic_analysis,
+)
+from query_backends import ScanSource, available_backends, get_backend
+from synthetic_data import SyntheticDataset
+
+DEFAULT_SCALES = [1e4, 1e5, 1e6, 5e6]
+MODES = ['memory', 'scan']
+
+
+def queries(mode):
+    """(name, callable taking (data, analyzer, backend)) for the backend-routed aggregations"""
+    steps = [
+        ('calculate_platform_metrics', lambda data, a, backend: calculate_platform_metrics(data, backend)),
+        ('create_campaign_analysis', lambda data, a, backend: create_campaign_analysis(data, backend)),
+        ('create_tactic_analysis', lambda data, a, backend: create_tactic_analysis(data, backend)),
+        ('create_geographic_analysis', lambda data, a, backend: create_geographic_analysis(data, backend)),
+    ]
+    if mode == 'memory':
+        # The analyzer works on its own prepared in-memory frames
+        steps += [
+            ('calculate_attribution_analysis', lambda data, a, backend: a.calculate_attribution_analysis()),
+            ('calculate_roi_optimization', lambda data, a, backend: a.calculate_roi_optimization()),
+            ('calculate_seasonality_analysis', lambda data, a, backend: a.calculate_seasonality_analysis()[0]),
+            ('calculate_forecasting_data', lambda data, a, backend: a.calculate_forecasting_data()),
+        ]
+    return steps
+
+
+def best_of(func, repeat):
+    """(result, fastest wall time) over ``repeat`` calls"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - start)
+    return result, min(timings)
+
+
+def benchmark_scale(n_rows, backends, n_states=50, n_days=120, seed=42, repeat=3):
+    """Time every query on every backend and mode for one synthetic dataset"""
+    dataset = SyntheticDataset(n_rows, n_states=n_states, n_days=n_days, seed=seed)
+    results = {'rows': dataset.rows_per_platform * 3, 'modes': {}}
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        dataset.write_csv(data_dir)
+        business_df, marketing_df = prepare_data(data_dir)
+        parquet_path = Path(data_dir) / 'marketing.parquet'
+        marketing_df.to_parquet(parquet_path, index=False)
+        sources = {'memory': marketing_df, 'scan': ScanSource([parquet_path])}
+
+        for mode in MODES:
+            reference = {}
+            mode_results = results['modes'][mode] = {}
+            for backend in backends:
+                analyzer = MarketingAnalyzer(business_df.copy(), marketing_df.copy(), backend=backend)
+                timings, mismatches = {}, []
+                for name, query in queries(mode):
+                    result, seconds = best_of(lambda: query(sources[mode], analyzer, backend), repeat)
+                    timings[name] = seconds
+                    if backend == 'pandas':
+                        reference[name] = result
+                    elif not _same_result(reference[name], result):
+                        mismatches.append(name)
+                mode_results[backend] = {
+                    'seconds': timings,
+                    'total_seconds': sum(timings.values()),
+                    'mismatches': mismatches,
+                }
+    return results
+
+
+def _same_result(expected, actual):
+    try:
+        pd.testing.assert_frame_equal(expected, actual, rtol=1e-9)
+        return True
+    except AssertionError:
+        return False
+
+
+def find_crossovers(results):
+    """Smallest row count per (mode, backend) at which the backend's total time beats pandas"""
+    crossovers = {}
+    for mode in MODES:
+        for scale in sorted(results['scales'].values(), key=lambda scale: scale['rows']):
+            for backend, timing in scale['modes'][mode].items():
+                key = f"{mode}/{backend}"
+                if backend == 'pandas' or key in crossovers:
+                    continue
+                if timing['total_seconds'] < scale['modes'][mode]['pandas']['total_seconds']:
+                    crossovers[key] = scale['rows']
+        for backend in results['backends']:
+            if backend != 'pandas':
+                crossovers.setdefault(f"{mode}/{backend}", None)
+    return crossovers
+
+
+def run_benchmark(scales=DEFAULT_SCALES, backends=None, n_states=50, n_days=120, seed=42, repeat=3):
+    backends = backends or available_backends()
+    if 'pandas' not in backends:
+        backends = ['pandas'] + list(backends)
+    for backend in backends:
+        get_backend(backend)  # fail early on missing optional packages
+
+    results = {
+        'timestamp': pd.Timestamp.now(tz='UTC').isoformat(),
+        'cpu_count': os.cpu_count(),
+        'backends': backends,
+        'scales': {},
+    }
+    # Untimed warm-up so imports and engine start-up don't land on the first scale
+    benchmark_scale(1500, backends, n_states=2, n_days=n_days, seed=seed, repeat=1)
+
+    for n_rows in scales:
+        print(f"🧪 Benchmarking {int(n_rows):,} rows...")
+        results['scales'][str(int(n_rows))] = benchmark_scale(n_rows, backends, n_states, n_days, seed, repeat)
+    results['crossovers'] = find_crossovers(results)
+    return results
+
+
+def print_results(results):
+    for mode in MODES:
+        print(f"\n📊 {mode}: total seconds over {len(queries(mode))} aggregations")
+        print(f"   {'rows':>12} " + ''.join(f"{backend:>10}" for backend in results['backends']))
+        for scale in results['scales'].values():
+            timings = scale['modes'][mode]
+            print(f"   {scale['rows']:>12,} " + ''.join(
+                f"{timings[backend]['total_seconds']:>9.3f}{'!' if timings[backend]['mismatches'] else ' '}"
+                for backend in results['backends']
+            ))
+
+    print("\n🔀 Crossover (smallest size where the backend beats pandas):")
+    for key, rows in results['crossovers'].items():
+        print(f"   {key:<16} {f'{rows:,} rows' if rows else 'not reached'}")
+
+    mismatched = [
+        (scale['rows'], mode, backend)
+        for scale in results['scales'].values()
+        for mode, timings in scale['modes'].items()
+        for backend, timing in timings.items() if timing['mismatches']
+    ]
+    for rows, mode, backend in mismatched:
+        print(f"⚠️  {backend} ({mode}) differs from pandas at {rows:,} rows")
+    return not mismatched
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Find where DuckDB/Polars aggregations overtake pandas")
+    parser.add_argument("--scales", nargs='+', type=float, default=DEFAULT_SCALES, help="Marketing row counts")
+    parser.add_argument("--backends", nargs='+', help="Backends to compare (default: all installed)")
+    parser.add_argument("--states", type=int, default=50, help="Number of distinct states")
+    parser.add_argument("--days", type=int, default=120, help="Number of days")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per query (best is kept)")
+    parser.add_argument("--output", help="Write results to this JSON file")
+    args = parser.parse_args()
+
+    results = run_benchmark(args.scales, args.backends, args.states, args.days, args.seed, args.repeat)
+    consistent = print_results(results)
+
+    if args.output:
+        Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults saved to {args.output}")
+
+    if not consistent:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for the data pipelines
+Generates deterministic synthetic datasets at increasing scales and records wall
+time and peak Python memory for data loading, the dashboard filter path, every
+create_* aggregation/chart builder and each MarketingAnalyzer.calculate_* method.
+Results are saved as JSON so runs from different commits can be compared.
+
+    python benchmark_suite.py --scales 1e3 1e4 1e5 1e6 --output bench/head.json
+    python benchmark_suite.py --scales 1e5 --compare bench/head.json
+"""
+
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from data_processing import (
+    prepare_data,
+    filter_data,
+    calculate_kpis,
+    calculate_platform_metrics,
+    create_campaign_analysis,
+    create_tactic_analysis,
+    create_geographic_analysis,
+)
+from approximate_query import estimate, stratified_sample
+from lazy_imports import lazy_import
+from synthetic_data import SyntheticDataset
+from time_rollups import build_rollups, select_rollup, source_rollups
+
+advanced_analysis = lazy_import('advanced_analysis')
+marketing_dashboard = lazy_import('marketing_dashboard')
+
+DEFAULT_SCALES = [1e3, 1e4, 1e5, 1e6]
+# Pairwise tests grow quadratically with campaigns, so cap them separately
+SIGNIFICANCE_MAX_ROWS = 1e6
+
+
+def measure(func, *args, track_memory=True):
+    """Return (result, seconds, peak_bytes) for one call"""
+    start = time.perf_counter()
+    result = func(*args)
+    seconds = time.perf_counter() - start
+
+    peak_bytes = None
+    if track_memory:
+        tracemalloc.start()
+        func(*args)
+        _, peak_bytes = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    return result, seconds, peak_bytes
+
+
+def dashboard_filter(business_df, marketing_df):
+    """The filter path in main(): middle half of the date range, two platforms"""
+    dates = business_df['date'].sort_values()
+    start_date = dates.iloc[len(dates) // 4]
+    end_date = dates.iloc[3 * len(dates) // 4]
+    return filter_data(business_df, marketing_df, start_date, end_date, ['Facebook', 'Google'])
+
+
+def pipeline_steps(n_rows):
+    """(name, callable taking (business_df, marketing_df, analyzer)) in run order"""
+    steps = [
+        ('filter', lambda b, m, a: dashboard_filter(b, m)),
+        ('calculate_kpis', lambda b, m, a: calculate_kpis(b, m)),
+        ('calculate_platform_metrics', lambda b, m, a: calculate_platform_metrics(m)),
+        ('create_campaign_analysis', lambda b, m, a: create_campaign_analysis(m)),
+        ('create_tactic_analysis', lambda b, m, a: create_tactic_analysis(m)),
+        ('create_geographic_analysis', lambda b, m, a: create_geographic_analysis(m)),
+        ('build_rollups', lambda b, m, a: build_rollups(b, m)),
+        ('stratified_sample', lambda b, m, a: stratified_sample(m)),
+        ('estimate', lambda b, m, a: estimate(stratified_sample(m), ['platform'])),
+        ('create_revenue_trend_chart', lambda b, m, a: marketing_dashboard.create_revenue_trend_chart(
+            select_rollup(source_rollups('business', b), 'business', 'day'))),
+        ('create_marketing_performance_chart', lambda b, m, a: marketing_dashboard.create_marketing_performance_chart(m)),
+        ('MarketingAnalyzer.__init__', lambda b, m, a: advanced_analysis.MarketingAnalyzer(b.copy(), m.copy())),
+        ('calculate_attribution_analysis', lambda b, m, a: a.calculate_attribution_analysis()),
+        ('calculate_shapley_attribution', lambda b, m, a: a.calculate_shapley_attribution()),
+        ('calculate_cohort_analysis', lambda b, m, a: a.calculate_cohort_analysis()),
+        ('calculate_correlation_analysis', lambda b, m, a: a.calculate_correlation_analysis()),
+        ('calculate_roi_optimization', lambda b, m, a: a.calculate_roi_optimization()),
+        ('calculate_seasonality_analysis', lambda b, m, a: a.calculate_seasonality_analysis()),
+        ('calculate_forecasting_data', lambda b, m, a: a.calculate_forecasting_data()),
+    ]
+    if n_rows <= SIGNIFICANCE_MAX_ROWS:
+        steps.append(('calculate_campaign_significance', lambda b, m, a: a.calculate_campaign_significance()))
+    return steps
+
+
+def benchmark_scale(n_rows, n_campaigns=None, n_states=2, n_days=120, seed=42, track_memory=True):
+    """Generate one synthetic dataset and benchmark every pipeline step on it"""
+    dataset = SyntheticDataset(n_rows, n_campaigns, n_states, n_days, seed=seed)
+    results = {
+        'rows': dataset.rows_per_platform * 3,
+        'campaigns': dataset.campaigns_per_platform * 3,
+        'states': n_states,
+        'days': n_days,
+        'steps': {},
+    }
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        dataset.write_csv(data_dir)
+        (business_df, marketing_df), seconds, peak = measure(prepare_data, data_dir, track_memory=track_memory)
+        results['steps']['load_data'] = {'seconds': seconds, 'peak_bytes': peak}
+
+    analyzer = advanced_analysis.MarketingAnalyzer(business_df.copy(), marketing_df.copy())
+    for name, step in pipeline_steps(n_rows):
+        _, seconds, peak = measure(step, business_df, marketing_df, analyzer, track_memory=track_memory)
+        results['steps'][name] = {'seconds': seconds, 'peak_bytes': peak}
+
+    return results
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_suite(scales=DEFAULT_SCALES, n_campaigns=None, n_states=2, n_days=120, seed=42, track_memory=True):
+    results = {
+        'commit': _git_commit(),
+        'timestamp': pd.Timestamp.now(tz='UTC').isoformat(),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'numpy': np.__version__,
+        'seed': seed,
+        'scales': {},
+    }
+    # Untimed warm-up so lazy imports (Plotly, SciPy, Streamlit) don't land on the first scale
+    benchmark_scale(1500, 12, n_states=n_states, n_days=n_days, seed=seed, track_memory=False)
+
+    for n_rows in scales:
+        print(f"🧪 Benchmarking {int(n_rows):,} rows...")
+        results['scales'][str(int(n_rows))] = benchmark_scale(
+            n_rows, n_campaigns, n_states, n_days, seed, track_memory
+        )
+    return results
+
+
+def compare_results(current, baseline, threshold=1.2):
+    """Print per-step time ratios against a baseline run and return the regressions"""
+    regressions = []
+    for scale, scale_results in current['scales'].items():
+        baseline_steps = baseline.get('scales', {}).get(scale, {}).get('steps', {})
+        for name, step in scale_results['steps'].items():
+            if name not in baseline_steps or not baseline_steps[name]['seconds']:
+                continue
+            ratio = step['seconds'] / baseline_steps[name]['seconds']
+            flag = '⚠️ ' if ratio > threshold else '  '
+            print(f"{flag}{scale:>10} {name:<40} {ratio:5.2f}x")
+            if ratio > threshold:
+                regressions.append((scale, name, ratio))
+    return regressions
+
+
+def print_results(results):
+    for scale, scale_results in results['scales'].items():
+        print(f"\n📊 {int(scale):,} rows, {scale_results['campaigns']:,} campaigns")
+        for name, step in scale_results['steps'].items():
+            peak = f"{step['peak_bytes'] / 1e6:9.1f} MB" if step['peak_bytes'] is not None else ''
+            print(f"   {name:<40} {step['seconds']:8.4f}s {peak}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark data pipelines on synthetic data")
+    parser.add_argument("--scales", nargs='+', type=float, default=DEFAULT_SCALES, help="Marketing row counts")
+    parser.add_argument("--campaigns", type=int, help="Total campaigns across platforms")
+    parser.add_argument("--states", type=int, default=2, help="Number of distinct states")
+    parser.add_argument("--days", type=int, default=120, help="Number of days")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed")
+    parser.add_argument("--no-memory", action="store_true", help="Skip peak memory measurement")
+    parser.add_argument("--output", help="Write results to this JSON file")
+    parser.add_argument("--compare", help="Baseline results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=1.2, help="Slowdown ratio reported as a regression")
+    args = parser.parse_args()
+
+    results = run_suite(args.scales, args.campaigns, args.states, args.days, args.seed, not args.no_memory)
+    print_results(results)
+
+    if args.output:
+        Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults saved to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        print(f"\n🔍 Compared with {baseline.get('commit') or args.compare}")
+        regressions = compare_results(results, baseline, args.threshold)
+        if regressions:
+            print(f"⚠️  {len(regressions)} steps slower than {args.threshold:.1f}x baseline")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
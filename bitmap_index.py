@@ -0,0 +1,157 @@
+"""
+Bitmap indexes over the marketing dimensions
+For every value of the indexed columns the index keeps the set of rows
+holding it, built once at load. A filter selection is then bitwise
+arithmetic instead of a chain of ``isin`` masks over the whole frame:
+values selected within a column are OR-ed, columns are AND-ed.
+
+Like roaring bitmaps, each value's row set uses whichever container is
+smaller:
+
+- dense: a packed bitset, one bit per row in 64-bit words, for values
+  covering at least 1 row in 32 (so at most 32 dense values per column)
+- sparse: the sorted row numbers as uint32
+
+OR-ing thousands of sparse values touches only their rows, not a full
+bitset each. Row numbers are the marketing frame's row labels, which the
+memory governor keeps when it spills and reloads partitions, so a
+selection lines up with any date slice of the frame.
+"""
+
+import numpy as np
+import pandas as pd
+
+from instrumentation import traced
+
+BITMAP_COLUMNS = ['platform', 'tactic', 'state', 'campaign', 'campaign_type', 'tactic_mismatch']
+BITMAP_FRAMES = ['bitmap_values', 'bitmap_words', 'bitmap_rows']
+WORD_BITS = 64
+# A value is stored sparse when its row numbers (32 bits each) take less space than a bitset
+SPARSE_BITS_PER_ROW = 32
+
+
+def _pack(mask, n_words):
+    """Boolean row mask as little-endian 64-bit words (bit i of word w is row 64 * w + i)"""
+    packed = np.packbits(mask, bitorder='little')
+    words = np.zeros(n_words * 8, dtype=np.uint8)
+    words[:len(packed)] = packed
+    return words.view('<u8')
+
+
+def _unpack(words):
+    """Boolean mask of length 64 * len(words) from packed words"""
+    return np.unpackbits(words.astype('<u8').view(np.uint8), bitorder='little').view(bool)
+
+
+class BitmapIndex:
+    """Per-value dense bitsets or sparse row lists for BITMAP_COLUMNS, combined with bitwise AND/OR"""
+
+    def __init__(self, values, words, rows):
+        self.values = values  # column, value, count, dense, start, stop (into words or rows), n_words
+        self.words = words    # word: packed bitsets of the dense values, n_words each
+        self.rows = rows      # row: row numbers of the sparse values
+        self.n_words = int(values['n_words'].iloc[0]) if len(values) else 0
+        self._words = words['word'].to_numpy()
+        self._rows = rows['row'].to_numpy()
+        self._lookup = {
+            (column, value): (dense, start, stop)
+            for column, value, dense, start, stop in values[['column', 'value', 'dense', 'start', 'stop']].itertuples(index=False)
+        }
+
+    @classmethod
+    def from_frames(cls, frames):
+        return cls(*(frames[name] for name in BITMAP_FRAMES))
+
+    @property
+    def frames(self):
+        """{name: frame} for storing the index in the memory governor"""
+        return dict(zip(BITMAP_FRAMES, [self.values, self.words, self.rows]))
+
+    @classmethod
+    @traced(name='BitmapIndex.build')
+    def build(cls, marketing_df, columns=BITMAP_COLUMNS):
+        """Index every value of ``columns`` by the frame's row labels (a RangeIndex at load)"""
+        labels = marketing_df.index.to_numpy().astype(np.int64)
+        n_words = -(-(int(labels.max()) + 1 if len(labels) else 0) // WORD_BITS)
+        values, words, rows = [], [], []
+        word_offset = row_offset = 0
+
+        for column in columns:
+            categorical = pd.Categorical(marketing_df[column])
+            codes = categorical.codes
+            counts = np.bincount(codes[codes >= 0], minlength=len(categorical.categories))
+            # Labels grouped by value (ascending within each value) for the sparse containers
+            order = np.argsort(codes, kind='stable')
+            bounds = np.r_[0, np.cumsum(counts)] + (codes < 0).sum()
+
+            for code, (value, count) in enumerate(zip(categorical.categories, counts)):
+                dense = count * SPARSE_BITS_PER_ROW >= n_words * WORD_BITS
+                if dense:
+                    mask = np.zeros(n_words * WORD_BITS, dtype=bool)
+                    mask[labels[codes == code]] = True
+                    words.append(_pack(mask, n_words))
+                    start, word_offset = word_offset, word_offset + n_words
+                    stop = word_offset
+                else:
+                    rows.append(np.sort(labels[order[bounds[code]:bounds[code + 1]]]).astype(np.uint32))
+                    start, row_offset = row_offset, row_offset + int(count)
+                    stop = row_offset
+                values.append((column, value, int(count), dense, start, stop))
+
+        values = pd.DataFrame(values, columns=['column', 'value', 'count', 'dense', 'start', 'stop'])
+        values['n_words'] = n_words
+        return cls(
+            values,
+            pd.DataFrame({'word': np.concatenate(words) if words else np.zeros(0, dtype='<u8')}),
+            pd.DataFrame({'row': np.concatenate(rows) if rows else np.zeros(0, dtype=np.uint32)}),
+        )
+
+    def column_values(self, column):
+        """Indexed values of ``column``, in category order"""
+        return self.values.loc[self.values['column'] == column, 'value'].tolist()
+
+    def select(self, column, values):
+        """Packed words of the rows whose ``column`` is any of ``values`` (OR); unknown values match nothing"""
+        result = np.zeros(self.n_words, dtype='<u8')
+        sparse = []
+        for value in values:
+            entry = self._lookup.get((column, value))
+            if entry is None:
+                continue
+            dense, start, stop = entry
+            if dense:
+                result |= self._words[start:stop]
+            else:
+                sparse.append(self._rows[start:stop])
+        if sparse:
+            rows = np.concatenate(sparse)
+            if len(rows) < self.n_words:
+                rows = rows.astype(np.int64)
+                np.bitwise_or.at(result, rows >> 6, np.left_shift(np.uint64(1), (rows & 63).astype(np.uint64)))
+            else:
+                # Many rows: scattering into a byte per row and packing beats per-bit updates
+                flags = np.zeros(self.n_words * WORD_BITS, dtype=bool)
+                flags[rows] = True
+                result |= _pack(flags, self.n_words)
+        return result
+
+    def mask(self, filters):
+        """Packed words of the rows matching every {column: values} filter (AND across columns); None skips a column"""
+        result = None
+        for column, values in filters.items():
+            if values is None:
+                continue
+            selected = self.select(column, values)
+            result = selected if result is None else result & selected
+        return result
+
+    def take(self, frame, filters):
+        """Rows of ``frame`` (the marketing frame or a slice of it) matching ``filters``"""
+        words = self.mask(filters)
+        if words is None:
+            return frame
+        selected = _unpack(words)
+        labels = frame.index
+        if isinstance(labels, pd.RangeIndex) and labels.start == 0 and labels.step == 1:
+            return frame[selected[:len(frame)]]
+        return frame[selected[labels.to_numpy()]]
@@ -0,0 +1,73 @@
+"""
+Structured dimensions parsed from campaign names
+Campaign names follow "<platform> - <campaign type> - <sequence>", e.g.
+"Google - Display - C01". The names are parsed once at ingest into
+categorical ``campaign_type`` and ``campaign_sequence`` columns, plus a
+``tactic_mismatch`` flag for rows whose campaign type disagrees with their
+``tactic`` (a "Display" campaign reported under "Non-Branded Search").
+
+Only the distinct names (the campaign column's categories) are parsed; rows
+get their values by indexing with the campaign codes, and the mismatch flag
+compares integer codes, so no string work is done per row. The name's
+platform part repeats the ``platform`` column and is not stored.
+"""
+
+import numpy as np
+import pandas as pd
+
+from instrumentation import traced
+
+CAMPAIGN_NAME_PATTERN = r'^(?P<campaign_platform>.+?) - (?P<campaign_type>.+) - (?P<campaign_sequence>[^ ]+)$'
+CAMPAIGN_DIMENSIONS = ['campaign_type', 'campaign_sequence']
+# Campaign-name dimensions offered as dashboard filters and grouping keys, with their labels
+DIMENSION_LABELS = {
+    'tactic': 'Tactic',
+    'campaign_type': 'Campaign Type',
+    'campaign_sequence': 'Campaign Sequence',
+}
+
+
+def parse_campaign_names(names):
+    """One row per name with its campaign_platform, campaign_type and campaign_sequence (NaN if it doesn't match)"""
+    return pd.Series(np.asarray(names, dtype=object), dtype=object).str.extract(CAMPAIGN_NAME_PATTERN)
+
+
+def _take_codes(codes, mapping):
+    """``mapping[codes]`` with code -1 (missing) kept as -1"""
+    return np.append(mapping, -1)[codes]
+
+
+def _recode(codes, values):
+    """Categorical whose rows are ``values[codes]``, built from codes without per-row values"""
+    value_codes, categories = pd.factorize(values, sort=True)
+    return pd.Categorical.from_codes(_take_codes(codes, value_codes), categories=categories)
+
+
+@traced
+def add_campaign_dimensions(marketing_df):
+    """Add the campaign_type and campaign_sequence categoricals and the tactic_mismatch flag"""
+    campaign = pd.Categorical(marketing_df['campaign'])
+    parts = parse_campaign_names(campaign.categories)
+    for column in CAMPAIGN_DIMENSIONS:
+        marketing_df[column] = pd.Series(
+            _recode(campaign.codes, parts[column].to_numpy()), index=marketing_df.index
+        )
+
+    # Tactic codes translated into campaign-type codes; a tactic that is not a campaign type is -1
+    tactic = pd.Categorical(marketing_df['tactic'])
+    campaign_type = marketing_df['campaign_type'].cat
+    tactic_as_type = _take_codes(tactic.codes, campaign_type.categories.get_indexer(tactic.categories))
+    type_codes = campaign_type.codes.to_numpy()
+    marketing_df['tactic_mismatch'] = (type_codes >= 0) & (type_codes != tactic_as_type)
+    return marketing_df
+
+
+def mismatched_campaigns(marketing_df):
+    """Campaigns whose name's type disagrees with the tactic they report under, with the rows and spend affected"""
+    mismatched = marketing_df[marketing_df['tactic_mismatch'].to_numpy()]
+    return (
+        mismatched.groupby(['platform', 'campaign', 'campaign_type', 'tactic'], observed=True)
+        .agg(rows=('spend', 'size'), spend=('spend', 'sum'))
+        .reset_index()
+        .sort_values('spend', ascending=False, ignore_index=True)
+    )
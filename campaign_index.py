@@ -0,0 +1,118 @@
+"""
+Per-campaign row-range index for drill-downs
+The marketing rows are copied once in (platform, campaign, date) order, so
+every campaign's history is one contiguous block. Looking a campaign up is a
+hash lookup for its (start, stop) range followed by a slice of the sorted
+rows, which is a view rather than a filtered copy of the whole frame, and
+dates within the block are sorted, so date ranges are two binary searches.
+Campaign names are only unique within a platform, so ranges are keyed by both.
+"""
+
+import numpy as np
+import pandas as pd
+
+from data_processing import concat_aligned, safe_ratio
+from instrumentation import traced
+
+INDEX_COLUMNS = ['date', 'state', 'spend', 'attributed revenue']
+
+
+class CampaignIndex:
+    """Contiguous row ranges of each (platform, campaign) in date-sorted marketing rows"""
+
+    def __init__(self, rows, ranges):
+        self.rows = rows
+        self.ranges = ranges
+        self._starts = ranges['start'].to_numpy()
+        self._stops = ranges['stop'].to_numpy()
+
+    @classmethod
+    @traced(name='CampaignIndex.build')
+    def build(cls, marketing_df):
+        """Sort once on (platform, campaign, date) and record where each campaign starts and stops"""
+        platform = pd.Categorical(marketing_df['platform'])
+        campaign = pd.Categorical(marketing_df['campaign'])
+        key = platform.codes.astype(np.int64) * len(campaign.categories) + campaign.codes
+        order = np.lexsort((marketing_df['date'].to_numpy(), key))
+
+        sorted_key = key[order]
+        starts = np.flatnonzero(np.r_[True, sorted_key[1:] != sorted_key[:-1]]) if len(order) else order
+        stops = np.r_[starts[1:], len(order)].astype(np.int64)
+
+        first_rows = marketing_df[['platform', 'campaign']].iloc[order[starts]]
+        ranges = pd.DataFrame(
+            {'start': starts, 'stop': stops},
+            index=pd.MultiIndex.from_frame(first_rows)
+        )
+        rows = marketing_df[INDEX_COLUMNS].take(order).reset_index(drop=True)
+        return cls(rows, ranges)
+
+    def replace_platform(self, platform, platform_df):
+        """Index with one platform's campaigns rebuilt from its rows; other platforms' blocks are reused
+
+        Rows are sorted by platform first, so the platforms before and after
+        ``platform`` are each one contiguous block that is copied as is.
+        """
+        order = list(platform_df['platform'].cat.categories)
+        position = order.index(platform)
+        platforms = self.ranges.index.get_level_values('platform')
+        parts = [
+            self._platform_block(platforms.isin(order[:position])),
+            CampaignIndex.build(platform_df),
+            self._platform_block(platforms.isin(order[position + 1:])),
+        ]
+
+        offsets = np.cumsum([0] + [len(part.rows) for part in parts[:-1]])
+        ranges = concat_aligned([
+            part.ranges.reset_index().assign(start=part.ranges['start'].to_numpy() + offset,
+                                             stop=part.ranges['stop'].to_numpy() + offset)
+            for part, offset in zip(parts, offsets)
+        ], ignore_index=True)
+        rows = concat_aligned([part.rows for part in parts], ignore_index=True)
+        return CampaignIndex(rows, ranges.set_index(['platform', 'campaign']))
+
+    def _platform_block(self, mask):
+        """Sub-index of the campaigns in ``mask``, which must be a contiguous run of ranges"""
+        ranges = self.ranges[mask]
+        if ranges.empty:
+            return CampaignIndex(self.rows.iloc[:0], ranges)
+        first, last = ranges['start'].iloc[0], ranges['stop'].iloc[-1]
+        return CampaignIndex(self.rows.iloc[first:last], ranges.assign(start=ranges['start'] - first, stop=ranges['stop'] - first))
+
+    def __len__(self):
+        return len(self.ranges)
+
+    def lookup(self, platform, campaign, start_date=None, end_date=None):
+        """The campaign's rows in date order (optionally within [start_date, end_date]) as a slice
+
+        Unknown campaigns give an empty frame.
+        """
+        try:
+            position = self.ranges.index.get_loc((platform, campaign))
+        except KeyError:
+            return self.rows.iloc[:0]
+        start, stop = self._starts[position], self._stops[position]
+
+        dates = self.rows['date'].to_numpy()[start:stop]
+        first = np.searchsorted(dates, np.datetime64(pd.Timestamp(start_date)), 'left') if start_date is not None else 0
+        last = np.searchsorted(dates, np.datetime64(pd.Timestamp(end_date)), 'right') if end_date is not None else len(dates)
+        return self.rows.iloc[start + first:start + max(first, last)]
+
+    def daily_series(self, platform, campaign, start_date=None, end_date=None):
+        """Daily spend, attributed revenue and ROAS (summed over states) for one campaign"""
+        daily = self.lookup(platform, campaign, start_date, end_date).groupby('date').agg({
+            'spend': 'sum',
+            'attributed revenue': 'sum'
+        }).reset_index()
+        daily['roas'] = safe_ratio(daily['attributed revenue'], daily['spend'])
+        return daily
+
+    def state_mix(self, platform, campaign, start_date=None, end_date=None):
+        """Spend and attributed revenue per state for one campaign, with each state's share of spend"""
+        states = self.lookup(platform, campaign, start_date, end_date).groupby('state', observed=True).agg({
+            'spend': 'sum',
+            'attributed revenue': 'sum'
+        }).reset_index()
+        states['roas'] = safe_ratio(states['attributed revenue'], states['spend'])
+        states['spend_share'] = (states['spend'] / states['spend'].sum() * 100).round(2)
+        return states.sort_values('spend', ascending=False, ignore_index=True)
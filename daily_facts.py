@@ -0,0 +1,100 @@
+"""
+Materialized daily business x marketing fact table
+One row per calendar day from the first to the last date in either source,
+holding the business metrics next to marketing totals and per-channel wide
+columns (``spend[Facebook]``, ``clicks[Google]``, ...). Every date-level
+analysis (correlation, forecasting, Shapley attribution, the marketing mix
+model) reads this table instead of regrouping and joining the raw frames.
+
+Gaps are explicit rather than silently dropped by a join:
+
+- ``business_observed`` / ``marketing_observed`` flag days present in each source
+- business metrics are NaN on days without business data; see fill_business_gaps
+- marketing metrics are 0 on days without marketing rows (nothing was spent)
+"""
+
+import pandas as pd
+
+from instrumentation import traced
+from query_backends import get_backend
+from time_rollups import BUSINESS_MEASURES, MARKETING_MEASURES
+
+GAP_METHODS = ('interpolate', 'zero')
+
+
+def channel_column(measure, channel):
+    """Name of a per-channel wide column, e.g. 'spend[Facebook]'"""
+    return f"{measure}[{channel}]"
+
+
+def channel_columns(facts, measure='spend'):
+    """{channel: column} for one measure's per-channel columns, in table order"""
+    prefix = f"{measure}["
+    return {
+        column[len(prefix):-1]: column
+        for column in facts.columns if column.startswith(prefix) and column.endswith(']')
+    }
+
+
+def _daily_business(business_df):
+    # Validated business data already has one row per date; only regroup if not
+    business_df = business_df[['date'] + BUSINESS_MEASURES]
+    if business_df['date'].is_unique:
+        return business_df.set_index('date')
+    return business_df.groupby('date').sum()
+
+
+def _daily_marketing(marketing_df, channel_col, backend=None, marketing_daily=None):
+    daily = marketing_daily if marketing_daily is not None else get_backend(backend).aggregate(
+        marketing_df, ['date', channel_col], {measure: 'sum' for measure in MARKETING_MEASURES}
+    )
+    wide = daily.pivot(index='date', columns=channel_col, values=MARKETING_MEASURES)
+    wide.columns = [channel_column(measure, channel) for measure, channel in wide.columns]
+    for measure in MARKETING_MEASURES:
+        wide.insert(MARKETING_MEASURES.index(measure), measure, daily.groupby('date')[measure].sum())
+    # A channel without rows on a day spent nothing that day
+    wide = wide.fillna(0)
+    for column in wide.columns:
+        measure = column.split('[')[0]
+        if pd.api.types.is_integer_dtype(daily[measure]):
+            wide[column] = wide[column].astype('int64')
+    return wide
+
+
+@traced
+def build_daily_facts(business_df, marketing_df, channel_col='platform', backend=None, marketing_daily=None):
+    """Daily fact table on a complete date index (see the module docstring for the columns)
+
+    ``marketing_daily`` (date, channel, MARKETING_MEASURES daily totals, e.g. from the
+    marketing day rollup) skips regrouping ``marketing_df``.
+    """
+    business = _daily_business(business_df)
+    marketing = _daily_marketing(marketing_df, channel_col, backend, marketing_daily)
+
+    observed = business.index.union(marketing.index)
+    dates = pd.date_range(observed.min(), observed.max(), freq='D', name='date')
+    facts = pd.concat([
+        business.reindex(dates),
+        marketing.reindex(dates, fill_value=0),
+    ], axis=1)
+    facts.insert(0, 'business_observed', dates.isin(business.index))
+    facts.insert(1, 'marketing_observed', dates.isin(marketing.index))
+    return facts.reset_index()
+
+
+def fill_business_gaps(facts, method='interpolate'):
+    """Copy of ``facts`` with business metrics filled on days without business data
+
+    'interpolate' draws a straight line between the neighbouring observed days
+    (and holds the first/last value at the edges); 'zero' fills with 0.
+    """
+    if method not in GAP_METHODS:
+        raise ValueError(f"Unknown gap method '{method}'; use one of {GAP_METHODS}")
+    facts = facts.copy()
+    if facts['business_observed'].all():
+        return facts
+    if method == 'zero':
+        facts[BUSINESS_MEASURES] = facts[BUSINESS_MEASURES].fillna(0)
+    else:
+        facts[BUSINESS_MEASURES] = facts[BUSINESS_MEASURES].interpolate(limit_direction='both')
+    return facts
@@ -0,0 +1,245 @@
+"""
+Data loading and aggregation shared by the dashboard and batch jobs
+Depends only on pandas/numpy so it can be imported without Streamlit or Plotly.
+"""
+
+import hashlib
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from campaign_dimensions import add_campaign_dimensions
+from data_validation import validate_data
+from instrumentation import traced
+from query_backends import RATIO_METRICS, get_backend
+
+BUSINESS_FILE = 'business.csv'
+PLATFORM_FILES = {
+    'Facebook': 'Facebook.csv',
+    'Google': 'Google.csv',
+    'TikTok': 'TikTok.csv',
+}
+# Low-cardinality text columns are read as categoricals: faster to parse,
+# a fraction of the memory and free to factorize for validation and grouping
+CATEGORY_COLUMNS = ['date', 'tactic', 'state', 'campaign']
+# Business ratios: name -> (numerator, denominator, scale), like RATIO_METRICS
+BUSINESS_RATIO_METRICS = {
+    'aov': ('total revenue', '# of orders', 1),
+    'conversion_rate': ('# of new orders', '# of orders', 100),
+    'profit_margin': ('gross profit', 'total revenue', 100),
+}
+
+
+def parse_dates(values):
+    """pd.to_datetime(errors='coerce') that parses each distinct value of a categorical once"""
+    if not isinstance(values.dtype, pd.CategoricalDtype):
+        return pd.to_datetime(values, errors='coerce')
+    parsed = pd.to_datetime(values.cat.categories, errors='coerce').to_numpy()
+    # Code -1 (missing) picks the trailing NaT
+    parsed = np.append(parsed, np.datetime64('NaT', 'ns').astype(parsed.dtype))
+    return pd.Series(parsed[values.cat.codes.to_numpy()], index=values.index, name=values.name)
+
+
+def _align_categories(frames, columns):
+    """Give categorical columns identical categories so pd.concat keeps them categorical"""
+    for column in columns:
+        if not all(isinstance(frame[column].dtype, pd.CategoricalDtype) for frame in frames):
+            continue
+        categories = sorted(set().union(*(frame[column].cat.categories for frame in frames)))
+        for frame in frames:
+            frame[column] = frame[column].cat.set_categories(categories)
+
+
+def concat_aligned(frames, **kwargs):
+    """pd.concat that keeps shared categorical columns categorical (the inputs are left unchanged)"""
+    frames = [frame.copy(deep=False) for frame in frames]
+    _align_categories(frames, list(frames[0].columns))
+    return pd.concat(frames, **kwargs)
+
+
+def load_business_data(data_dir='.'):
+    """Read the business CSV"""
+    business_df = pd.read_csv(Path(data_dir) / BUSINESS_FILE)
+    business_df['date'] = parse_dates(business_df['date'])
+    return business_df
+
+
+def load_platform_data(data_dir, platform):
+    """Read one platform's CSV, tagging its rows with the platform"""
+    platform_df = pd.read_csv(
+        Path(data_dir) / PLATFORM_FILES[platform], dtype={column: 'category' for column in CATEGORY_COLUMNS}
+    )
+    platform_df['date'] = parse_dates(platform_df['date'])
+    platform_df['platform'] = pd.Categorical.from_codes(
+        np.full(len(platform_df), list(PLATFORM_FILES).index(platform)), categories=list(PLATFORM_FILES)
+    )
+    return platform_df
+
+
+def load_raw_data(data_dir='.'):
+    """Read the business and per-platform CSVs and combine the marketing data"""
+    business_df = load_business_data(data_dir)
+    platform_frames = [load_platform_data(data_dir, platform) for platform in PLATFORM_FILES]
+    _align_categories(platform_frames, CATEGORY_COLUMNS[1:])
+    return business_df, pd.concat(platform_frames, ignore_index=True)
+
+
+def safe_ratio(numerator, denominator, scale=1):
+    """numerator / denominator * scale rounded to 2 places, NaN (not inf) where the denominator is zero"""
+    return (numerator / denominator.where(denominator != 0) * scale).round(2)
+
+
+def add_marketing_metrics(marketing_df):
+    """Add CTR/CPC/ROAS/CPM and the campaign-name dimensions to marketing data"""
+    for name, (numerator, denominator, scale) in RATIO_METRICS.items():
+        marketing_df[name] = safe_ratio(marketing_df[numerator], marketing_df[denominator], scale)
+    return add_campaign_dimensions(marketing_df)
+
+
+def add_business_metrics(business_df):
+    """Add AOV/conversion/margin to business data"""
+    for name, (numerator, denominator, scale) in BUSINESS_RATIO_METRICS.items():
+        business_df[name] = safe_ratio(business_df[numerator], business_df[denominator], scale)
+    return business_df
+
+
+def add_derived_metrics(business_df, marketing_df):
+    """Add CTR/CPC/ROAS/CPM to marketing data and AOV/conversion/margin to business data"""
+    return add_business_metrics(business_df), add_marketing_metrics(marketing_df)
+
+
+@traced
+def load_validated_data(data_dir='.'):
+    """Load all sources and quarantine invalid rows; returns (business_df, marketing_df, quarantine_df)"""
+    return validate_data(*load_raw_data(data_dir))
+
+
+@traced
+def prepare_validated_data(data_dir='.'):
+    """Validated data with derived metrics, plus the quarantine table"""
+    business_df, marketing_df, quarantine_df = load_validated_data(data_dir)
+    business_df, marketing_df = add_derived_metrics(business_df, marketing_df)
+    return business_df, marketing_df, quarantine_df
+
+
+@traced
+def prepare_data(data_dir='.'):
+    """Load all sources, drop invalid rows and compute derived metrics"""
+    business_df, marketing_df, _ = prepare_validated_data(data_dir)
+    return business_df, marketing_df
+
+
+def dataset_version(data_dir='.'):
+    """Cheap fingerprint of the source files (name, size, mtime) without reading them"""
+    data_dir = Path(data_dir)
+    digest = hashlib.sha256()
+    for filename in [BUSINESS_FILE, *PLATFORM_FILES.values()]:
+        stat = (data_dir / filename).stat()
+        digest.update(f"{filename}:{stat.st_size}:{stat.st_mtime_ns};".encode())
+    return digest.hexdigest()[:16]
+
+
+@traced
+def filter_data(business_df, marketing_df, start_date=None, end_date=None, platforms=None, filters=None):
+    """Apply the dashboard's date range, platform and {dimension column: values} filters"""
+    if start_date is not None and end_date is not None:
+        start_date = pd.to_datetime(start_date)
+        end_date = pd.to_datetime(end_date)
+        business_df = business_df[
+            (business_df['date'] >= start_date) &
+            (business_df['date'] <= end_date)
+        ]
+        marketing_df = marketing_df[
+            (marketing_df['date'] >= start_date) &
+            (marketing_df['date'] <= end_date)
+        ]
+
+    if platforms is not None:
+        marketing_df = marketing_df[marketing_df['platform'].isin(platforms)]
+
+    for column, values in (filters or {}).items():
+        if values is not None:
+            marketing_df = marketing_df[marketing_df[column].isin(values)]
+
+    return business_df, marketing_df
+
+
+@traced
+def calculate_kpis(business_df, marketing_df):
+    """Headline KPI values and their deltas"""
+    return {
+        'total_revenue': business_df['total revenue'].sum(),
+        'revenue_delta_pct': business_df['total revenue'].pct_change().mean() * 100,
+        'total_spend': marketing_df['spend'].sum(),
+        'spend_delta_pct': marketing_df['spend'].pct_change().mean() * 100,
+        'overall_roas': marketing_df['attributed revenue'].sum() / marketing_df['spend'].sum(),
+        'average_roas': marketing_df['roas'].mean(),
+        'total_orders': business_df['# of orders'].sum(),
+        'orders_delta_pct': business_df['# of orders'].pct_change().mean() * 100,
+    }
+
+
+@traced
+def calculate_platform_metrics(marketing_df, backend=None):
+    """Aggregate spend, revenue, clicks and impressions by platform"""
+    platform_metrics = get_backend(backend).aggregate(marketing_df, ['platform'], {
+        'spend': 'sum',
+        'attributed revenue': 'sum',
+        'clicks': 'sum',
+        'impression': 'sum'
+    })
+
+    platform_metrics['roas'] = platform_metrics['attributed revenue'] / platform_metrics['spend']
+    platform_metrics['ctr'] = (platform_metrics['clicks'] / platform_metrics['impression'] * 100)
+
+    return platform_metrics
+
+
+@traced
+def create_campaign_analysis(marketing_df, backend=None):
+    """Create campaign performance analysis"""
+    campaign_metrics = get_backend(backend).aggregate(marketing_df, ['platform', 'campaign'], {
+        'spend': 'sum',
+        'attributed revenue': 'sum',
+        'clicks': 'sum',
+        'impression': 'sum',
+        'roas': 'mean'
+    })
+
+    campaign_metrics['roi'] = ((campaign_metrics['attributed revenue'] - campaign_metrics['spend']) / campaign_metrics['spend'] * 100).round(2)
+    campaign_metrics = campaign_metrics.sort_values('roi', ascending=False)
+
+    return campaign_metrics
+
+
+@traced
+def create_tactic_analysis(marketing_df, backend=None):
+    """Analyze performance by marketing tactic"""
+    return create_dimension_analysis(marketing_df, 'tactic', backend)
+
+
+@traced
+def create_dimension_analysis(marketing_df, dimension, backend=None):
+    """Analyze performance by platform and a dimension (tactic or a campaign-name dimension)"""
+    dimension_metrics = get_backend(backend).aggregate(marketing_df, ['platform', dimension], {
+        'spend': 'sum',
+        'attributed revenue': 'sum',
+        'roas': 'mean',
+        'ctr': 'mean'
+    })
+
+    return dimension_metrics
+
+
+@traced
+def create_geographic_analysis(marketing_df, backend=None):
+    """Analyze performance by state"""
+    geo_metrics = get_backend(backend).aggregate(marketing_df, ['state'], {
+        'spend': 'sum',
+        'attributed revenue': 'sum',
+        'clicks': 'sum',
+        'roas': 'mean'
+    })
+
+    return geo_metrics
@@ -0,0 +1,198 @@
+"""
+Build-time snapshot of the prepared dashboard data
+``python deploy.py compile`` runs ingestion, validation and every load-time
+pre-aggregation (rollups, daily facts, campaign index, sketches) once, plus
+the analyses behind the dashboard's default view, and writes the results to
+``snapshot/<version>/``. A container built with the compile step loads these
+files instead of parsing the CSVs, so a fresh replica has nothing to compute
+before its first request. With pyarrow installed, frames are written as
+uncompressed Feather files and memory-mapped on load; frames Arrow cannot
+hold, and all frames without pyarrow, are pickled.
+
+The version is a hash of the source files' names, sizes and modification
+times (data_processing.dataset_version) and SNAPSHOT_FORMAT, so checking it
+never reads the CSVs. A snapshot whose sources have changed (or that is
+missing) is ignored and the data is prepared from the CSVs as usual.
+"""
+
+import hashlib
+import json
+import os
+import pickle
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pandas as pd
+
+from approximate_query import stratified_sample
+from bitmap_index import BitmapIndex
+from campaign_index import CampaignIndex
+from daily_facts import build_daily_facts
+from data_processing import (
+    BUSINESS_FILE,
+    PLATFORM_FILES,
+    create_campaign_analysis,
+    create_geographic_analysis,
+    create_tactic_analysis,
+    dataset_version,
+    filter_data,
+    prepare_validated_data,
+)
+from distinct_sketches import DistinctSketches
+from instrumentation import traced
+from lazy_imports import find_missing_packages, lazy_import
+from quantile_sketches import QuantileSketches
+from time_rollups import build_rollups
+
+media_mix_model = lazy_import('media_mix_model')
+pa = lazy_import('pyarrow')
+feather = lazy_import('pyarrow.feather')
+
+SNAPSHOT_FORMAT = 5
+SNAPSHOT_ENV_VAR = 'DASHBOARD_SNAPSHOT_DIR'
+DEFAULT_SNAPSHOT_DIR = Path('snapshot')
+MANIFEST_FILE = 'manifest.json'
+# Frames the memory governor may spill by date
+DATE_COLS = {'marketing_df': 'date'}
+DEFAULT_VIEW_ANALYSES = {
+    'create_campaign_analysis': create_campaign_analysis,
+    'create_tactic_analysis': create_tactic_analysis,
+    'create_geographic_analysis': create_geographic_analysis,
+}
+
+
+@traced
+def build_frames(data_dir='.'):
+    """{name: frame} of everything the dashboard prepares at load time"""
+    business_df, marketing_df, quarantine_df = prepare_validated_data(data_dir)
+    campaign_index = CampaignIndex.build(marketing_df)
+    # Time-grain rollups are built once here so switching granularity is a table swap
+    return {
+        'business_df': business_df,
+        'marketing_df': marketing_df,
+        'quarantine_df': quarantine_df,
+        'campaign_rows': campaign_index.rows,
+        'campaign_ranges': campaign_index.ranges,
+        'daily_facts': build_daily_facts(business_df, marketing_df),
+        **QuantileSketches.build(marketing_df).frames,
+        **DistinctSketches.build(marketing_df).frames,
+        **BitmapIndex.build(marketing_df).frames,
+        'marketing_sample': stratified_sample(marketing_df),
+        **build_rollups(business_df, marketing_df),
+    }
+
+
+def default_filter_key(business_df):
+    """The dashboard's filter key before the user touches a filter: full date range, all platforms"""
+    return (business_df['date'].min().date(), business_df['date'].max().date(), tuple(PLATFORM_FILES))
+
+
+@traced
+def build_results(frames):
+    """{cache key: result} for the analyses the dashboard's default view requests
+
+    Keys match the ones the dashboard passes to MemoryGovernor.cached, so the
+    results are cache hits on the first render.
+    """
+    business_df, marketing_df = frames['business_df'], frames['marketing_df']
+    filter_key = default_filter_key(business_df)
+    _, marketing_filtered = filter_data(business_df, marketing_df, *filter_key[:2], list(filter_key[2]))
+
+    results = {
+        (name, *filter_key): analysis(marketing_filtered)
+        for name, analysis in DEFAULT_VIEW_ANALYSES.items()
+    }
+    results[('load_media_mix_model',)] = media_mix_model.load_or_fit_mmm(
+        business_df, marketing_df, facts=frames['daily_facts']
+    )
+    return results
+
+
+def snapshot_version(data_dir='.'):
+    """Hash of the source files' fingerprint and the snapshot format"""
+    digest = hashlib.sha256(f"format:{SNAPSHOT_FORMAT};{dataset_version(data_dir)}".encode())
+    return digest.hexdigest()[:16]
+
+
+def _write_frame(frame, version_dir, name, arrow):
+    """Write one frame as uncompressed (memory-mappable) Feather if Arrow can hold it, else pickle; returns its file name"""
+    if arrow:
+        try:
+            table = pa.Table.from_pandas(frame)
+        except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError):
+            # e.g. an object column mixing value types
+            pass
+        else:
+            feather.write_feather(table, version_dir / f"{name}.feather", compression='uncompressed')
+            return f"{name}.feather"
+    frame.to_pickle(version_dir / f"{name}.pkl", protocol=pickle.HIGHEST_PROTOCOL)
+    return f"{name}.pkl"
+
+
+def _read_frame(path):
+    """Frame written by _write_frame, memory-mapping Feather files"""
+    if path.suffix == '.feather':
+        return feather.read_table(path, memory_map=True).to_pandas()
+    return pd.read_pickle(path)
+
+
+def snapshot_dir():
+    """Snapshot location from DASHBOARD_SNAPSHOT_DIR, defaulting to DEFAULT_SNAPSHOT_DIR"""
+    return Path(os.environ.get(SNAPSHOT_ENV_VAR, DEFAULT_SNAPSHOT_DIR))
+
+
+@traced
+def compile_snapshot(data_dir='.', output_dir=None):
+    """Prepare everything from the CSVs and write it as a versioned snapshot; returns the manifest
+
+    Frames and results are written under ``<output_dir>/<version>/`` first and
+    the manifest pointing at them is replaced last, so a reader never sees a
+    half-written snapshot.
+    """
+    output_dir = Path(output_dir or snapshot_dir())
+    version = snapshot_version(data_dir)
+    version_dir = output_dir / version
+    version_dir.mkdir(parents=True, exist_ok=True)
+
+    frames = build_frames(data_dir)
+    results = build_results(frames)
+    arrow = not find_missing_packages(['pyarrow'])
+    files = {name: _write_frame(frame, version_dir, name, arrow) for name, frame in frames.items()}
+    with open(version_dir / 'results.pkl', 'wb') as f:
+        pickle.dump(results, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    manifest = {
+        'version': version,
+        'format': SNAPSHOT_FORMAT,
+        'created_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'frames': {name: len(frame) for name, frame in frames.items()},
+        'files': files,
+        'results': len(results),
+    }
+    temporary = output_dir / f"{MANIFEST_FILE}.tmp"
+    temporary.write_text(json.dumps(manifest, indent=2))
+    os.replace(temporary, output_dir / MANIFEST_FILE)
+    return manifest
+
+
+@traced
+def load_snapshot(data_dir='.', input_dir=None):
+    """(frames, results) from the current snapshot, or None if there is none, it is unreadable or the CSVs changed"""
+    input_dir = Path(input_dir or snapshot_dir())
+    try:
+        manifest = json.loads((input_dir / MANIFEST_FILE).read_text())
+        current = snapshot_version(data_dir)
+    except (OSError, ValueError):
+        return None
+    if manifest.get('format') != SNAPSHOT_FORMAT or manifest.get('version') != current:
+        return None
+
+    version_dir = input_dir / manifest['version']
+    try:
+        frames = {name: _read_frame(version_dir / filename) for name, filename in manifest['files'].items()}
+        with open(version_dir / 'results.pkl', 'rb') as f:
+            results = pickle.load(f)
+    except (OSError, ValueError, EOFError, pickle.UnpicklingError):
+        # Missing or truncated files (Arrow reports those as ValueError): prepare the data from the CSVs instead
+        return None
+    return frames, results
@@ -0,0 +1,228 @@
+"""
+Ingest-time validation of business and marketing data
+Every check is a single vectorized pass over a column. Rows failing any check
+are moved to a quarantine table with semicolon-separated reason codes instead
+of flowing into the aggregations, where e.g. zero spend would produce infinite
+ROAS. Missing columns cannot be quarantined row by row and raise SchemaError.
+"""
+
+import numpy as np
+import pandas as pd
+
+MARKETING_COLUMNS = {
+    'date': 'date',
+    'tactic': 'text',
+    'state': 'text',
+    'campaign': 'text',
+    'impression': 'number',
+    'clicks': 'number',
+    'spend': 'number',
+    'attributed revenue': 'number',
+}
+BUSINESS_COLUMNS = {
+    'date': 'date',
+    '# of orders': 'number',
+    '# of new orders': 'number',
+    'new customers': 'number',
+    'total revenue': 'number',
+    'gross profit': 'number',
+    'COGS': 'number',
+}
+# Campaign names are only unique within a platform
+MARKETING_KEY = ['platform', 'date', 'campaign', 'state']
+BUSINESS_KEY = ['date']
+# Columns used as denominators by add_derived_metrics
+MARKETING_DENOMINATORS = {'spend': 'zero_spend', 'impression': 'zero_impressions'}
+BUSINESS_DENOMINATORS = {'# of orders': 'zero_orders', 'total revenue': 'zero_revenue'}
+# Gross profit and COGS may legitimately be negative (returns, credits)
+BUSINESS_NON_NEGATIVE = ['# of orders', '# of new orders', 'new customers', 'total revenue']
+
+QUARANTINE_COLUMNS = ['source', 'row', 'reason']
+
+
+class SchemaError(ValueError):
+    """Raised when a source is missing required columns"""
+
+
+def check_schema(df, columns, source):
+    missing = [column for column in columns if column not in df.columns]
+    if missing:
+        raise SchemaError(f"{source} data is missing columns: {', '.join(missing)}")
+
+
+def _coerce(df, columns, flags):
+    """Parse date and number columns, flagging values that are missing or fail to parse
+
+    Returns the parsed frame and the number columns that had to be parsed from text.
+    """
+    # Columns are replaced, never modified in place, so a shallow copy is enough
+    df = df.copy(deep=False)
+    parsed_numbers = []
+    for column, kind in columns.items():
+        values = df[column]
+        if kind == 'date':
+            parsed = values if pd.api.types.is_datetime64_any_dtype(values) else pd.to_datetime(values, errors='coerce')
+            flags['invalid_date'] |= parsed.isna().to_numpy()
+        elif kind == 'number':
+            if pd.api.types.is_numeric_dtype(values):
+                parsed = values
+            else:
+                parsed = pd.to_numeric(values, errors='coerce')
+                parsed_numbers.append(column)
+            flags['missing_value'] |= values.isna().to_numpy()
+            flags['non_numeric'] |= (parsed.isna() & values.notna()).to_numpy()
+        else:
+            parsed = values
+            flags['missing_value'] |= values.isna().to_numpy()
+        df[column] = parsed
+    return df, parsed_numbers
+
+
+def _key_codes(values):
+    """Dense integer codes for one key column and the number of distinct codes
+
+    Categoricals already carry codes and dates map to day offsets; anything else
+    is factorized. Missing values get code -1.
+    """
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        return values.cat.codes.to_numpy(), len(values.cat.categories)
+    if pd.api.types.is_datetime64_any_dtype(values) and values.notna().all() and len(values):
+        days = values.to_numpy().astype('datetime64[D]').astype(np.int64)
+        first = days.min()
+        return days - first, int(days.max() - first) + 1
+    codes, uniques = pd.factorize(values)
+    return codes, len(uniques)
+
+
+def duplicated_keys(df, key):
+    """Mark every occurrence of a key combination after the first
+
+    The key columns' codes are combined into one integer per row, so duplicates
+    are found with a single stable sort instead of hashing tuples of strings.
+    Falls back to DataFrame.duplicated if the combined codes would overflow.
+    """
+    combined = np.zeros(len(df), dtype=np.int64)
+    key_space = 1
+    for column in key:
+        codes, size = _key_codes(df[column])
+        size += 1  # room for missing values
+        key_space *= size
+        if key_space >= 2 ** 63:
+            return df.duplicated(subset=key, keep='first').to_numpy()
+        combined *= size
+        combined += codes + 1
+
+    order = np.argsort(combined, kind='stable')
+    sorted_keys = combined[order]
+    duplicated = np.zeros(len(df), dtype=bool)
+    duplicated[order[1:]] = sorted_keys[1:] == sorted_keys[:-1]
+    return duplicated
+
+
+def validate_frame(df, source, columns, key, denominators, non_negative=None,
+                   min_date=None, max_date=None):
+    """Split ``df`` into (clean, quarantine) after schema, type, value, key and date checks
+
+    ``denominators`` maps a column to the reason code used when it is zero.
+    Duplicate keys keep their first occurrence.
+    """
+    check_schema(df, columns, source)
+    reasons = ['invalid_date', 'date_out_of_range', 'missing_value', 'non_numeric',
+               'negative_value', *denominators.values(), 'duplicate_key']
+    flags = {reason: np.zeros(len(df), dtype=bool) for reason in reasons}
+
+    clean, parsed_numbers = _coerce(df, columns, flags)
+
+    if non_negative is None:
+        non_negative = [column for column, kind in columns.items() if kind == 'number']
+    flags['negative_value'] |= (clean[non_negative] < 0).any(axis=1).to_numpy()
+
+    for column, reason in denominators.items():
+        flags[reason] |= (clean[column] == 0).to_numpy()
+
+    flags['duplicate_key'] |= duplicated_keys(clean, key)
+
+    if min_date is not None:
+        flags['date_out_of_range'] |= (clean['date'] < pd.Timestamp(min_date)).to_numpy()
+    if max_date is not None:
+        flags['date_out_of_range'] |= (clean['date'] > pd.Timestamp(max_date)).to_numpy()
+
+    failed = np.logical_or.reduce(list(flags.values()))
+    failed_rows = np.flatnonzero(failed)
+
+    # One bit per reason for the failed rows only, so reason strings are built
+    # per distinct combination rather than per row
+    codes = np.zeros(len(failed_rows), dtype=np.int64)
+    for bit, reason in enumerate(reasons):
+        codes |= flags[reason][failed_rows].astype(np.int64) << bit
+    labels = {
+        code: ';'.join(reason for bit, reason in enumerate(reasons) if code >> bit & 1)
+        for code in np.unique(codes)
+    }
+
+    quarantine = df.iloc[failed_rows].copy()
+    quarantine.insert(0, 'source', source)
+    quarantine.insert(1, 'row', failed_rows)
+    quarantine['reason'] = [labels[code] for code in codes]
+
+    if len(failed_rows):
+        clean = clean[~failed].reset_index(drop=True)
+    # A bad value in a count column made it text; restore integers once it is gone
+    for column in parsed_numbers:
+        if (clean[column] % 1 == 0).all():
+            clean[column] = clean[column].astype('int64')
+
+    return clean, quarantine.reset_index(drop=True)
+
+
+def validate_business(business_df, min_date=None, max_date=None):
+    """Validate the business source; returns (business_df, quarantine)"""
+    return validate_frame(
+        business_df, 'business', BUSINESS_COLUMNS, BUSINESS_KEY, BUSINESS_DENOMINATORS,
+        BUSINESS_NON_NEGATIVE, min_date, max_date
+    )
+
+
+def validate_marketing(marketing_df, min_date=None, max_date=None):
+    """Validate marketing rows (all platforms or one, as keys include the platform); returns (marketing_df, quarantine)"""
+    return validate_frame(
+        marketing_df, 'marketing', {**MARKETING_COLUMNS, 'platform': 'text'}, MARKETING_KEY,
+        MARKETING_DENOMINATORS, min_date=min_date, max_date=max_date
+    )
+
+
+def combine_quarantine(frames):
+    """One quarantine table from per-source ones, empty (with QUARANTINE_COLUMNS) if none have rows"""
+    return pd.concat(
+        [frame for frame in frames if not frame.empty] or [pd.DataFrame(columns=QUARANTINE_COLUMNS)],
+        ignore_index=True
+    )
+
+
+def validate_data(business_df, marketing_df, min_date=None, max_date=None):
+    """Validate both sources; returns (business_df, marketing_df, quarantine_df)
+
+    Marketing rows must fall within the (validated) business date range, or
+    within [min_date, max_date] when given.
+    """
+    business_df, business_quarantine = validate_business(business_df, min_date, max_date)
+    if min_date is None and not business_df.empty:
+        min_date = business_df['date'].min()
+    if max_date is None and not business_df.empty:
+        max_date = business_df['date'].max()
+
+    marketing_df, marketing_quarantine = validate_marketing(marketing_df, min_date, max_date)
+    return business_df, marketing_df, combine_quarantine([business_quarantine, marketing_quarantine])
+
+
+def quarantine_summary(quarantine_df):
+    """Quarantined row counts per source and reason code"""
+    if quarantine_df.empty:
+        return pd.DataFrame(columns=['source', 'reason', 'rows'])
+    reasons = quarantine_df[['source', 'reason']].assign(reason=quarantine_df['reason'].str.split(';'))
+    return (
+        reasons.explode('reason')
+        .groupby(['source', 'reason']).size()
+        .rename('rows').reset_index()
+        .sort_values('rows', ascending=False, ignore_index=True)
+    )
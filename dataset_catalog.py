@@ -0,0 +1,170 @@
+"""
+Catalog of tenants (brands) served by one dashboard process
+A catalog is a directory with one subdirectory per tenant. Each tenant has a
+``manifest.json`` and its own business and platform CSV files::
+
+    catalog/
+        brand-a/
+            manifest.json   {"name": "Brand A", "memory_budget_mb": 256}
+            business.csv  Facebook.csv  Google.csv  TikTok.csv
+        brand-b/
+            ...
+
+Manifest keys (all optional): ``name`` (shown in the tenant selector,
+defaults to the directory name), ``data_dir`` (relative to the tenant
+directory, default ``.``), ``snapshot_dir`` (default ``snapshot``) and
+``memory_budget_mb`` (default DEFAULT_TENANT_BUDGET_MB).
+
+Without a catalog (DASHBOARD_CATALOG_DIR unset) the working directory is the
+single 'default' tenant, as before.
+
+Each tenant's prepared data and cached results live in its own
+MemoryGovernor with the tenant's budget. TenantCache keeps these governors
+under one process-wide budget: when the total is exceeded, the least recently
+used tenants that have been idle for IDLE_SECONDS are unloaded entirely and
+reload on their next request.
+"""
+
+import json
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from pathlib import Path
+
+from data_snapshot import snapshot_dir
+from memory_governor import BUDGET_ENV_VAR, DEFAULT_BUDGET_MB, MemoryGovernor
+
+CATALOG_ENV_VAR = 'DASHBOARD_CATALOG_DIR'
+MANIFEST_FILE = 'manifest.json'
+DEFAULT_TENANT = 'default'
+DEFAULT_TENANT_BUDGET_MB = 256
+IDLE_SECONDS = 60
+# Most recent tenant evictions kept for stats()
+MAX_EVICTIONS = 1000
+
+
+class CatalogError(ValueError):
+    """A tenant manifest is missing, unreadable or invalid"""
+
+
+class Tenant:
+    """One brand's data location, snapshot location and memory budget"""
+
+    def __init__(self, tenant_id, name, data_dir, snapshot_dir, memory_budget_bytes):
+        self.tenant_id = tenant_id
+        self.name = name
+        self.data_dir = Path(data_dir)
+        self.snapshot_dir = Path(snapshot_dir)
+        self.memory_budget_bytes = memory_budget_bytes
+
+    @classmethod
+    def from_manifest(cls, tenant_dir):
+        """Tenant described by ``<tenant_dir>/manifest.json``"""
+        tenant_dir = Path(tenant_dir)
+        try:
+            manifest = json.loads((tenant_dir / MANIFEST_FILE).read_text())
+            budget_mb = float(manifest.get('memory_budget_mb', DEFAULT_TENANT_BUDGET_MB))
+        except (OSError, ValueError, TypeError) as e:
+            raise CatalogError(f"Invalid tenant manifest {tenant_dir / MANIFEST_FILE}: {e}")
+        if not isinstance(manifest, dict) or budget_mb <= 0:
+            raise CatalogError(f"Invalid tenant manifest {tenant_dir / MANIFEST_FILE}: expected an object with a positive budget")
+        return cls(
+            tenant_id=tenant_dir.name,
+            name=manifest.get('name', tenant_dir.name),
+            data_dir=tenant_dir / manifest.get('data_dir', '.'),
+            snapshot_dir=tenant_dir / manifest.get('snapshot_dir', 'snapshot'),
+            memory_budget_bytes=int(budget_mb * 1024 ** 2),
+        )
+
+
+def catalog_dir():
+    """Catalog location from DASHBOARD_CATALOG_DIR, or None to serve the working directory"""
+    root = os.environ.get(CATALOG_ENV_VAR)
+    return Path(root) if root else None
+
+
+def load_catalog(root=None, default_budget_bytes=None):
+    """{tenant_id: Tenant} for every tenant directory with a manifest, sorted by id
+
+    With no catalog directory the working directory is the single DEFAULT_TENANT.
+    """
+    root = Path(root) if root is not None else catalog_dir()
+    if root is None:
+        budget = default_budget_bytes or DEFAULT_BUDGET_MB * 1024 ** 2
+        return {DEFAULT_TENANT: Tenant(DEFAULT_TENANT, 'Default', '.', snapshot_dir(), budget)}
+
+    tenants = {
+        tenant_dir.name: Tenant.from_manifest(tenant_dir)
+        for tenant_dir in sorted(root.iterdir()) if (tenant_dir / MANIFEST_FILE).is_file()
+    }
+    if not tenants:
+        raise CatalogError(f"No tenants in catalog {root}: expected <tenant>/{MANIFEST_FILE}")
+    return tenants
+
+
+class TenantCache:
+    """Per-tenant memory governors under a process-wide budget, unloading idle tenants LRU-first"""
+
+    def __init__(self, tenants, total_budget_bytes=DEFAULT_BUDGET_MB * 1024 ** 2, idle_seconds=IDLE_SECONDS):
+        self.tenants = tenants
+        self.total_budget_bytes = total_budget_bytes
+        self.idle_seconds = idle_seconds
+        self.evictions = deque(maxlen=MAX_EVICTIONS)
+        self._governors = OrderedDict()
+        self._last_used = {}
+        self._lock = threading.RLock()
+
+    @classmethod
+    def from_env(cls, **kwargs):
+        """Catalog from DASHBOARD_CATALOG_DIR and total budget from DASHBOARD_MEMORY_BUDGET_MB"""
+        total_budget = int(float(os.environ.get(BUDGET_ENV_VAR, DEFAULT_BUDGET_MB)) * 1024 ** 2)
+        return cls(load_catalog(default_budget_bytes=total_budget), total_budget, **kwargs)
+
+    def governor(self, tenant_id):
+        """The tenant's governor, created (empty) on first use; marks the tenant as most recently used"""
+        if tenant_id not in self.tenants:
+            raise KeyError(f"Unknown tenant '{tenant_id}'")
+        with self._lock:
+            if tenant_id not in self._governors:
+                budget = min(self.tenants[tenant_id].memory_budget_bytes, self.total_budget_bytes)
+                self._governors[tenant_id] = MemoryGovernor(budget_bytes=budget)
+            self._governors.move_to_end(tenant_id)
+            self._last_used[tenant_id] = time.monotonic()
+            return self._governors[tenant_id]
+
+    def loaded_governor(self, tenant_id):
+        """The tenant's governor if it is loaded, else None; does not count as a use"""
+        with self._lock:
+            return self._governors.get(tenant_id)
+
+    def loaded_tenants(self):
+        """Tenant ids with a governor, least recently used first"""
+        with self._lock:
+            return list(self._governors)
+
+    def total_bytes(self):
+        with self._lock:
+            return sum(governor.total_bytes() for governor in self._governors.values())
+
+    def enforce(self, keep=None):
+        """Unload least recently used idle tenants (never ``keep``) until the total fits the budget"""
+        with self._lock:
+            now = time.monotonic()
+            for tenant_id in list(self._governors):
+                if self.total_bytes() <= self.total_budget_bytes:
+                    return
+                if tenant_id == keep or now - self._last_used[tenant_id] < self.idle_seconds:
+                    continue
+                governor = self._governors.pop(tenant_id)
+                freed = governor.total_bytes()
+                governor.release()
+                self.evictions.append({'tenant': tenant_id, 'freed_bytes': int(freed)})
+
+    def stats(self):
+        with self._lock:
+            return {
+                'total_budget_bytes': self.total_budget_bytes,
+                'usage_bytes': {tenant_id: governor.total_bytes() for tenant_id, governor in self._governors.items()},
+                'evictions': list(self.evictions),
+            }
@@ -0,0 +1,184 @@
+"""
+HyperLogLog distinct counts of campaigns and (campaign, state) pairs
+Every (date, platform) slice of the marketing data gets one HyperLogLog
+sketch per distinct count, built at load time. A sketch for any date range,
+platform subset or coarser time grain is the register-wise maximum of its
+slices' sketches, so "active campaigns this week" is a union rather than a
+sum of daily counts that would count a campaign once per day.
+
+With 2^precision registers the estimate has a relative standard error of
+1.04 / sqrt(2^precision): 1.6% at the default precision of 12, i.e. within
+about ±3.3% 95% of the time. Small counts use linear counting and are
+close to exact. Campaigns are identified by (platform, campaign) because
+campaign names are only unique within a platform.
+"""
+
+import numpy as np
+import pandas as pd
+
+from instrumentation import traced
+from quantile_sketches import partition_ids, splice_partitions
+from time_rollups import calendar_keys, period_starts
+
+DISTINCT_COUNTS = {
+    'campaigns': ['platform', 'campaign'],
+    'campaign_states': ['platform', 'campaign', 'state'],
+}
+SLICE_KEYS = ['date', 'platform']
+DEFAULT_PRECISION = 12
+DISTINCT_FRAMES = ['distinct_slices', 'distinct_registers']
+
+_GOLDEN = np.uint64(0x9E3779B97F4A7C15)
+
+
+def _mix(hashes):
+    """splitmix64 finalizer: spreads combined hashes over all 64 bits"""
+    hashes = (hashes ^ (hashes >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    hashes = (hashes ^ (hashes >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return hashes ^ (hashes >> np.uint64(31))
+
+
+def item_hashes(frame, columns):
+    """64-bit hash per row of the ``columns`` tuple
+
+    Each distinct value is hashed once (as a category) and the per-column
+    hashes are combined arithmetically, so no per-row strings or tuples are built.
+    """
+    combined = np.zeros(len(frame), dtype=np.uint64)
+    with np.errstate(over='ignore'):
+        for column in columns:
+            values = pd.Categorical(frame[column])
+            category_hashes = pd.util.hash_array(np.asarray(values.categories, dtype=object))
+            combined = _mix(combined * _GOLDEN + category_hashes[values.codes])
+    return combined
+
+
+def _bit_length(values):
+    """Exact bit length of uint64 values (float64 holds 53 bits, so the low 11 are handled apart)"""
+    high = values >> np.uint64(11)
+    return np.where(
+        high > 0,
+        np.frexp(high.astype(np.float64))[1] + 11,
+        np.frexp(values.astype(np.float64))[1]
+    )
+
+
+class DistinctSketches:
+    """HyperLogLog registers per (date, platform) slice, unioned on demand"""
+
+    def __init__(self, slices, registers, precision=DEFAULT_PRECISION):
+        self.slices = slices          # one row per slice: SLICE_KEYS
+        self.registers = registers    # slice, count (index into DISTINCT_COUNTS), register, rank (non-zero only)
+        self.precision = precision
+        self.n_registers = 1 << precision
+
+    @classmethod
+    def from_frames(cls, frames, **kwargs):
+        return cls(*(frames[name] for name in DISTINCT_FRAMES), **kwargs)
+
+    @property
+    def frames(self):
+        """{name: frame} for storing the sketches in the memory governor"""
+        return dict(zip(DISTINCT_FRAMES, [self.slices, self.registers]))
+
+    @property
+    def relative_standard_error(self):
+        return 1.04 / np.sqrt(self.n_registers)
+
+    @classmethod
+    @traced(name='DistinctSketches.build')
+    def build(cls, marketing_df, precision=DEFAULT_PRECISION):
+        """Sketch each distinct count for every (date, platform) slice in one vectorized pass"""
+        sketches = cls(None, None, precision)
+        slice_ids, slices = partition_ids(marketing_df, SLICE_KEYS)
+        m = sketches.n_registers
+
+        registers = []
+        for count_code, columns in enumerate(DISTINCT_COUNTS.values()):
+            hashes = item_hashes(marketing_df, columns)
+            register = (hashes >> np.uint64(64 - precision)).astype(np.int64)
+            # Rank of the first set bit after the register bits; the guard bit caps it at 64 - precision + 1
+            remaining = (hashes << np.uint64(precision)) | np.uint64(1 << (precision - 1))
+            rank = (65 - _bit_length(remaining)).astype(np.uint8)
+
+            dense = np.zeros(len(slices) * m, dtype=np.uint8)
+            np.maximum.at(dense, slice_ids.astype(np.int64) * m + register, rank)
+            occupied = np.flatnonzero(dense)
+            registers.append(pd.DataFrame({
+                'slice': (occupied // m).astype(np.int32),
+                'count': np.int8(count_code),
+                'register': (occupied % m).astype(np.int16),
+                'rank': dense[occupied],
+            }))
+
+        sketches.slices = slices
+        sketches.registers = pd.concat(registers, ignore_index=True)
+        return sketches
+
+    def replace_platform(self, platform, platform_df):
+        """Sketches with one platform's slices rebuilt from its rows; other slices are reused"""
+        part = DistinctSketches.build(platform_df, self.precision)
+        slices, tables = splice_partitions(
+            self.slices, {'registers': self.registers},
+            (self.slices['platform'] == platform).to_numpy(),
+            part.slices, {'registers': part.registers},
+            id_column='slice', sort_columns=['count']
+        )
+        return DistinctSketches(slices, tables['registers'], self.precision)
+
+    def estimate(self, count, by=None, start_date=None, end_date=None, filters=None, grain='day'):
+        """Estimated distinct ``count`` ('campaigns' or 'campaign_states') per ``by`` group
+
+        ``by`` is None, 'date', 'platform' or a list of them; dates are grouped
+        into periods of ``grain`` (labelled by their first day).
+        """
+        slices = self.slices
+        selected = np.ones(len(slices), dtype=bool)
+        if start_date is not None:
+            selected &= (slices['date'] >= pd.Timestamp(start_date)).to_numpy()
+        if end_date is not None:
+            selected &= (slices['date'] <= pd.Timestamp(end_date)).to_numpy()
+        for column, values in (filters or {}).items():
+            if values is not None:
+                selected &= slices[column].isin(values).to_numpy()
+
+        by = [by] if isinstance(by, str) else list(by or [])
+        keys = slices[by].copy()
+        if 'date' in by and grain != 'day':
+            keys['date'] = period_starts(calendar_keys(keys['date'], grain), grain)
+        if by:
+            group, labels = pd.MultiIndex.from_frame(keys).factorize(sort=True)
+            labels = labels.set_names(by)
+        else:
+            group, labels = np.zeros(len(slices), dtype=np.int64), None
+        n_groups = len(labels) if by else 1
+        # Unselected slices go to an extra group that is dropped below
+        group = np.where(selected, group, n_groups).astype(np.int64)
+
+        m = self.n_registers
+        count_code = list(DISTINCT_COUNTS).index(count)
+        registers = self.registers[self.registers['count'].to_numpy() == count_code]
+        dense = np.zeros((n_groups + 1) * m, dtype=np.uint8)
+        np.maximum.at(
+            dense,
+            group[registers['slice'].to_numpy()] * m + registers['register'].to_numpy(),
+            registers['rank'].to_numpy()
+        )
+        dense = dense.reshape(n_groups + 1, m)[:-1]
+
+        estimates = self._cardinality(dense)
+        has_rows = np.bincount(group, minlength=n_groups + 1)[:-1] > 0
+        if not by:
+            return pd.DataFrame({count: estimates[has_rows]})
+        result = labels.to_frame(index=False)
+        result[count] = estimates
+        return result[has_rows].reset_index(drop=True)
+
+    def _cardinality(self, dense):
+        """HyperLogLog estimate per row of registers, with linear counting for small counts"""
+        m = self.n_registers
+        alpha = 0.7213 / (1 + 1.079 / m)
+        raw = alpha * m * m / np.exp2(-dense.astype(np.float64)).sum(axis=1)
+        zeros = (dense == 0).sum(axis=1)
+        linear = m * np.log(m / np.maximum(zeros, 1))
+        return np.round(np.where((raw <= 2.5 * m) & (zeros > 0), linear, raw))
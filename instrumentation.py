@@ -0,0 +1,183 @@
+"""
+Lightweight span instrumentation for hot paths
+Functions decorated with ``@traced`` and blocks wrapped in ``with span(...)``
+record wall time, rows in/out and net allocated bytes, but only while a
+``SpanRecorder`` is active for the current thread (one Streamlit rerun), so the
+cost when profiling is off is a single context-variable lookup.
+
+Recorded spans can be exported as JSON lines or as a Chrome trace file
+(chrome://tracing, Perfetto) for offline profiling.
+"""
+
+import contextvars
+import functools
+import json
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+import pandas as pd
+
+_active_recorder = contextvars.ContextVar('active_span_recorder', default=None)
+
+# tracemalloc is process-wide; keep it running while any recorder needs it
+_tracemalloc_lock = threading.Lock()
+_tracemalloc_users = 0
+_tracemalloc_owned = False
+
+
+def _acquire_tracemalloc():
+    global _tracemalloc_users, _tracemalloc_owned
+    with _tracemalloc_lock:
+        if _tracemalloc_users == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _tracemalloc_owned = True
+        _tracemalloc_users += 1
+
+
+def _release_tracemalloc():
+    global _tracemalloc_users, _tracemalloc_owned
+    with _tracemalloc_lock:
+        _tracemalloc_users -= 1
+        if _tracemalloc_users == 0 and _tracemalloc_owned:
+            tracemalloc.stop()
+            _tracemalloc_owned = False
+
+
+def count_rows(value):
+    """Row count of a DataFrame/Series, or the sum over a tuple/list/dict of them"""
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return len(value)
+    if isinstance(value, dict):
+        value = list(value.values())
+    if isinstance(value, (tuple, list)):
+        counts = [count_rows(item) for item in value]
+        counts = [count for count in counts if count is not None]
+        return sum(counts) if counts else None
+    return None
+
+
+class SpanRecorder:
+    """Collects the spans of one run (e.g. one dashboard rerun)"""
+
+    def __init__(self, run_name='run', track_memory=True):
+        self.run_name = run_name
+        self.track_memory = track_memory
+        self.spans = []
+        self.started_at = time.time()
+        self._origin = time.perf_counter()
+        self._depth = 0
+        self._token = None
+
+    def __enter__(self):
+        if self.track_memory:
+            _acquire_tracemalloc()
+        self._token = _active_recorder.set(self)
+        return self
+
+    def __exit__(self, *exc_info):
+        _active_recorder.reset(self._token)
+        if self.track_memory:
+            _release_tracemalloc()
+        return False
+
+    @contextmanager
+    def span(self, name, rows_in=None):
+        record = {
+            'name': name,
+            'depth': self._depth,
+            'start_ms': (time.perf_counter() - self._origin) * 1000,
+            'rows_in': rows_in,
+            'rows_out': None,
+            'thread': threading.get_ident(),
+        }
+        memory_before = tracemalloc.get_traced_memory()[0] if tracemalloc.is_tracing() else None
+        self._depth += 1
+        start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record['duration_ms'] = (time.perf_counter() - start) * 1000
+            self._depth -= 1
+            if memory_before is not None and tracemalloc.is_tracing():
+                record['allocated_bytes'] = tracemalloc.get_traced_memory()[0] - memory_before
+            else:
+                record['allocated_bytes'] = None
+            self.spans.append(record)
+
+    def to_frame(self):
+        columns = ['name', 'depth', 'start_ms', 'duration_ms', 'rows_in', 'rows_out', 'allocated_bytes']
+        if not self.spans:
+            return pd.DataFrame(columns=columns)
+        return pd.DataFrame(self.spans).sort_values('start_ms')[columns].reset_index(drop=True)
+
+    def to_jsonl(self):
+        """One JSON object per span, tagged with the run name and wall-clock start"""
+        lines = []
+        for record in sorted(self.spans, key=lambda record: record['start_ms']):
+            lines.append(json.dumps({'run': self.run_name, 'run_started_at': self.started_at, **record}))
+        return '\n'.join(lines) + '\n'
+
+    def to_chrome_trace(self):
+        """Chrome trace-event JSON with one complete ("X") event per span"""
+        events = [{
+            'name': record['name'],
+            'cat': self.run_name,
+            'ph': 'X',
+            'ts': record['start_ms'] * 1000,
+            'dur': record['duration_ms'] * 1000,
+            'pid': os.getpid(),
+            'tid': record['thread'],
+            'args': {
+                'rows_in': record['rows_in'],
+                'rows_out': record['rows_out'],
+                'allocated_bytes': record['allocated_bytes'],
+            },
+        } for record in self.spans]
+        return json.dumps({'traceEvents': events, 'displayTimeUnit': 'ms'})
+
+
+def current_recorder():
+    return _active_recorder.get()
+
+
+@contextmanager
+def span(name, rows_in=None):
+    """Record a block as a span; yields the span dict (or None when not recording)
+
+    Set ``record['rows_out']`` inside the block to report output rows.
+    """
+    recorder = _active_recorder.get()
+    if recorder is None:
+        yield None
+        return
+    with recorder.span(name, rows_in) as record:
+        yield record
+
+
+def traced(func=None, *, name=None):
+    """Decorator recording a span per call, with rows from the first DataFrame argument and the result"""
+    if func is None:
+        return functools.partial(traced, name=name)
+
+    span_name = name or func.__qualname__
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        recorder = _active_recorder.get()
+        if recorder is None:
+            return func(*args, **kwargs)
+
+        rows_in = next((count_rows(arg) for arg in args if isinstance(arg, pd.DataFrame)), None)
+        if rows_in is None and args and isinstance(getattr(args[0], 'marketing_df', None), pd.DataFrame):
+            # MarketingAnalyzer methods: report the analyzer's marketing rows
+            rows_in = len(args[0].marketing_df)
+
+        with recorder.span(span_name, rows_in) as record:
+            result = func(*args, **kwargs)
+            record['rows_out'] = count_rows(result)
+        return result
+
+    return wrapper
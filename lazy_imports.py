@@ -0,0 +1,66 @@
+"""
+Deferred imports for heavy optional modules
+``lazy_import('plotly.express')`` returns a stand-in that imports the real module
+on first attribute access, so Plotly/SciPy are only loaded by the code paths that
+actually use them.
+"""
+
+import importlib
+import importlib.metadata
+import importlib.util
+import sys
+
+
+class LazyModule:
+    """Module proxy that imports ``name`` the first time an attribute is read"""
+
+    def __init__(self, name):
+        self.__dict__['_name'] = name
+        self.__dict__['_module'] = None
+
+    def _load(self):
+        module = self.__dict__['_module']
+        if module is None:
+            module = importlib.import_module(self.__dict__['_name'])
+            self.__dict__['_module'] = module
+        return module
+
+    def __getattr__(self, attribute):
+        return getattr(self._load(), attribute)
+
+    def __setattr__(self, attribute, value):
+        setattr(self._load(), attribute, value)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self):
+        state = 'loaded' if self.__dict__['_module'] is not None else 'not loaded'
+        return f"<lazy module '{self.__dict__['_name']}' ({state})>"
+
+
+def lazy_import(name):
+    """Return the module if it is already imported, otherwise a lazy proxy for it"""
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    return LazyModule(name)
+
+
+def is_loaded(module):
+    """Whether ``module`` (a module or lazy proxy) has actually been imported"""
+    if isinstance(module, LazyModule):
+        return module.__dict__['_module'] is not None
+    return True
+
+
+def find_missing_packages(packages):
+    """Distribution names from ``packages`` that are not installed, without importing them"""
+    missing = []
+    for package in packages:
+        try:
+            importlib.metadata.version(package)
+        except importlib.metadata.PackageNotFoundError:
+            if importlib.util.find_spec(package) is None:
+                missing.append(package)
+    return missing
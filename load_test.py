@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Headless concurrent-session load test for the Streamlit dashboard
+Each simulated session is a Streamlit AppTest running marketing_dashboard.py in
+this process (so sessions share cached data, as on one server) and applying
+random date-range and platform filter changes. Reports rerun latency
+percentiles, throughput and process RSS; no browser or network is needed.
+
+    python load_test.py --sessions 8 --reruns 20 --output load/8-sessions.json
+"""
+
+import argparse
+import json
+import random
+import resource
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from pathlib import Path
+
+import numpy as np
+
+APP_PATH = Path(__file__).resolve().parent / 'marketing_dashboard.py'
+PLATFORMS = ['Facebook', 'Google', 'TikTok']
+
+
+def current_rss_bytes():
+    """Resident set size of this process (Linux /proc, falling back to peak RSS)"""
+    try:
+        with open('/proc/self/statm') as f:
+            pages = int(f.read().split()[1])
+        return pages * resource.getpagesize()
+    except OSError:
+        return peak_rss_bytes()
+
+
+def peak_rss_bytes():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is kilobytes on Linux and bytes on macOS
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+class RssSampler(threading.Thread):
+    """Background thread sampling RSS at a fixed interval"""
+
+    def __init__(self, interval=0.1):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.samples = []
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.is_set():
+            self.samples.append(current_rss_bytes())
+            self._stop_event.wait(self.interval)
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+
+def random_filters(rng, min_date, max_date):
+    """A realistic filter change: a random date window and a non-empty platform subset"""
+    days = (max_date - min_date).days
+    start_offset = rng.randint(0, max(days - 7, 0))
+    end_offset = rng.randint(min(start_offset + 7, days), days)
+    platforms = rng.sample(PLATFORMS, rng.randint(1, len(PLATFORMS)))
+    return (
+        min_date + timedelta(days=start_offset),
+        min_date + timedelta(days=end_offset),
+    ), sorted(platforms)
+
+
+def run_session(session_id, reruns, think_time, seed, timeout):
+    """Drive one session: an initial load, then ``reruns`` filter changes"""
+    from streamlit.testing.v1 import AppTest
+
+    rng = random.Random(seed + session_id)
+    latencies = []
+    errors = 0
+
+    app = AppTest.from_file(str(APP_PATH), default_timeout=timeout)
+    start = time.perf_counter()
+    app.run()
+    latencies.append(time.perf_counter() - start)
+    if app.exception:
+        return {'session': session_id, 'latencies': latencies, 'errors': 1}
+
+    date_input = app.sidebar.date_input[0]
+    min_date, max_date = date_input.min, date_input.max
+
+    for _ in range(reruns):
+        if think_time:
+            time.sleep(rng.uniform(0, think_time))
+
+        date_range, platforms = random_filters(rng, min_date, max_date)
+        app.sidebar.date_input[0].set_value(date_range)
+        app.sidebar.multiselect[0].set_value(platforms)
+
+        start = time.perf_counter()
+        try:
+            app.run()
+        except Exception:
+            errors += 1
+            continue
+        latencies.append(time.perf_counter() - start)
+        errors += bool(app.exception)
+
+    return {'session': session_id, 'latencies': latencies, 'errors': errors}
+
+
+def run_load_test(sessions=4, reruns=10, think_time=0.0, seed=42, timeout=120):
+    """Run ``sessions`` concurrent sessions and summarize rerun latency, throughput and RSS"""
+    sampler = RssSampler()
+    rss_before = current_rss_bytes()
+    sampler.start()
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=sessions) as executor:
+        session_results = list(executor.map(
+            lambda session_id: run_session(session_id, reruns, think_time, seed, timeout),
+            range(sessions)
+        ))
+    elapsed = time.perf_counter() - start
+    sampler.stop()
+
+    # Each session's first run is a cold page load; report it separately from reruns
+    first_loads = np.array([result['latencies'][0] for result in session_results if result['latencies']])
+    rerun_latencies = np.concatenate([
+        np.array(result['latencies'][1:]) for result in session_results
+    ]) if session_results else np.array([])
+    total_runs = sum(len(result['latencies']) for result in session_results)
+
+    def percentiles(values):
+        if len(values) == 0:
+            return {'p50': None, 'p95': None, 'p99': None, 'max': None}
+        p50, p95, p99 = np.percentile(values, [50, 95, 99])
+        return {'p50': p50, 'p95': p95, 'p99': p99, 'max': values.max()}
+
+    return {
+        'sessions': sessions,
+        'reruns_per_session': reruns,
+        'think_time_seconds': think_time,
+        'elapsed_seconds': elapsed,
+        'total_runs': total_runs,
+        'errors': sum(result['errors'] for result in session_results),
+        'throughput_runs_per_second': total_runs / elapsed if elapsed else None,
+        'first_load_seconds': percentiles(first_loads),
+        'rerun_latency_seconds': percentiles(rerun_latencies),
+        'rss_bytes': {
+            'before': rss_before,
+            'mean': float(np.mean(sampler.samples)) if sampler.samples else None,
+            'max': max(sampler.samples) if sampler.samples else None,
+            'peak': peak_rss_bytes(),
+        },
+    }
+
+
+def print_report(report):
+    latency = report['rerun_latency_seconds']
+    print(f"📊 {report['sessions']} sessions x {report['reruns_per_session']} reruns "
+          f"in {report['elapsed_seconds']:.1f}s ({report['errors']} errors)")
+    if latency['p50'] is not None:
+        print(f"   Rerun latency p50 {latency['p50'] * 1000:.0f} ms, p95 {latency['p95'] * 1000:.0f} ms, "
+              f"p99 {latency['p99'] * 1000:.0f} ms, max {latency['max'] * 1000:.0f} ms")
+    print(f"   First load p50 {report['first_load_seconds']['p50']:.2f}s")
+    print(f"   Throughput {report['throughput_runs_per_second']:.1f} runs/s")
+    print(f"   RSS mean {report['rss_bytes']['mean'] / 1e6:.0f} MB, max {report['rss_bytes']['max'] / 1e6:.0f} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the dashboard with concurrent headless sessions")
+    parser.add_argument("--sessions", type=int, default=4, help="Concurrent simulated sessions")
+    parser.add_argument("--reruns", type=int, default=10, help="Filter changes per session")
+    parser.add_argument("--think-time", type=float, default=0.0, help="Max random pause between reruns (seconds)")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed for filter choices")
+    parser.add_argument("--timeout", type=float, default=120, help="Per-run timeout (seconds)")
+    parser.add_argument("--max-p95", type=float, help="Fail if rerun p95 latency exceeds this many seconds")
+    parser.add_argument("--output", help="Write the report to this JSON file")
+    args = parser.parse_args()
+
+    report = run_load_test(args.sessions, args.reruns, args.think_time, args.seed, args.timeout)
+    print_report(report)
+
+    if args.output:
+        Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2, default=float)
+        print(f"Report saved to {args.output}")
+
+    if report['errors']:
+        sys.exit(1)
+    p95 = report['rerun_latency_seconds']['p95']
+    if args.max_p95 is not None and p95 is not None and p95 > args.max_p95:
+        print(f"⚠️  Rerun p95 {p95:.2f}s exceeds {args.max_p95:.2f}s")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
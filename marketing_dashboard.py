@@ -1,12 +1,49 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-import plotly.express as px
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
+from contextlib import nullcontext
+from functools import partial
+from instrumentation import SpanRecorder, traced
+from lazy_imports import lazy_import
+from dataset_catalog import TenantCache
+from data_validation import quarantine_summary
+from data_processing import (
+    PLATFORM_FILES,
+    filter_data,
+    calculate_kpis,
+    calculate_platform_metrics,
+    create_campaign_analysis,
+    create_tactic_analysis,
+    create_dimension_analysis,
+    create_geographic_analysis,
+)
+from approximate_query import estimate, submit_exact
+from bitmap_index import BITMAP_FRAMES, BitmapIndex
+from campaign_dimensions import DIMENSION_LABELS, mismatched_campaigns
+from campaign_index import CampaignIndex
+from data_snapshot import DATE_COLS, DEFAULT_VIEW_ANALYSES, build_frames, load_snapshot
+from distinct_sketches import DISTINCT_FRAMES, DistinctSketches
+from quantile_sketches import SKETCH_FRAMES, SKETCH_METRICS, QuantileSketches
+from source_watcher import DEFAULT_POLL_SECONDS, SourceWatcher, refresh_frames
+from table_export import EXPORT_FORMATS, export_file_name, submit_export
+from time_rollups import GRAINS, ROLLUP_SOURCES, rollup_name, select_rollup, source_rollups
 import warnings
 warnings.filterwarnings('ignore')
 
+# Heavy modules load on first use rather than at app start
+px = lazy_import('plotly.express')
+go = lazy_import('plotly.graph_objects')
+plotly_subplots = lazy_import('plotly.subplots')
+media_mix_model = lazy_import('media_mix_model')
+advanced_analysis = lazy_import('advanced_analysis')
+marketing_intel = lazy_import('marketing_intel')
+
+GRAIN_LABELS = {'day': 'Daily', 'week': 'Weekly', 'month': 'Monthly', 'quarter': 'Quarterly'}
+# Sidebar multiselects resolved through the bitmap index
+FILTER_LABELS = {'tactic': 'Tactics', 'state': 'States', 'campaign': 'Campaigns', 'campaign_type': 'Campaign Types'}
+# Tenants with at least this many marketing rows default to progressive loading
+PROGRESSIVE_MIN_ROWS = 1_000_000
+
 # Page configuration
 st.set_page_config(
     page_title="Marketing Intelligence Dashboard",
@@ -41,89 +78,175 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-@st.cache_data
-def load_data():
-    """Load and process all marketing and business data"""
+@st.cache_resource
+def get_tenant_cache():
+    """Process-wide per-tenant governors holding the data and analysis results shared by all sessions"""
+    return TenantCache.from_env()
+
+@st.cache_resource
+def get_source_watcher(tenant_id):
+    """Background watcher that refreshes the tenant's loaded frames when its CSV files change"""
+    tenant_cache = get_tenant_cache()
+    tenant = tenant_cache.tenants[tenant_id]
+    
+    def refresh(changed):
+        # An unloaded tenant has nothing to refresh; it reads the new files on its next load
+        governor = tenant_cache.loaded_governor(tenant_id)
+        if governor is not None:
+            governor.replace_frames(refresh_frames(governor.all_frames(), changed, tenant.data_dir), DATE_COLS)
+    
+    return SourceWatcher(tenant.data_dir).start(refresh)
+
+@st.fragment(run_every=DEFAULT_POLL_SECONDS)
+def watch_data_version(tenant_id):
+    """Rerun the page when the tenant's data was refreshed since this session last rendered it"""
+    governor = get_tenant_cache().loaded_governor(tenant_id)
+    if governor is not None and governor.version != st.session_state.get('data_version'):
+        st.session_state['data_refreshed'] = True
+        st.rerun()
+
+@traced(name='load_data')
+def load_data(tenant_id):
+    """Load and process one tenant's marketing and business data into its memory governor"""
+    tenant_cache = get_tenant_cache()
+    tenant = tenant_cache.tenants[tenant_id]
+    governor = tenant_cache.governor(tenant_id)
+    
+    def load_frames():
+        # A snapshot baked at image build time (deploy.py compile) skips parsing and pre-aggregation
+        snapshot = load_snapshot(tenant.data_dir, tenant.snapshot_dir)
+        if snapshot is None:
+            return build_frames(tenant.data_dir)
+        frames, results = snapshot
+        for key, result in results.items():
+            governor.store_result(key, result)
+        return frames
+    
     try:
-        # Load business data
-        business_df = pd.read_csv('business.csv')
-        business_df['date'] = pd.to_datetime(business_df['date'])
-        
-        # Load marketing data
-        facebook_df = pd.read_csv('Facebook.csv')
-        facebook_df['date'] = pd.to_datetime(facebook_df['date'])
-        facebook_df['platform'] = 'Facebook'
-        
-        google_df = pd.read_csv('Google.csv')
-        google_df['date'] = pd.to_datetime(google_df['date'])
-        google_df['platform'] = 'Google'
-        
-        tiktok_df = pd.read_csv('TikTok.csv')
-        tiktok_df['date'] = pd.to_datetime(tiktok_df['date'])
-        tiktok_df['platform'] = 'TikTok'
-        
-        # Combine all marketing data
-        marketing_df = pd.concat([facebook_df, google_df, tiktok_df], ignore_index=True)
-        
-        # Calculate additional metrics
-        marketing_df['ctr'] = (marketing_df['clicks'] / marketing_df['impression'] * 100).round(2)
-        marketing_df['cpc'] = (marketing_df['spend'] / marketing_df['clicks']).round(2)
-        marketing_df['roas'] = (marketing_df['attributed revenue'] / marketing_df['spend']).round(2)
-        marketing_df['cpm'] = (marketing_df['spend'] / marketing_df['impression'] * 1000).round(2)
-        
-        # Business metrics
-        business_df['aov'] = (business_df['total revenue'] / business_df['# of orders']).round(2)
-        business_df['conversion_rate'] = (business_df['# of new orders'] / business_df['# of orders'] * 100).round(2)
-        business_df['profit_margin'] = (business_df['gross profit'] / business_df['total revenue'] * 100).round(2)
-        
-        return business_df, marketing_df
+        governor.load_frames(load_frames, date_cols=DATE_COLS)
     except Exception as e:
         st.error(f"Error loading data: {str(e)}")
-        return None, None
+        return None
+    tenant_cache.enforce(keep=tenant_id)
+    return governor
+
+@traced
+def create_data_quality_panel(quarantine_df):
+    """Summary of rows quarantined at ingest, shown only when there are any"""
+    if quarantine_df.empty:
+        return
+    
+    with st.expander(f"🧹 {len(quarantine_df):,} rows quarantined by data validation"):
+        col1, col2 = st.columns([1, 2])
+        
+        with col1:
+            st.dataframe(quarantine_summary(quarantine_df), use_container_width=True)
+        
+        with col2:
+            st.dataframe(quarantine_df.head(100), use_container_width=True)
+            st.download_button(
+                "Download quarantined rows (CSV)",
+                quarantine_df.to_csv(index=False),
+                file_name='quarantined_rows.csv',
+                mime='text/csv'
+            )
 
+@traced
 def create_kpi_cards(business_df, marketing_df):
     """Create KPI cards for key metrics"""
+    kpis = calculate_kpis(business_df, marketing_df)
     col1, col2, col3, col4 = st.columns(4)
     
     with col1:
-        total_revenue = business_df['total revenue'].sum()
         st.metric(
             label="Total Revenue",
-            value=f"${total_revenue:,.0f}",
-            delta=f"{business_df['total revenue'].pct_change().mean()*100:.1f}%"
+            value=f"${kpis['total_revenue']:,.0f}",
+            delta=f"{kpis['revenue_delta_pct']:.1f}%"
         )
     
     with col2:
-        total_spend = marketing_df['spend'].sum()
         st.metric(
             label="Total Ad Spend",
-            value=f"${total_spend:,.0f}",
-            delta=f"{marketing_df['spend'].pct_change().mean()*100:.1f}%"
+            value=f"${kpis['total_spend']:,.0f}",
+            delta=f"{kpis['spend_delta_pct']:.1f}%"
         )
     
     with col3:
-        total_roas = marketing_df['attributed revenue'].sum() / marketing_df['spend'].sum()
         st.metric(
             label="Overall ROAS",
-            value=f"{total_roas:.2f}x",
-            delta=f"{marketing_df['roas'].mean():.2f}x avg"
+            value=f"{kpis['overall_roas']:.2f}x",
+            delta=f"{kpis['average_roas']:.2f}x avg"
         )
     
     with col4:
-        total_orders = business_df['# of orders'].sum()
         st.metric(
             label="Total Orders",
-            value=f"{total_orders:,}",
-            delta=f"{business_df['# of orders'].pct_change().mean()*100:.1f}%"
+            value=f"{kpis['total_orders']:,}",
+            delta=f"{kpis['orders_delta_pct']:.1f}%"
+        )
+
+@traced
+def create_approximate_kpi_cards(business_df, totals):
+    """KPI cards with ad spend and ROAS estimated from the marketing sample, ± their 95% margins"""
+    help_text = "Estimated from a stratified sample of the marketing rows; ± is the 95% confidence margin"
+    col1, col2, col3, col4 = st.columns(4)
+    
+    with col1:
+        st.metric(label="Total Revenue", value=f"${business_df['total revenue'].sum():,.0f}")
+    
+    with col2:
+        st.metric(
+            label="Total Ad Spend",
+            value=f"≈ ${totals['spend']:,.0f}",
+            delta=f"± ${totals['spend_margin']:,.0f}",
+            delta_color='off',
+            help=help_text
+        )
+    
+    with col3:
+        st.metric(
+            label="Overall ROAS",
+            value=f"≈ {totals['roas']:.2f}x",
+            delta=f"± {totals['roas_margin']:.2f}x",
+            delta_color='off',
+            help=help_text
         )
+    
+    with col4:
+        st.metric(label="Total Orders", value=f"{business_df['# of orders'].sum():,}")
 
-def create_revenue_trend_chart(business_df):
-    """Create revenue trend chart"""
+@traced
+def create_reach_cards(distinct_sketches, start_date=None, end_date=None, platforms=None):
+    """Distinct campaign and campaign x state counts for the selection, unioned from HyperLogLog sketches"""
+    filters = {'platform': platforms}
+    bound = 2 * distinct_sketches.relative_standard_error * 100
+    help_text = f"HyperLogLog estimate: within ±{bound:.1f}% of the exact count 95% of the time"
+    col1, col2 = st.columns(2)
+    
+    for col, count, label in [(col1, 'campaigns', "Active Campaigns"), (col2, 'campaign_states', "Campaign × State Reach")]:
+        estimate = distinct_sketches.estimate(count, None, start_date, end_date, filters)[count]
+        with col:
+            st.metric(label=label, value=f"{estimate.sum():,.0f}", help=help_text)
+
+@traced
+def create_reach_trend_chart(reach_trend, grain='day'):
+    """Active campaigns per period and platform from unioned HyperLogLog sketches"""
+    fig = px.line(
+        reach_trend, x='date', y='campaigns', color='platform', markers=True,
+        title=f'{GRAIN_LABELS[grain]} Active Campaigns by Platform',
+        labels={'date': 'Period', 'campaigns': 'Active campaigns (est.)'}
+    )
+    fig.update_layout(hovermode='x unified')
+    return fig
+
+@traced
+def create_revenue_trend_chart(business_trend, grain='day'):
+    """Create revenue trend chart from a business rollup table"""
     fig = go.Figure()
     
     fig.add_trace(go.Scatter(
-        x=business_df['date'],
-        y=business_df['total revenue'],
+        x=business_trend['period_start'],
+        y=business_trend['total revenue'],
         mode='lines+markers',
         name='Total Revenue',
         line=dict(color='#1f77b4', width=3),
@@ -131,8 +254,8 @@ def create_revenue_trend_chart(business_df):
     ))
     
     fig.add_trace(go.Scatter(
-        x=business_df['date'],
-        y=business_df['gross profit'],
+        x=business_trend['period_start'],
+        y=business_trend['gross profit'],
         mode='lines+markers',
         name='Gross Profit',
         line=dict(color='#ff7f0e', width=3),
@@ -140,7 +263,7 @@ def create_revenue_trend_chart(business_df):
     ))
     
     fig.update_layout(
-        title="Revenue & Profit Trends",
+        title=f"{GRAIN_LABELS[grain]} Revenue & Profit Trends",
         xaxis_title="Date",
         yaxis_title="Amount ($)",
         hovermode='x unified',
@@ -149,19 +272,15 @@ def create_revenue_trend_chart(business_df):
     
     return fig
 
-def create_marketing_performance_chart(marketing_df):
-    """Create marketing performance by platform"""
-    platform_metrics = marketing_df.groupby('platform').agg({
-        'spend': 'sum',
-        'attributed revenue': 'sum',
-        'clicks': 'sum',
-        'impression': 'sum'
-    }).reset_index()
-    
-    platform_metrics['roas'] = platform_metrics['attributed revenue'] / platform_metrics['spend']
-    platform_metrics['ctr'] = (platform_metrics['clicks'] / platform_metrics['impression'] * 100)
-    
-    fig = make_subplots(
+@traced
+def create_marketing_performance_chart(marketing_df, approximate=False):
+    """Create marketing performance by platform; ``approximate`` estimates it from the marketing sample with 95% error bars"""
+    platform_metrics = estimate(marketing_df, ['platform']) if approximate else calculate_platform_metrics(marketing_df)
+    
+    def error_bars(metric):
+        return dict(type='data', array=platform_metrics[f'{metric}_margin']) if approximate else None
+    
+    fig = plotly_subplots.make_subplots(
         rows=2, cols=2,
         subplot_titles=('Spend by Platform', 'ROAS by Platform', 'Clicks by Platform', 'CTR by Platform'),
         specs=[[{"type": "bar"}, {"type": "bar"}],
@@ -170,77 +289,218 @@ def create_marketing_performance_chart(marketing_df):
     
     # Spend
     fig.add_trace(
-        go.Bar(x=platform_metrics['platform'], y=platform_metrics['spend'], name='Spend', marker_color='#1f77b4'),
+        go.Bar(x=platform_metrics['platform'], y=platform_metrics['spend'], name='Spend', marker_color='#1f77b4', error_y=error_bars('spend')),
         row=1, col=1
     )
     
     # ROAS
     fig.add_trace(
-        go.Bar(x=platform_metrics['platform'], y=platform_metrics['roas'], name='ROAS', marker_color='#ff7f0e'),
+        go.Bar(x=platform_metrics['platform'], y=platform_metrics['roas'], name='ROAS', marker_color='#ff7f0e', error_y=error_bars('roas')),
         row=1, col=2
     )
     
     # Clicks
     fig.add_trace(
-        go.Bar(x=platform_metrics['platform'], y=platform_metrics['clicks'], name='Clicks', marker_color='#2ca02c'),
+        go.Bar(x=platform_metrics['platform'], y=platform_metrics['clicks'], name='Clicks', marker_color='#2ca02c', error_y=error_bars('clicks')),
         row=2, col=1
     )
     
     # CTR
     fig.add_trace(
-        go.Bar(x=platform_metrics['platform'], y=platform_metrics['ctr'], name='CTR', marker_color='#d62728'),
+        go.Bar(x=platform_metrics['platform'], y=platform_metrics['ctr'], name='CTR', marker_color='#d62728', error_y=error_bars('ctr')),
         row=2, col=2
     )
     
     fig.update_layout(height=600, showlegend=False)
     return fig
 
-def create_campaign_analysis(marketing_df):
-    """Create campaign performance analysis"""
-    campaign_metrics = marketing_df.groupby(['platform', 'campaign']).agg({
-        'spend': 'sum',
-        'attributed revenue': 'sum',
-        'clicks': 'sum',
-        'impression': 'sum',
-        'roas': 'mean'
-    }).reset_index()
-    
-    campaign_metrics['roi'] = ((campaign_metrics['attributed revenue'] - campaign_metrics['spend']) / campaign_metrics['spend'] * 100).round(2)
-    campaign_metrics = campaign_metrics.sort_values('roi', ascending=False)
-    
-    return campaign_metrics
+@traced
+def create_marketing_trend_chart(marketing_trend, grain='day'):
+    """Spend and ROAS over time by platform from a marketing rollup table"""
+    fig = plotly_subplots.make_subplots(
+        rows=2, cols=1, shared_xaxes=True, vertical_spacing=0.08,
+        subplot_titles=(f'{GRAIN_LABELS[grain]} Spend by Platform', f'{GRAIN_LABELS[grain]} ROAS by Platform')
+    )
+    
+    for platform, platform_trend in marketing_trend.groupby('platform', observed=True):
+        fig.add_trace(
+            go.Bar(x=platform_trend['period_start'], y=platform_trend['spend'], name=platform, legendgroup=platform),
+            row=1, col=1
+        )
+        fig.add_trace(
+            go.Scatter(x=platform_trend['period_start'], y=platform_trend['roas'], name=platform,
+                       legendgroup=platform, showlegend=False, mode='lines+markers'),
+            row=2, col=1
+        )
+    
+    fig.update_layout(barmode='stack', height=500, hovermode='x unified')
+    return fig
 
-def create_tactic_analysis(marketing_df):
-    """Analyze performance by marketing tactic"""
-    tactic_metrics = marketing_df.groupby(['platform', 'tactic']).agg({
-        'spend': 'sum',
-        'attributed revenue': 'sum',
-        'roas': 'mean',
-        'ctr': 'mean'
-    }).reset_index()
-    
-    return tactic_metrics
+@traced
+def create_distribution_chart(sketches, metric, kind, start_date=None, end_date=None, filters=None):
+    """Box or violin plot per platform from merged quantile sketches; only summary statistics reach the browser"""
+    fig = go.Figure()
+    
+    if kind == 'Box':
+        stats = sketches.box_stats(metric, 'platform', start_date, end_date, filters)
+        for row in stats.itertuples(index=False):
+            fig.add_trace(go.Box(
+                name=row.platform, x=[row.platform],
+                q1=[row.q1], median=[row.median], q3=[row.q3],
+                lowerfence=[row.lowerfence], upperfence=[row.upperfence], mean=[row.mean]
+            ))
+    else:
+        # A violin's density is estimated from evenly spaced quantiles instead of every row
+        quantiles = sketches.quantiles(metric, np.linspace(0, 1, 101), 'platform', start_date, end_date, filters)
+        for platform, values in quantiles.dropna().iterrows():
+            fig.add_trace(go.Violin(
+                name=platform, x=[platform] * len(values), y=values.to_numpy(),
+                points=False, box_visible=True, meanline_visible=True
+            ))
+    
+    fig.update_layout(title=f'{metric.upper()} Distribution by Platform', yaxis_title=metric.upper(), showlegend=False)
+    return fig
 
-def create_geographic_analysis(marketing_df):
-    """Analyze performance by state"""
-    geo_metrics = marketing_df.groupby('state').agg({
-        'spend': 'sum',
-        'attributed revenue': 'sum',
-        'clicks': 'sum',
-        'roas': 'mean'
-    }).reset_index()
-    
-    return geo_metrics
+@traced
+def create_campaign_drilldown(campaign_index, platform, campaign, start_date=None, end_date=None):
+    """Daily spend, revenue and ROAS plus the state mix of one campaign"""
+    daily = campaign_index.daily_series(platform, campaign, start_date, end_date)
+    states = campaign_index.state_mix(platform, campaign, start_date, end_date)
+    
+    st.subheader(f"🔎 {campaign} ({platform})")
+    col1, col2 = st.columns([2, 1])
+    
+    with col1:
+        fig = plotly_subplots.make_subplots(specs=[[{"secondary_y": True}]])
+        fig.add_trace(go.Bar(x=daily['date'], y=daily['spend'], name='Spend', marker_color='#1f77b4'))
+        fig.add_trace(go.Bar(x=daily['date'], y=daily['attributed revenue'], name='Attributed Revenue', marker_color='#2ca02c'))
+        fig.add_trace(
+            go.Scatter(x=daily['date'], y=daily['roas'], name='ROAS', mode='lines+markers', line=dict(color='#ff7f0e')),
+            secondary_y=True
+        )
+        fig.update_layout(title='Daily Spend, Revenue & ROAS', barmode='group', hovermode='x unified', height=400)
+        fig.update_yaxes(title_text="Amount ($)", secondary_y=False)
+        fig.update_yaxes(title_text="ROAS", secondary_y=True)
+        st.plotly_chart(fig, use_container_width=True)
+    
+    with col2:
+        fig_states = px.pie(states, values='spend', names='state', title='Spend by State', hole=0.4)
+        st.plotly_chart(fig_states, use_container_width=True)
 
-def main():
+@traced(name='load_media_mix_model')
+def load_media_mix_model(governor):
+    """Load the fitted marketing mix model from disk, fitting only when the data changed"""
+    return governor.cached(
+        ('load_media_mix_model',),
+        lambda: media_mix_model.load_or_fit_mmm(
+            governor.get_frame('business_df'), governor.get_frame('marketing_df'),
+            facts=governor.get_frame('daily_facts')
+        )
+    )
+
+@traced
+def create_mmm_contribution_chart(contributions):
+    """Create stacked daily revenue contribution chart from the marketing mix model"""
+    fig = go.Figure()
+    
+    for column in contributions.columns:
+        fig.add_trace(go.Scatter(
+            x=contributions.index,
+            y=contributions[column],
+            mode='lines',
+            name=column.title() if column == 'baseline' else column,
+            stackgroup='one'
+        ))
+    
+    fig.update_layout(
+        title="Modeled Daily Revenue Contribution",
+        xaxis_title="Date",
+        yaxis_title="Revenue ($)",
+        hovermode='x unified',
+        height=400
+    )
+    
+    return fig
+
+def compute_exact_results(governor, filter_key, filtered_frames, dimension_filters):
+    """Exact filtered frames for the rerun that replaces the estimates; the per-filter analyses are cached on the way"""
+    business_df_filtered, marketing_df_filtered = governor.cached(('filter_data', *filter_key), filtered_frames)
+    for name, analysis in DEFAULT_VIEW_ANALYSES.items():
+        governor.cached((name, *filter_key), analysis, marketing_df_filtered)
+    governor.cached(('mismatched_campaigns', *filter_key), mismatched_campaigns, marketing_df_filtered)
+    if dimension_filters:
+        governor.cached(('marketing_rollups', *filter_key), source_rollups, 'marketing', marketing_df_filtered)
+    return business_df_filtered, marketing_df_filtered
+
+@st.fragment(run_every=0.5)
+def show_exact_status():
+    """Rerun the page once the background exact aggregation finishes; polls without rerunning the page"""
+    future = st.session_state['exact_job']['future']
+    if not future.done():
+        st.info("⏳ Computing exact results; the figures above are estimates from a stratified sample.")
+    elif future.exception() is not None:
+        st.error(f"Exact aggregation failed: {future.exception()}")
+    else:
+        st.rerun()
+
+@traced
+def render_approximate_view(governor, bitmap_index, business_df, marketing_filters, start_date, end_date,
+                            platforms, grain, rollups):
+    """KPIs and platform charts estimated from the stratified sample, badged as approximate"""
+    business_df_filtered, sample = filter_data(
+        business_df, bitmap_index.take(governor.get_frame('marketing_sample'), marketing_filters), start_date, end_date
+    )
+    st.markdown(
+        f":orange-background[**≈ Approximate**] estimates from {len(sample):,} sampled marketing rows "
+        "(stratified by platform and day); bands are 95% confidence intervals."
+    )
+    create_approximate_kpi_cards(business_df_filtered, estimate(sample).iloc[0])
+    distinct_sketches = DistinctSketches.from_frames({name: governor.get_frame(name) for name in DISTINCT_FRAMES})
+    create_reach_cards(distinct_sketches, start_date, end_date, platforms)
+    
+    st.markdown("---")
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        business_trend = select_rollup(rollups, 'business', grain, start_date, end_date)
+        st.plotly_chart(create_revenue_trend_chart(business_trend, grain), use_container_width=True)
+    
+    with col2:
+        st.plotly_chart(create_marketing_performance_chart(sample, approximate=True), use_container_width=True)
+    
+    show_exact_status()
+
+def clear_tenant_state():
+    """Forget selections and exports that belong to the previously selected tenant"""
+    for key in ('top_campaigns', 'export_job', 'exact_job', *(f'filter_{column}' for column in FILTER_LABELS)):
+        st.session_state.pop(key, None)
+
+def render_dashboard():
     st.markdown('<h1 class="main-header">📊 Marketing Intelligence Dashboard</h1>', unsafe_allow_html=True)
     
-    # Load data
-    business_df, marketing_df = load_data()
+    # Tenant (brand) selector, shown when the catalog has more than one
+    tenants = get_tenant_cache().tenants
+    tenant_id = next(iter(tenants))
+    if len(tenants) > 1:
+        tenant_id = st.sidebar.selectbox(
+            "Brand", list(tenants), format_func=lambda tenant_id: tenants[tenant_id].name,
+            key='tenant', on_change=clear_tenant_state
+        )
+    
+    # Load data; the watcher starts first so no change after the load is missed
+    get_source_watcher(tenant_id)
+    governor = load_data(tenant_id)
     
-    if business_df is None or marketing_df is None:
+    if governor is None:
         st.error("Failed to load data. Please check your CSV files.")
         return
+    st.session_state['data_version'] = governor.version
+    if st.session_state.pop('data_refreshed', False):
+        st.toast("🔄 Source data changed - dashboard refreshed")
+    watch_data_version(tenant_id)
+    business_df = governor.get_frame('business_df')
+    create_data_quality_panel(governor.get_frame('quarantine_df'))
     
     # Sidebar filters
     st.sidebar.header("Filters")
@@ -258,28 +518,91 @@ def main():
     # Platform filter
     platforms = st.sidebar.multiselect(
         "Select Platforms",
-        options=marketing_df['platform'].unique(),
-        default=marketing_df['platform'].unique()
+        options=list(PLATFORM_FILES),
+        default=list(PLATFORM_FILES)
     )
     
-    # Apply filters
     if len(date_range) == 2:
         start_date, end_date = date_range
-        business_df_filtered = business_df[
-            (business_df['date'] >= pd.to_datetime(start_date)) &
-            (business_df['date'] <= pd.to_datetime(end_date))
-        ]
-        marketing_df_filtered = marketing_df[
-            (marketing_df['date'] >= pd.to_datetime(start_date)) &
-            (marketing_df['date'] <= pd.to_datetime(end_date)) &
-            (marketing_df['platform'].isin(platforms))
-        ]
     else:
-        business_df_filtered = business_df
-        marketing_df_filtered = marketing_df[marketing_df['platform'].isin(platforms)]
+        start_date = end_date = None
+    # Dimension filters; an empty selection means no filter
+    bitmap_index = BitmapIndex.from_frames({name: governor.get_frame(name) for name in BITMAP_FRAMES})
+    dimension_filters = {}
+    for column, label in FILTER_LABELS.items():
+        selected = st.sidebar.multiselect(
+            label, bitmap_index.column_values(column), key=f'filter_{column}', placeholder=f"All {label.lower()}"
+        )
+        if selected:
+            dimension_filters[column] = selected
+    if st.sidebar.checkbox("Only campaigns mismatching their tactic", key='mismatch_only'):
+        dimension_filters['tactic_mismatch'] = [True]
+    
+    # Time grain for the trend charts
+    grain = st.sidebar.selectbox("Granularity", GRAINS, format_func=lambda grain: GRAIN_LABELS[grain])
+    
+    # Progressive loading shows sample estimates first while the exact results compute in the background
+    marketing_rows = bitmap_index.values.loc[bitmap_index.values['column'] == 'platform', 'count'].sum()
+    progressive = st.sidebar.checkbox(
+        "Progressive loading", value=bool(marketing_rows >= PROGRESSIVE_MIN_ROWS), key='progressive',
+        help="Show estimates from a stratified sample while exact results for new filters compute"
+    )
+    
+    # Apply filters: platform and dimension selections are bitwise operations on the
+    # bitmap index; only reloads spilled partitions when the date range reaches back into them
+    marketing_filters = {'platform': platforms if set(platforms) != set(PLATFORM_FILES) else None, **dimension_filters}
+    
+    def filtered_frames():
+        marketing_df = bitmap_index.take(governor.get_frame('marketing_df', start_date, end_date), marketing_filters)
+        return filter_data(business_df, marketing_df, start_date, end_date)
+    
+    filter_key = (start_date, end_date, tuple(platforms),
+                  *((column, tuple(values)) for column, values in dimension_filters.items()))
+    rollups = {
+        rollup_name(source, table_grain): governor.get_frame(rollup_name(source, table_grain))
+        for source in ROLLUP_SOURCES for table_grain in {grain, 'day'}
+    }
+    
+    if progressive and governor.has_result(('filter_data', *filter_key)):
+        business_df_filtered, marketing_df_filtered = governor.cached(('filter_data', *filter_key), filtered_frames)
+    elif progressive:
+        # The job's own result is rendered, so the exact view does not depend on the
+        # filtered frames surviving in the governor's cache under memory pressure
+        job = st.session_state.get('exact_job')
+        if job is None or job['filter_key'] != filter_key or job['version'] != governor.version:
+            if job is not None:
+                # A stale job still queued would delay the current one on the shared workers
+                job['future'].cancel()
+            job = st.session_state['exact_job'] = {
+                'future': submit_exact(compute_exact_results, governor, filter_key, filtered_frames, dimension_filters),
+                'filter_key': filter_key,
+                'version': governor.version,
+            }
+        if not job['future'].done() or job['future'].exception() is not None:
+            render_approximate_view(
+                governor, bitmap_index, business_df, marketing_filters, start_date, end_date, platforms, grain, rollups
+            )
+            return
+        business_df_filtered, marketing_df_filtered = job['future'].result()
+    else:
+        business_df_filtered, marketing_df_filtered = filtered_frames()
+    if marketing_df_filtered.empty:
+        st.warning("No marketing data matches the selected filters.")
+        return
+    if dimension_filters:
+        # Precomputed rollups are per platform only; re-roll the filtered rows instead
+        rollups.update(governor.cached(
+            ('marketing_rollups', *filter_key), source_rollups, 'marketing', marketing_df_filtered
+        ))
+    business_trend = select_rollup(rollups, 'business', grain, start_date, end_date)
+    marketing_trend = select_rollup(rollups, 'marketing', grain, start_date, end_date, platforms)
     
     # KPI Cards
     create_kpi_cards(business_df_filtered, marketing_df_filtered)
+    distinct_sketches = DistinctSketches.from_frames({name: governor.get_frame(name) for name in DISTINCT_FRAMES})
+    create_reach_cards(distinct_sketches, start_date, end_date, platforms)
+    if dimension_filters:
+        st.caption("Reach counts apply the date and platform filters only; metric distributions also apply tactic and state.")
     
     st.markdown("---")
     
@@ -287,76 +610,122 @@ def main():
     col1, col2 = st.columns(2)
     
     with col1:
-        st.plotly_chart(create_revenue_trend_chart(business_df_filtered), use_container_width=True)
+        st.plotly_chart(create_revenue_trend_chart(business_trend, grain), use_container_width=True)
     
     with col2:
         st.plotly_chart(create_marketing_performance_chart(marketing_df_filtered), use_container_width=True)
     
+    st.plotly_chart(create_marketing_trend_chart(marketing_trend, grain), use_container_width=True)
+    
+    reach_trend = governor.cached(
+        ('distinct_campaigns', grain, *filter_key), distinct_sketches.estimate,
+        'campaigns', ['date', 'platform'], start_date, end_date, {'platform': platforms}, grain
+    )
+    st.plotly_chart(create_reach_trend_chart(reach_trend, grain), use_container_width=True)
+    
     st.markdown("---")
     
     # Campaign Analysis
     st.header("🎯 Campaign Performance Analysis")
-    campaign_analysis = create_campaign_analysis(marketing_df_filtered)
+    campaign_analysis = governor.cached(
+        ('create_campaign_analysis', *filter_key), create_campaign_analysis, marketing_df_filtered
+    )
     
     col1, col2 = st.columns(2)
     
     with col1:
         st.subheader("Top Performing Campaigns by ROI")
         top_campaigns = campaign_analysis.head(10)
-        st.dataframe(
+        selection = st.dataframe(
             top_campaigns[['platform', 'campaign', 'spend', 'attributed revenue', 'roi']].round(2),
-            use_container_width=True
+            use_container_width=True,
+            on_select='rerun',
+            selection_mode='single-row',
+            key='top_campaigns'
         )
     
     with col2:
-        st.subheader("Campaign ROAS Distribution")
-        fig_roas = px.box(
-            campaign_analysis,
-            x='platform',
-            y='roas',
-            title='ROAS Distribution by Platform',
-            color='platform'
+        st.subheader("Campaign Metric Distribution")
+        metric_col, kind_col = st.columns(2)
+        metric = metric_col.selectbox("Metric", SKETCH_METRICS, format_func=str.upper, key='distribution_metric')
+        kind = kind_col.radio("Chart", ['Box', 'Violin'], horizontal=True, key='distribution_kind')
+        sketches = QuantileSketches.from_frames({name: governor.get_frame(name) for name in SKETCH_FRAMES})
+        # Sketch partitions are per platform, tactic and state, so those filters apply exactly
+        sketch_filters = {'platform': platforms, **{
+            column: values for column, values in dimension_filters.items() if column in ('tactic', 'state')
+        }}
+        fig_distribution = governor.cached(
+            ('create_distribution_chart', metric, kind, *filter_key),
+            create_distribution_chart, sketches, metric, kind, start_date, end_date, sketch_filters
         )
-        st.plotly_chart(fig_roas, use_container_width=True)
+        st.plotly_chart(fig_distribution, use_container_width=True)
+    
+    # Campaign drill-down for the selected row
+    selected_rows = selection.selection.rows
+    if selected_rows:
+        selected = top_campaigns.iloc[selected_rows[0]]
+        campaign_index = CampaignIndex(governor.get_frame('campaign_rows'), governor.get_frame('campaign_ranges'))
+        create_campaign_drilldown(campaign_index, selected['platform'], selected['campaign'], start_date, end_date)
+    else:
+        st.caption("Select a campaign row to drill down into its daily performance and state mix.")
     
     st.markdown("---")
     
     # Tactic Analysis
     st.header("📈 Marketing Tactic Analysis")
-    tactic_analysis = create_tactic_analysis(marketing_df_filtered)
+    dimension = st.radio(
+        "Group by", list(DIMENSION_LABELS), format_func=DIMENSION_LABELS.get, horizontal=True, key='tactic_grouping'
+    )
+    dimension_label = DIMENSION_LABELS[dimension]
+    if dimension == 'tactic':
+        tactic_analysis = governor.cached(
+            ('create_tactic_analysis', *filter_key), create_tactic_analysis, marketing_df_filtered
+        )
+    else:
+        tactic_analysis = governor.cached(
+            ('create_dimension_analysis', dimension, *filter_key), create_dimension_analysis,
+            marketing_df_filtered, dimension
+        )
     
     col1, col2 = st.columns(2)
     
     with col1:
-        st.subheader("Performance by Tactic")
+        st.subheader(f"Performance by {dimension_label}")
         fig_tactic = px.bar(
             tactic_analysis,
-            x='tactic',
+            x=dimension,
             y='roas',
             color='platform',
-            title='ROAS by Marketing Tactic',
+            title=f'ROAS by {dimension_label}',
             barmode='group'
         )
         st.plotly_chart(fig_tactic, use_container_width=True)
     
     with col2:
-        st.subheader("Spend vs Revenue by Tactic")
+        st.subheader(f"Spend vs Revenue by {dimension_label}")
         fig_scatter = px.scatter(
             tactic_analysis,
             x='spend',
             y='attributed revenue',
             size='roas',
             color='platform',
-            hover_data=['tactic'],
-            title='Spend vs Revenue by Tactic'
+            hover_data=[dimension],
+            title=f'Spend vs Revenue by {dimension_label}'
         )
         st.plotly_chart(fig_scatter, use_container_width=True)
     
+    mismatches = governor.cached(('mismatched_campaigns', *filter_key), mismatched_campaigns, marketing_df_filtered)
+    if not mismatches.empty:
+        with st.expander(f"⚠️ {len(mismatches)} campaigns named for a different tactic than they report under"):
+            st.dataframe(mismatches.round(2), use_container_width=True)
+    
     st.markdown("---")
     
     # Geographic Analysis
     st.header("🌍 Geographic Performance")
-    geo_analysis = create_geographic_analysis(marketing_df_filtered)
+    geo_analysis = governor.cached(
+        ('create_geographic_analysis', *filter_key), create_geographic_analysis, marketing_df_filtered
+    )
     
     col1, col2 = st.columns(2)
     
@@ -381,6 +750,34 @@ def main():
     
     st.markdown("---")
     
+    # Marketing Mix Model
+    st.header("🧮 Marketing Mix Model")
+    mmm, mmm_spend = load_media_mix_model(governor)
+    # Adstock carries over from earlier spend, so contributions are computed on the full series, then sliced
+    mmm_contributions = mmm.contributions(mmm_spend)
+    if start_date is not None:
+        period = slice(pd.to_datetime(start_date), pd.to_datetime(end_date))
+        mmm_spend, mmm_contributions = mmm_spend.loc[period], mmm_contributions.loc[period]
+    mmm_summary = mmm.summary(mmm_spend, mmm_contributions)
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.plotly_chart(create_mmm_contribution_chart(mmm_contributions), use_container_width=True)
+    
+    with col2:
+        st.subheader("Channel Contribution Summary")
+        st.dataframe(
+            mmm_summary.round(2),
+            use_container_width=True
+        )
+        st.caption(
+            f"Adstock decay {mmm.decay:.1f}, half-saturation {mmm.half_saturation:.1f}x mean spend, "
+            f"Hill slope {mmm.slope:.1f}, R² {mmm.r_squared:.2f}"
+        )
+    
+    st.markdown("---")
+    
     # Insights and Recommendations
     st.header("💡 Key Insights & Recommendations")
     
@@ -389,8 +786,8 @@ def main():
     total_spend = marketing_df_filtered['spend'].sum()
     overall_roas = marketing_df_filtered['attributed revenue'].sum() / marketing_df_filtered['spend'].sum()
     
-    best_platform = marketing_df_filtered.groupby('platform')['roas'].mean().idxmax()
-    best_tactic = marketing_df_filtered.groupby('tactic')['roas'].mean().idxmax()
+    best_platform = marketing_df_filtered.groupby('platform', observed=True)['roas'].mean().idxmax()
+    best_tactic = marketing_df_filtered.groupby('tactic', observed=True)['roas'].mean().idxmax()
     
     col1, col2 = st.columns(2)
     
@@ -414,6 +811,24 @@ def main():
         5. **Performance Monitoring**: Track ROAS trends and adjust accordingly
         """.format(best_platform, best_tactic))
     
+    st.markdown("---")
+    
+    # Export of the filtered tables, written in the background
+    dashboard_tables = {
+        'campaign_analysis': campaign_analysis,
+        f'{dimension}_analysis': tactic_analysis,
+        'tactic_mismatches': mismatches,
+        'geographic_analysis': geo_analysis,
+        'mmm_summary': mmm_summary,
+        'mmm_contributions': mmm_contributions,
+    }
+    filter_label = f"{start_date} to {end_date}, {', '.join(platforms) or 'no platforms'}"
+    if 'campaign_type' in dimension_filters:
+        filter_label += f", {', '.join(dimension_filters['campaign_type']) or 'no campaign types'}"
+    if 'tactic_mismatch' in dimension_filters:
+        filter_label += ", tactic mismatches only"
+    create_export_panel(dashboard_tables, business_df_filtered, marketing_df_filtered, filter_label)
+    
     # Footer
     st.markdown("---")
     st.markdown("""
@@ -422,5 +837,95 @@ def main():
     </div>
     """, unsafe_allow_html=True)
 
+def build_export_tables(dashboard_tables, business_df, marketing_df, analyzer_class, advanced_tables):
+    """Dashboard tables plus the advanced-analysis tables for the same filters; runs in the export worker"""
+    analyzer = analyzer_class(business_df.copy(), marketing_df.copy())
+    return {**dashboard_tables, **advanced_tables(business_df, marketing_df, analyzer)}
+
+@st.fragment(run_every=1)
+def show_export_status():
+    """Progress of the background export, then its download button; polls without rerunning the page"""
+    job = st.session_state.get('export_job')
+    if job is None:
+        st.caption("Exports include the campaign, tactic, geographic, marketing mix and advanced-analysis tables for the current filters.")
+        return
+    
+    future = job['future']
+    if not future.done():
+        st.info(f"⏳ Preparing {EXPORT_FORMATS[job['fmt']][0]} for {job['label']}...")
+    elif future.exception() is not None:
+        st.error(f"Export failed: {future.exception()}")
+    else:
+        st.download_button(
+            f"Download {EXPORT_FORMATS[job['fmt']][0]} ({job['label']})",
+            future.result(),
+            file_name=export_file_name(job['fmt']),
+            mime=EXPORT_FORMATS[job['fmt']][1],
+            key='download_export'
+        )
+
+@traced
+def create_export_panel(dashboard_tables, business_df, marketing_df, filter_label):
+    """Start a streaming Excel/CSV export of the filtered tables on a background worker"""
+    st.header("📥 Export")
+    col1, col2 = st.columns([1, 2])
+    
+    with col1:
+        fmt = st.radio(
+            "Format", list(EXPORT_FORMATS), format_func=lambda fmt: EXPORT_FORMATS[fmt][0],
+            horizontal=True, key='export_format'
+        )
+        if st.button("Prepare export", key='prepare_export'):
+            # Modules are resolved here: the app directory is only on sys.path while the script runs
+            export_tables = partial(
+                build_export_tables, dashboard_tables, business_df, marketing_df,
+                advanced_analysis.MarketingAnalyzer, marketing_intel.ANALYSES['advanced']
+            )
+            st.session_state['export_job'] = {
+                'future': submit_export(export_tables, fmt),
+                'fmt': fmt,
+                'label': filter_label,
+            }
+    
+    with col2:
+        show_export_status()
+
+def create_performance_panel(recorder):
+    """Opt-in sidebar panel with per-span timings of the current rerun"""
+    st.sidebar.markdown("---")
+    st.sidebar.checkbox("Show Performance panel", key='show_performance')
+    
+    if recorder is None:
+        return
+    
+    spans = recorder.to_frame()
+    with st.sidebar.expander("⏱️ Performance", expanded=True):
+        st.caption(f"{len(spans)} spans, {spans.loc[spans['depth'] == 0, 'duration_ms'].sum():,.0f} ms instrumented")
+        st.dataframe(
+            spans[['name', 'duration_ms', 'rows_in', 'rows_out', 'allocated_bytes']].round(2),
+            use_container_width=True
+        )
+        st.download_button(
+            "Download spans (JSON lines)",
+            recorder.to_jsonl(),
+            file_name='dashboard_spans.jsonl',
+            mime='application/jsonl'
+        )
+        st.download_button(
+            "Download Chrome trace",
+            recorder.to_chrome_trace(),
+            file_name='dashboard_trace.json',
+            mime='application/json'
+        )
+
+def main():
+    show_performance = st.session_state.get('show_performance', False)
+    recorder = SpanRecorder('dashboard rerun') if show_performance else None
+    
+    with recorder or nullcontext():
+        render_dashboard()
+    
+    create_performance_panel(recorder)
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Headless batch entry point for the Marketing Intelligence analyses
+Computes every dashboard and advanced-analysis table without importing Streamlit
+or Plotly and writes them to Parquet or JSON, e.g.:
+
+    python -m marketing_intel report --output-dir reports/2025-09-12
+"""
+
+import argparse
+import importlib.util
+import json
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from data_processing import (
+    prepare_validated_data,
+    calculate_kpis,
+    calculate_platform_metrics,
+    create_campaign_analysis,
+    create_tactic_analysis,
+    create_geographic_analysis,
+)
+
+
+def _dashboard_tables(business_df, marketing_df, analyzer):
+    return {
+        'platform_metrics': calculate_platform_metrics(marketing_df),
+        'campaign_analysis': create_campaign_analysis(marketing_df),
+        'tactic_analysis': create_tactic_analysis(marketing_df),
+        'geographic_analysis': create_geographic_analysis(marketing_df),
+    }
+
+
+def _advanced_tables(business_df, marketing_df, analyzer):
+    monthly_performance, monthly_business = analyzer.calculate_seasonality_analysis()
+    return {
+        'attribution': analyzer.calculate_attribution_analysis(),
+        'cohort': analyzer.calculate_cohort_analysis(),
+        'correlation': analyzer.calculate_correlation_analysis().rename_axis('metric').reset_index(),
+        'roi_optimization': analyzer.calculate_roi_optimization(),
+        'seasonality_marketing': monthly_performance,
+        'seasonality_business': monthly_business,
+        'forecast_data': analyzer.calculate_forecasting_data(),
+    }
+
+
+def _shapley_tables(business_df, marketing_df, analyzer):
+    daily, summary = analyzer.calculate_shapley_attribution()
+    return {'shapley_daily': daily, 'shapley_summary': summary}
+
+
+def _significance_tables(business_df, marketing_df, analyzer):
+    return {'campaign_significance': analyzer.calculate_campaign_significance()}
+
+
+def _mmm_tables(business_df, marketing_df, analyzer):
+    from media_mix_model import load_or_fit_mmm
+
+    model, spend = load_or_fit_mmm(business_df, marketing_df, facts=analyzer.daily_facts)
+    return {
+        'mmm_contributions': model.contributions(spend).reset_index(),
+        'mmm_summary': model.summary(spend),
+    }
+
+
+ANALYSES = {
+    'dashboard': _dashboard_tables,
+    'advanced': _advanced_tables,
+    'shapley': _shapley_tables,
+    'significance': _significance_tables,
+    'mmm': _mmm_tables,
+}
+
+
+def to_serializable(frame):
+    """Convert columns Parquet/JSON cannot store natively (e.g. Periods) to strings"""
+    frame = frame.copy()
+    for column in frame.columns:
+        if isinstance(frame[column].dtype, pd.PeriodDtype):
+            frame[column] = frame[column].astype(str)
+    frame.columns = [str(column) for column in frame.columns]
+    return frame
+
+
+def write_table(frame, path, fmt):
+    """Write one table as Parquet or records-oriented JSON"""
+    frame = to_serializable(frame)
+    if fmt == 'parquet':
+        frame.to_parquet(path.with_suffix('.parquet'), index=False)
+    else:
+        frame.to_json(path.with_suffix('.json'), orient='records', date_format='iso', indent=2)
+
+
+def _json_default(value):
+    if hasattr(value, 'item'):
+        return value.item()
+    return str(value)
+
+
+def run_report(data_dir='.', output_dir='reports', fmt='parquet', analyses=None):
+    """Compute the selected analyses and write each table to ``output_dir``"""
+    # Imported here so `--help` and argument errors stay instant
+    from advanced_analysis import MarketingAnalyzer
+
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    analyses = analyses or list(ANALYSES)
+    timings = {}
+
+    start = time.perf_counter()
+    business_df, marketing_df, quarantine_df = prepare_validated_data(data_dir)
+    analyzer = MarketingAnalyzer(business_df.copy(), marketing_df.copy())
+    timings['load'] = time.perf_counter() - start
+
+    tables = {}
+    for name in analyses:
+        start = time.perf_counter()
+        tables.update(ANALYSES[name](business_df, marketing_df, analyzer))
+        timings[name] = time.perf_counter() - start
+    if not quarantine_df.empty:
+        tables['quarantine'] = quarantine_df
+
+    for table_name, frame in tables.items():
+        write_table(frame, output_dir / table_name, fmt)
+
+    manifest = {
+        'generated_at': pd.Timestamp.now(tz='UTC').isoformat(),
+        'data_dir': str(Path(data_dir).resolve()),
+        'date_range': [business_df['date'].min().date().isoformat(), business_df['date'].max().date().isoformat()],
+        'format': fmt,
+        'quarantined_rows': len(quarantine_df),
+        'kpis': calculate_kpis(business_df, marketing_df),
+        'insights': analyzer.generate_insights(),
+        'tables': {table_name: len(frame) for table_name, frame in tables.items()},
+        'timings_seconds': {name: round(seconds, 4) for name, seconds in timings.items()},
+    }
+    with open(output_dir / 'manifest.json', 'w') as f:
+        json.dump(manifest, f, indent=2, default=_json_default)
+
+    return manifest
+
+
+def main(argv=None):
+    """Command line interface for batch jobs"""
+    parser = argparse.ArgumentParser(description="Marketing Intelligence batch tools")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    report = subparsers.add_parser('report', help="Compute all analyses and write them to disk")
+    report.add_argument("--data-dir", default=".", help="Directory containing the source CSV files")
+    report.add_argument("--output-dir", default="reports", help="Directory to write tables to")
+    report.add_argument("--format", choices=['parquet', 'json'], default='parquet', help="Output table format")
+    report.add_argument("--only", nargs='+', choices=list(ANALYSES), help="Only compute these analysis groups")
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'report':
+        if args.format == 'parquet' and importlib.util.find_spec('pyarrow') is None:
+            print("❌ Parquet output needs pyarrow; use --format json or install it.")
+            return 1
+
+        manifest = run_report(args.data_dir, args.output_dir, args.format, args.only)
+
+        print(f"✅ Wrote {len(manifest['tables'])} tables to {args.output_dir}")
+        for name, seconds in manifest['timings_seconds'].items():
+            print(f"   - {name}: {seconds:.2f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,236 @@
+"""
+Marketing mix model
+Links daily platform spend to daily business revenue through geometric adstock
+(carry-over) and Hill saturation (diminishing returns), then a non-negative
+linear fit. The decay/saturation grid is searched in a process pool and fitted
+models are cached on disk so the dashboard can show channel contributions
+without refitting.
+"""
+
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import product
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from daily_facts import build_daily_facts, channel_columns
+from lazy_imports import lazy_import
+
+optimize = lazy_import('scipy.optimize')
+signal = lazy_import('scipy.signal')
+
+DEFAULT_DECAYS = (0.0, 0.2, 0.4, 0.6, 0.8)
+DEFAULT_HALF_SATURATIONS = (0.5, 1.0, 2.0)
+DEFAULT_SLOPES = (1.0, 2.0)
+CACHE_DIR = Path('.cache') / 'mmm'
+MODEL_VERSION = 1
+
+
+def geometric_adstock(spend, decay):
+    """Geometric adstock a[t] = x[t] + decay * a[t-1] for every channel column at once
+
+    ``decay`` may be a scalar (one recursive filter over all columns) or one
+    value per channel.
+    """
+    spend = np.asarray(spend, dtype=float)
+    decay = np.asarray(decay, dtype=float)
+
+    if decay.ndim == 0:
+        return signal.lfilter([1.0], [1.0, -float(decay)], spend, axis=0)
+
+    adstocked = np.empty_like(spend)
+    carry = np.zeros(spend.shape[1])
+    for t in range(spend.shape[0]):
+        carry = spend[t] + decay * carry
+        adstocked[t] = carry
+    return adstocked
+
+
+def channel_scale(adstocked):
+    """Per-channel mean adstocked spend, the unit for half-saturation points"""
+    scale = adstocked.mean(axis=0)
+    return np.where(scale > 0, scale, 1.0)
+
+
+def hill_saturation(adstocked, half_saturation, slope, scale):
+    """Hill curve x^s / (x^s + k^s) with ``half_saturation`` as a multiple of ``scale``"""
+    k = half_saturation * np.asarray(scale, dtype=float)
+    powered = np.power(adstocked, slope)
+    return powered / (powered + np.power(k, slope))
+
+
+def _transform(spend, decay, half_saturation, slope, scale=None):
+    adstocked = geometric_adstock(spend, decay)
+    if scale is None:
+        scale = channel_scale(adstocked)
+    return hill_saturation(adstocked, half_saturation, slope, scale), scale
+
+
+def _fit_design(features, revenue):
+    design = np.column_stack([np.ones(len(revenue)), features])
+    coef, _ = optimize.nnls(design, revenue)
+    fitted = design @ coef
+    ss_res = np.sum((revenue - fitted) ** 2)
+    ss_tot = np.sum((revenue - revenue.mean()) ** 2)
+    r_squared = 1 - ss_res / ss_tot if ss_tot > 0 else 0.0
+    return coef, r_squared
+
+
+def _score_params(args):
+    """Fit one (decay, half_saturation, slope) combination; top-level so it pickles"""
+    spend, revenue, decay, half_saturation, slope = args
+    features, scale = _transform(spend, decay, half_saturation, slope)
+    coef, r_squared = _fit_design(features, revenue)
+    return r_squared, decay, half_saturation, slope, scale, coef
+
+
+def build_mmm_inputs(business_df, marketing_df, channel_col='platform', revenue_col='total revenue', facts=None):
+    """Daily spend per channel on a complete date index, aligned with business revenue
+
+    Covers the business date range; revenue is interpolated over missing days.
+    ``facts`` is a daily fact table built for ``channel_col``; it is built here if omitted.
+    """
+    if facts is None:
+        facts = build_daily_facts(business_df, marketing_df, channel_col)
+    observed = facts.loc[facts['business_observed'], 'date']
+    facts = facts[facts['date'].between(observed.min(), observed.max())]
+
+    channels = channel_columns(facts, 'spend')
+    dates = pd.DatetimeIndex(facts['date'], freq='D', name=None)
+    spend = pd.DataFrame(
+        facts[list(channels.values())].to_numpy(dtype=float),
+        index=dates,
+        columns=pd.Index(list(channels), name=channel_col)
+    )
+    revenue = pd.Series(facts[revenue_col].to_numpy(dtype=float), index=dates, name=revenue_col).interpolate()
+    return spend, revenue
+
+
+class MediaMixModel:
+    """Adstock + Hill saturation marketing mix model over daily channel spend"""
+
+    def __init__(self, channels=None, decay=None, half_saturation=None, slope=None,
+                 scale=None, coef=None, r_squared=None):
+        self.channels = channels
+        self.decay = decay
+        self.half_saturation = half_saturation
+        self.slope = slope
+        self.scale = None if scale is None else np.asarray(scale, dtype=float)
+        self.coef = None if coef is None else np.asarray(coef, dtype=float)
+        self.r_squared = r_squared
+
+    def fit(self, spend, revenue, decays=DEFAULT_DECAYS, half_saturations=DEFAULT_HALF_SATURATIONS,
+            slopes=DEFAULT_SLOPES, n_jobs=None):
+        """Grid-search hyperparameters by R²; ``n_jobs=1`` runs in-process"""
+        self.channels = list(spend.columns)
+        spend_values = spend.to_numpy(dtype=float)
+        revenue_values = revenue.to_numpy(dtype=float)
+
+        tasks = [
+            (spend_values, revenue_values, decay, half_saturation, slope)
+            for decay, half_saturation, slope in product(decays, half_saturations, slopes)
+        ]
+
+        if n_jobs == 1 or len(tasks) == 1:
+            scores = list(map(_score_params, tasks))
+        else:
+            workers = n_jobs or min(len(tasks), os.cpu_count() or 1)
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                scores = list(executor.map(_score_params, tasks, chunksize=max(1, len(tasks) // (workers * 4))))
+
+        best = max(scores, key=lambda score: score[0])
+        self.r_squared, self.decay, self.half_saturation, self.slope, self.scale, self.coef = best
+        return self
+
+    def contributions(self, spend):
+        """Daily revenue contribution per channel plus the baseline"""
+        features, _ = _transform(
+            spend[self.channels].to_numpy(dtype=float), self.decay, self.half_saturation, self.slope, self.scale
+        )
+        contributions = pd.DataFrame(features * self.coef[1:], index=spend.index, columns=self.channels)
+        contributions.insert(0, 'baseline', self.coef[0])
+        contributions.index.name = 'date'
+        return contributions
+
+    def predict(self, spend):
+        return self.contributions(spend).sum(axis=1)
+
+    def summary(self, spend, contributions=None):
+        """Total modeled contribution and contribution-based ROAS per channel
+
+        Pass ``contributions`` computed on a longer spend series (then sliced
+        like ``spend``) to keep adstock carried over from before ``spend`` starts.
+        """
+        contributions = self.contributions(spend) if contributions is None else contributions
+        summary = pd.DataFrame({
+            'channel': self.channels,
+            'spend': spend[self.channels].sum().to_numpy(),
+            'contribution': contributions[self.channels].sum().to_numpy(),
+        })
+        summary['mmm_roas'] = (summary['contribution'] / summary['spend']).replace([np.inf, -np.inf], 0)
+        summary['contribution_share'] = (summary['contribution'] / summary['contribution'].sum() * 100).round(2)
+        return summary
+
+    def to_dict(self):
+        return {
+            'version': MODEL_VERSION,
+            'channels': self.channels,
+            'decay': self.decay,
+            'half_saturation': self.half_saturation,
+            'slope': self.slope,
+            'scale': self.scale.tolist(),
+            'coef': self.coef.tolist(),
+            'r_squared': float(self.r_squared),
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(
+            channels=data['channels'],
+            decay=data['decay'],
+            half_saturation=data['half_saturation'],
+            slope=data['slope'],
+            scale=data['scale'],
+            coef=data['coef'],
+            r_squared=data['r_squared'],
+        )
+
+    def save(self, path):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.to_dict(), indent=2))
+
+    @classmethod
+    def load(cls, path):
+        return cls.from_dict(json.loads(Path(path).read_text()))
+
+
+def _cache_key(spend, revenue, grid):
+    digest = hashlib.sha256()
+    digest.update(json.dumps([MODEL_VERSION, list(map(str, spend.columns)), grid]).encode())
+    digest.update(pd.util.hash_pandas_object(spend, index=True).to_numpy().tobytes())
+    digest.update(pd.util.hash_pandas_object(revenue, index=True).to_numpy().tobytes())
+    return digest.hexdigest()[:16]
+
+
+def load_or_fit_mmm(business_df, marketing_df, channel_col='platform', cache_dir=CACHE_DIR,
+                    decays=DEFAULT_DECAYS, half_saturations=DEFAULT_HALF_SATURATIONS,
+                    slopes=DEFAULT_SLOPES, n_jobs=None, facts=None):
+    """Return (model, spend) from the on-disk cache, fitting and saving on a miss"""
+    spend, revenue = build_mmm_inputs(business_df, marketing_df, channel_col, facts=facts)
+    grid = [list(decays), list(half_saturations), list(slopes)]
+    path = Path(cache_dir) / f"{_cache_key(spend, revenue, grid)}.json"
+
+    if path.exists():
+        try:
+            return MediaMixModel.load(path), spend
+        except (ValueError, KeyError):
+            path.unlink()
+
+    model = MediaMixModel().fit(spend, revenue, decays, half_saturations, slopes, n_jobs=n_jobs)
+    model.save(path)
+    return model, spend
@@ -0,0 +1,295 @@
+"""
+Memory budget enforcement for cached data and analysis results
+The governor owns the prepared frames and an LRU cache of analysis results,
+tracks their deep memory usage and, when a budget is exceeded, applies
+progressively more aggressive measures:
+
+1. downcast numeric columns (integers always, floats only if allowed)
+2. convert repetitive string columns to categoricals
+3. evict least-recently-used cached results, never the one being stored;
+   when the frames alone exceed the budget this is skipped (recorded as an
+   overrun), since only spilling can help
+4. spill cold partitions (oldest months) of dated frames to disk; they are
+   reloaded lazily when a requested date range needs them
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import threading
+from collections import OrderedDict, deque
+from pathlib import Path
+
+import pandas as pd
+
+DEFAULT_BUDGET_MB = 1024
+DEFAULT_HOT_DAYS = 31
+BUDGET_ENV_VAR = 'DASHBOARD_MEMORY_BUDGET_MB'
+# Most recent enforcement actions kept for stats()
+MAX_ACTIONS = 1000
+
+
+def deep_memory_usage(value):
+    """Approximate deep size in bytes of frames, series and containers of them"""
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True, index=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(deep=True, index=True))
+    if isinstance(value, dict):
+        return sum(deep_memory_usage(item) for item in value.values())
+    if isinstance(value, (tuple, list)):
+        return sum(deep_memory_usage(item) for item in value)
+    return sys.getsizeof(value)
+
+
+def downcast_numeric(frame, downcast_floats=False):
+    """Shrink integer (and optionally float) columns to the smallest dtype that fits"""
+    frame = frame.copy()
+    for column in frame.select_dtypes(include='integer').columns:
+        frame[column] = pd.to_numeric(frame[column], downcast='integer')
+    if downcast_floats:
+        for column in frame.select_dtypes(include='floating').columns:
+            frame[column] = pd.to_numeric(frame[column], downcast='float')
+    return frame
+
+
+def categorize_strings(frame, max_unique_ratio=0.5):
+    """Convert string columns whose values repeat enough to categoricals"""
+    frame = frame.copy()
+    for column in frame.select_dtypes(include=['object', 'string']).columns:
+        if len(frame) and frame[column].nunique(dropna=False) / len(frame) <= max_unique_ratio:
+            frame[column] = frame[column].astype('category')
+    return frame
+
+
+class ManagedFrame:
+    """A governed frame: the in-memory (hot) part plus any partitions spilled to disk"""
+
+    def __init__(self, frame, date_col=None):
+        self.frame = frame
+        self.date_col = date_col
+        self.spilled = []  # [{'start', 'end', 'path', 'rows'}]
+        # Compaction is idempotent, so each frame is downcast and categorized once
+        self.compacted = False
+
+    @property
+    def memory_bytes(self):
+        return deep_memory_usage(self.frame)
+
+
+class MemoryGovernor:
+    """Keeps registered frames and cached results within a memory budget"""
+
+    def __init__(self, budget_bytes=DEFAULT_BUDGET_MB * 1024 ** 2, spill_dir=None,
+                 hot_days=DEFAULT_HOT_DAYS, downcast_floats=False, max_unique_ratio=0.5):
+        self.budget_bytes = budget_bytes
+        self.spill_dir = Path(spill_dir or tempfile.mkdtemp(prefix='dashboard-spill-'))
+        self.hot_days = hot_days
+        self.downcast_floats = downcast_floats
+        self.max_unique_ratio = max_unique_ratio
+        self.actions = deque(maxlen=MAX_ACTIONS)
+        # Bumped whenever the frames are (re)loaded, so sessions can tell their view is stale
+        self.version = 0
+        self._frames = {}
+        self._results = OrderedDict()
+        self._result_sizes = {}
+        self._lock = threading.RLock()
+
+    @classmethod
+    def from_env(cls, **kwargs):
+        """Budget from DASHBOARD_MEMORY_BUDGET_MB, defaulting to DEFAULT_BUDGET_MB"""
+        budget_mb = float(os.environ.get(BUDGET_ENV_VAR, DEFAULT_BUDGET_MB))
+        return cls(budget_bytes=int(budget_mb * 1024 ** 2), **kwargs)
+
+    # Frames
+
+    def has_frame(self, name):
+        return name in self._frames
+
+    def register_frame(self, name, frame, date_col=None):
+        with self._lock:
+            self._frames[name] = ManagedFrame(frame, date_col)
+            self.enforce()
+
+    def load_frames(self, loader, date_cols=None):
+        """Register the {name: frame} dict returned by ``loader()`` unless frames are already loaded
+
+        Concurrent callers wait on the lock, so the loader runs once per governor.
+        """
+        date_cols = date_cols or {}
+        with self._lock:
+            if self._frames:
+                return
+            for name, frame in loader().items():
+                self._frames[name] = ManagedFrame(frame, date_cols.get(name))
+            self.version += 1
+            self.enforce()
+
+    def replace_frames(self, frames, date_cols=None):
+        """Swap in a new {name: frame} dict, e.g. after source files changed
+
+        Spilled partitions and cached results of the old frames are dropped.
+        """
+        date_cols = date_cols or {}
+        with self._lock:
+            for managed in self._frames.values():
+                for partition in managed.spilled:
+                    Path(partition['path']).unlink(missing_ok=True)
+            self._frames = {name: ManagedFrame(frame, date_cols.get(name)) for name, frame in frames.items()}
+            self.clear_results()
+            self.version += 1
+            self.enforce()
+
+    def all_frames(self):
+        """{name: full frame} for every registered frame, spilled partitions included"""
+        with self._lock:
+            return {name: self.get_frame(name) for name in self._frames}
+
+    def get_frame(self, name, start_date=None, end_date=None):
+        """Return the frame, reloading spilled partitions that overlap [start_date, end_date]
+
+        Without a date range every spilled partition is reloaded. Reloaded
+        partitions go through the result cache, so they are themselves evictable.
+        Rows keep their original labels, so indexes built by row label at
+        load (e.g. BitmapIndex) still line up.
+        """
+        with self._lock:
+            managed = self._frames[name]
+            start_date = pd.Timestamp(start_date) if start_date is not None else None
+            end_date = pd.Timestamp(end_date) if end_date is not None else None
+
+            needed = [
+                partition for partition in managed.spilled
+                if (end_date is None or partition['start'] <= end_date)
+                and (start_date is None or partition['end'] >= start_date)
+            ]
+            if not needed:
+                return managed.frame
+
+            cold = [
+                self.cached(('spilled_partition', str(partition['path'])), pd.read_pickle, partition['path'])
+                for partition in needed
+            ]
+            return pd.concat(cold + [managed.frame])
+
+    # Results
+
+    def has_result(self, key):
+        return key in self._results
+
+    def cached(self, key, compute, *args, **kwargs):
+        """Return a cached result for ``key``, computing and storing it on a miss"""
+        with self._lock:
+            if key in self._results:
+                self._results.move_to_end(key)
+                return self._results[key]
+
+        result = compute(*args, **kwargs)
+        self.store_result(key, result)
+        return result
+
+    def store_result(self, key, result):
+        """Cache a result computed elsewhere, e.g. one loaded from a build-time snapshot"""
+        with self._lock:
+            self._results[key] = result
+            self._result_sizes[key] = deep_memory_usage(result)
+            self.enforce(keep=key)
+
+    def clear_results(self):
+        with self._lock:
+            self._results.clear()
+            self._result_sizes.clear()
+
+    def release(self):
+        """Drop every frame and result and delete spilled partitions, e.g. when a tenant is unloaded"""
+        with self._lock:
+            self._frames.clear()
+            self.clear_results()
+            shutil.rmtree(self.spill_dir, ignore_errors=True)
+
+    # Budget
+
+    def memory_usage(self):
+        """Bytes held per frame plus the total for cached results"""
+        with self._lock:
+            usage = {name: managed.memory_bytes for name, managed in self._frames.items()}
+            usage['cached_results'] = sum(self._result_sizes.values())
+            return usage
+
+    def total_bytes(self):
+        return sum(self.memory_usage().values())
+
+    def enforce(self, keep=None):
+        """Apply shrinking steps in order until usage fits the budget; the ``keep`` result is never evicted"""
+        with self._lock:
+            if self.total_bytes() <= self.budget_bytes:
+                return
+
+            for name, managed in self._frames.items():
+                if managed.compacted:
+                    continue
+                before = managed.memory_bytes
+                managed.frame = downcast_numeric(managed.frame, self.downcast_floats)
+                managed.frame = categorize_strings(managed.frame, self.max_unique_ratio)
+                managed.compacted = True
+                self._record('compact', name, before - managed.memory_bytes)
+            if self.total_bytes() <= self.budget_bytes:
+                return
+
+            frame_bytes = sum(managed.memory_bytes for managed in self._frames.values())
+            if frame_bytes <= self.budget_bytes:
+                for key in list(self._results):
+                    if self.total_bytes() <= self.budget_bytes:
+                        break
+                    if key != keep:
+                        del self._results[key]
+                        self._record('evict', key, self._result_sizes.pop(key))
+            else:
+                # Evicting results cannot bring the frames under budget; it would only force recomputation
+                self._record('overrun', 'frames', frame_bytes - self.budget_bytes)
+            if self.total_bytes() <= self.budget_bytes:
+                return
+
+            for name, managed in self._frames.items():
+                if managed.date_col is not None:
+                    self._spill_cold(name, managed)
+                if self.total_bytes() <= self.budget_bytes:
+                    return
+
+    def _spill_cold(self, name, managed):
+        """Move months older than ``hot_days`` before the latest date to disk"""
+        dates = managed.frame[managed.date_col]
+        if dates.empty:
+            return
+        cutoff = dates.max() - pd.Timedelta(days=self.hot_days)
+        cold_mask = dates < cutoff
+        if not cold_mask.any():
+            return
+
+        before = managed.memory_bytes
+        cold = managed.frame[cold_mask]
+        for month, partition in cold.groupby(cold[managed.date_col].dt.to_period('M')):
+            path = self.spill_dir / f"{name}-{month}-{len(managed.spilled)}.pkl"
+            partition.to_pickle(path)
+            managed.spilled.append({
+                'start': partition[managed.date_col].min(),
+                'end': partition[managed.date_col].max(),
+                'path': path,
+                'rows': len(partition),
+            })
+        managed.frame = managed.frame[~cold_mask]
+        self._record('spill', name, before - managed.memory_bytes)
+
+    def _record(self, action, target, freed_bytes):
+        self.actions.append({'action': action, 'target': str(target), 'freed_bytes': int(freed_bytes)})
+
+    def stats(self):
+        with self._lock:
+            return {
+                'budget_bytes': self.budget_bytes,
+                'usage_bytes': self.memory_usage(),
+                'cached_results': len(self._results),
+                'spilled_partitions': sum(len(managed.spilled) for managed in self._frames.values()),
+                'actions': list(self.actions),
+            }
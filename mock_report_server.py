@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Local mock of the ad platforms' reporting APIs
+Serves the platform CSVs from a data directory through the endpoints,
+paging and field names report_connectors expects, using only the standard
+library, so connector pulls can be tested without network access:
+
+    /facebook/insights   /google/reports   /tiktok/report
+
+Failure injection for testing retries: ``fail_every=n`` answers every n-th
+request with 503, and ``requests_per_second`` answers requests over a
+per-platform rate with 429 and a Retry-After header. ``latency`` delays every
+response to mimic a remote API.
+"""
+
+import argparse
+import json
+import threading
+import time
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
+
+import pandas as pd
+
+from data_processing import PLATFORM_FILES
+from report_connectors import CONNECTORS
+
+
+def _facebook_page(rows, params, total_rows):
+    return {'data': rows, 'summary': {'total_count': total_rows}}
+
+
+def _google_page(rows, params, total_rows):
+    page_size = int(params['pageSize'])
+    return {'results': rows, 'totalPages': max(1, -(-total_rows // page_size))}
+
+
+def _tiktok_page(rows, params, total_rows):
+    page_size = int(params['page_size'])
+    return {'data': {'list': rows, 'page_info': {'total_page': max(1, -(-total_rows // page_size)), 'total_number': total_rows}}}
+
+
+# Platform -> (date range params, page size param, row offset of the requested page, response body)
+ENDPOINTS = {
+    'Facebook': (('since', 'until'), 'limit', lambda params: int(params['offset']), _facebook_page),
+    'Google': (('startDate', 'endDate'), 'pageSize',
+               lambda params: (int(params['page']) - 1) * int(params['pageSize']), _google_page),
+    'TikTok': (('start_date', 'end_date'), 'page_size',
+               lambda params: (int(params['page']) - 1) * int(params['page_size']), _tiktok_page),
+}
+
+
+class MockReportService:
+    """Per-platform report rows in API field names, with optional injected failures"""
+
+    def __init__(self, data_dir='.', fail_every=0, requests_per_second=None, latency=0):
+        self.reports = {}
+        for platform, filename in PLATFORM_FILES.items():
+            report = pd.read_csv(Path(data_dir) / filename, dtype={'date': str})
+            fields = {column: field for field, column in CONNECTORS[platform].fields.items()}
+            self.reports[platform] = report.rename(columns=fields)
+        self.fail_every = fail_every
+        self.requests_per_second = requests_per_second
+        self.latency = latency
+        self.requests = 0
+        self._last_request = {}
+        self._lock = threading.Lock()
+
+    def check_limits(self, platform):
+        """Status to fail this request with (503 or 429), or None to serve it"""
+        with self._lock:
+            self.requests += 1
+            if self.fail_every and self.requests % self.fail_every == 0:
+                return HTTPStatus.SERVICE_UNAVAILABLE
+            if self.requests_per_second:
+                now = time.monotonic()
+                if now - self._last_request.get(platform, float('-inf')) < 1 / self.requests_per_second:
+                    return HTTPStatus.TOO_MANY_REQUESTS
+                self._last_request[platform] = now
+        return None
+
+    def page(self, platform, params):
+        """Response body for one page of a platform's report"""
+        (start_param, end_param), size_param, offset, render = ENDPOINTS[platform]
+        report = self.reports[platform]
+        date_field = next(field for field, column in CONNECTORS[platform].fields.items() if column == 'date')
+        in_range = (report[date_field] >= params[start_param]) & (report[date_field] <= params[end_param])
+        selected = report[in_range]
+
+        start = offset(params)
+        rows = selected.iloc[start:start + int(params[size_param])]
+        # NaN is not valid JSON; missing values are sent as null
+        records = rows.astype(object).where(rows.notna(), None).to_dict(orient='records')
+        return render(records, params, len(selected))
+
+
+def make_handler(service):
+    paths = {connector.path: platform for platform, connector in CONNECTORS.items()}
+
+    class MockReportHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            url = urlsplit(self.path)
+            platform = paths.get(url.path)
+            if platform is None:
+                return self._send_json(HTTPStatus.NOT_FOUND, {'error': f"Unknown report {url.path}"})
+
+            time.sleep(service.latency)
+            status = service.check_limits(platform)
+            if status is not None:
+                headers = {'Retry-After': f"{1 / service.requests_per_second:.3f}"} if status == HTTPStatus.TOO_MANY_REQUESTS else {}
+                return self._send_json(status, {'error': status.phrase}, headers)
+
+            params = {key: values[0] for key, values in parse_qs(url.query).items()}
+            try:
+                body = service.page(platform, params)
+            except (KeyError, ValueError) as e:
+                return self._send_json(HTTPStatus.BAD_REQUEST, {'error': f"Invalid parameters: {e}"})
+            self._send_json(HTTPStatus.OK, body)
+
+        def _send_json(self, status, payload, headers=None):
+            body = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            if not self.server.quiet:
+                super().log_message(format, *args)
+
+    return MockReportHandler
+
+
+def create_server(host='localhost', port=8700, data_dir='.', quiet=False, **kwargs):
+    """Build (but don't start) a threaded mock report server"""
+    service = MockReportService(data_dir, **kwargs)
+    server = ThreadingHTTPServer((host, port), make_handler(service))
+    server.quiet = quiet
+    server.service = service
+    return server
+
+
+def start_mock_server(data_dir='.', host='localhost', port=0, **kwargs):
+    """Start a quiet mock server on a daemon thread (port 0 picks a free port); returns (server, base_url)"""
+    server = create_server(host, port, data_dir, quiet=True, **kwargs)
+    threading.Thread(target=server.serve_forever, name='mock-report-server', daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the platform CSVs through mock reporting APIs")
+    parser.add_argument("--host", default="localhost", help="Host to bind")
+    parser.add_argument("--port", type=int, default=8700, help="Port to listen on")
+    parser.add_argument("--data-dir", default=".", help="Directory containing the platform CSV files")
+    parser.add_argument("--fail-every", type=int, default=0, help="Answer every n-th request with 503")
+    parser.add_argument("--rate-limit", type=float, help="Requests per second per platform before 429s")
+    parser.add_argument("--latency", type=float, default=0, help="Seconds to delay every response")
+    args = parser.parse_args()
+
+    server = create_server(args.host, args.port, args.data_dir, fail_every=args.fail_every,
+                           requests_per_second=args.rate_limit, latency=args.latency)
+    print(f"Mock report server available at: http://{args.host}:{args.port}")
+    print("Press Ctrl+C to stop the server")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nMock report server stopped by user")
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
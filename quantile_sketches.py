@@ -0,0 +1,268 @@
+"""
+Mergeable quantile sketches of the per-row marketing ratios
+Each (platform, tactic, state, date) partition keeps, per metric, the counts
+of its values in logarithmic buckets (a DDSketch): every value in bucket i
+lies within ``relative_accuracy`` of the bucket's representative value, so
+any quantile read from the buckets has at most that relative error. Merging
+partitions is adding their counts, which is exact and order-independent, so
+box/violin statistics for any filter selection come from summing a few
+bucket counts instead of scanning or sorting the rows. Exact count, sum, min
+and max are kept alongside for means and the box plot whiskers.
+"""
+
+import numpy as np
+import pandas as pd
+
+from data_processing import concat_aligned
+from instrumentation import traced
+
+SKETCH_METRICS = ['roas', 'cpc', 'ctr', 'cpm']
+PARTITION_KEYS = ['platform', 'tactic', 'state', 'date']
+DEFAULT_RELATIVE_ACCURACY = 0.01
+# Magnitudes outside [1 / MAX_MAGNITUDE, MAX_MAGNITUDE] share the edge buckets (or zero's)
+MAX_MAGNITUDE = 1e12
+SKETCH_FRAMES = ['sketch_partitions', 'sketch_buckets', 'sketch_stats']
+
+
+class QuantileSketches:
+    """Per-partition bucket counts for SKETCH_METRICS, merged on demand for any filter"""
+
+    def __init__(self, partitions, buckets, stats, metrics=SKETCH_METRICS,
+                 relative_accuracy=DEFAULT_RELATIVE_ACCURACY):
+        self.partitions = partitions  # one row per partition: PARTITION_KEYS
+        self.buckets = buckets        # partition, metric (index into metrics), bucket, count
+        self.stats = stats            # partition, metric, count, sum, min, max
+        self.metrics = list(metrics)
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.max_index = int(np.ceil(np.log(MAX_MAGNITUDE) / np.log(self.gamma)))
+        # Signed bucket ids span [-offset, offset]; 0 holds zeros
+        self.offset = 2 * self.max_index + 1
+
+    @classmethod
+    def from_frames(cls, frames, **kwargs):
+        return cls(*(frames[name] for name in SKETCH_FRAMES), **kwargs)
+
+    @property
+    def frames(self):
+        """{name: frame} for storing the sketches in the memory governor"""
+        return dict(zip(SKETCH_FRAMES, [self.partitions, self.buckets, self.stats]))
+
+    # Building
+
+    def bucket_ids(self, values):
+        """Signed bucket id of each value: 0 for zero, negative ids mirror positive ones"""
+        magnitude = np.abs(values)
+        index = np.ceil(np.log(np.maximum(magnitude, 1 / MAX_MAGNITUDE)) / np.log(self.gamma))
+        ids = np.clip(index, -self.max_index, self.max_index).astype(np.int32) + self.max_index + 1
+        ids[magnitude < 1 / MAX_MAGNITUDE] = 0
+        return np.where(values < 0, -ids, ids)
+
+    def bucket_values(self, ids):
+        """Representative value of each signed bucket id (within relative_accuracy of its members)"""
+        ids = np.asarray(ids)
+        index = np.abs(ids) - self.max_index - 1
+        values = 2 * self.gamma ** index / (self.gamma + 1)
+        return np.where(ids == 0, 0.0, np.sign(ids) * values)
+
+    @classmethod
+    @traced(name='QuantileSketches.build')
+    def build(cls, marketing_df, metrics=SKETCH_METRICS, relative_accuracy=DEFAULT_RELATIVE_ACCURACY):
+        """Sketch every metric of every (platform, tactic, state, date) partition in one pass each"""
+        sketches = cls(None, None, None, metrics, relative_accuracy)
+        partition, partitions = partition_ids(marketing_df, PARTITION_KEYS)
+
+        buckets, stats = [], []
+        for metric_code, metric in enumerate(sketches.metrics):
+            values = marketing_df[metric].to_numpy(dtype=float)
+            valid = ~np.isnan(values)
+            values, metric_partition = values[valid], partition[valid]
+
+            # Sorting one int64 per row (partition, bucket) is much cheaper than sorting values within partitions
+            span = 2 * sketches.offset + 1
+            keys, counts = np.unique(
+                metric_partition.astype(np.int64) * span + sketches.bucket_ids(values) + sketches.offset,
+                return_counts=True
+            )
+            buckets.append(pd.DataFrame({
+                'partition': (keys // span).astype(np.int32),
+                'metric': np.int8(metric_code),
+                'bucket': (keys % span - sketches.offset).astype(np.int32),
+                'count': counts.astype(np.int32),
+            }))
+
+            metric_stats = pd.Series(values).groupby(metric_partition).agg(['count', 'sum', 'min', 'max'])
+            metric_stats.insert(0, 'metric', np.int8(metric_code))
+            stats.append(metric_stats.rename_axis('partition').reset_index())
+
+        sketches.partitions = partitions
+        sketches.buckets = pd.concat(buckets, ignore_index=True)
+        sketches.stats = pd.concat(stats, ignore_index=True)
+        return sketches
+
+    def replace_platform(self, platform, platform_df):
+        """Sketches with one platform's partitions rebuilt from its rows; other partitions are reused"""
+        part = QuantileSketches.build(platform_df, self.metrics, self.relative_accuracy)
+        partitions, tables = splice_partitions(
+            self.partitions, {'buckets': self.buckets, 'stats': self.stats},
+            (self.partitions['platform'] == platform).to_numpy(),
+            part.partitions, {'buckets': part.buckets, 'stats': part.stats},
+            sort_columns=['metric']
+        )
+        return QuantileSketches(partitions, tables['buckets'], tables['stats'], self.metrics, self.relative_accuracy)
+
+    # Merging
+
+    def _merge(self, metric, by=None, start_date=None, end_date=None, filters=None):
+        """(group labels, dense bucket counts per group, summed stats per group) for a selection"""
+        partitions = self.partitions
+        selected = np.ones(len(partitions), dtype=bool)
+        if start_date is not None:
+            selected &= (partitions['date'] >= pd.Timestamp(start_date)).to_numpy()
+        if end_date is not None:
+            selected &= (partitions['date'] <= pd.Timestamp(end_date)).to_numpy()
+        for column, values in (filters or {}).items():
+            if values is not None:
+                selected &= partitions[column].isin(values).to_numpy()
+
+        if by is None:
+            labels, group = pd.Index(['all']), np.zeros(len(partitions), dtype=np.int64)
+        else:
+            group, labels = pd.factorize(partitions[by], sort=True)
+            group = group.astype(np.int64)
+        # Unselected partitions go to an extra group that is dropped at the end
+        group = np.where(selected, group, len(labels))
+        metric_code = self.metrics.index(metric)
+
+        buckets = _metric_rows(self.buckets, metric_code)
+        span = 2 * self.offset + 1
+        dense = np.bincount(
+            group[buckets['partition'].to_numpy()] * span + buckets['bucket'].to_numpy() + self.offset,
+            weights=buckets['count'].to_numpy(),
+            minlength=(len(labels) + 1) * span
+        ).reshape(len(labels) + 1, span)[:-1]
+
+        stats = _metric_rows(self.stats, metric_code)
+        stats_group = group[stats['partition'].to_numpy()]
+        merged = stats[['count', 'sum', 'min', 'max']].groupby(stats_group).agg(
+            {'count': 'sum', 'sum': 'sum', 'min': 'min', 'max': 'max'}
+        ).reindex(range(len(labels) + 1))[:-1]
+        return labels, dense, merged
+
+    def _quantiles_from_counts(self, dense, merged, qs):
+        cumulative = dense.cumsum(axis=1)
+        total = cumulative[:, -1:]
+        ranks = np.asarray(qs, dtype=float)[None, :] * np.maximum(total - 1, 0)
+        positions = np.stack([
+            np.searchsorted(row, rank, side='right') for row, rank in zip(cumulative, ranks)
+        ]) if len(dense) else np.empty((0, len(qs)), dtype=np.int64)
+        values = self.bucket_values(np.minimum(positions, dense.shape[1] - 1) - self.offset)
+        lowest, highest = merged[['min']].to_numpy(), merged[['max']].to_numpy()
+        values = np.clip(values, lowest, highest)
+        # The extremes are tracked exactly
+        qs = np.asarray(qs, dtype=float)[None, :]
+        values = np.where(qs <= 0, lowest, np.where(qs >= 1, highest, values))
+        return np.where(total > 0, values, np.nan)
+
+    def quantiles(self, metric, qs, by=None, start_date=None, end_date=None, filters=None):
+        """Quantiles ``qs`` of ``metric`` per ``by`` group (rows) for the selected partitions"""
+        labels, dense, merged = self._merge(metric, by, start_date, end_date, filters)
+        values = self._quantiles_from_counts(dense, merged, qs)
+        return pd.DataFrame(values, index=pd.Index(labels, name=by), columns=list(qs))
+
+    def box_stats(self, metric, by=None, start_date=None, end_date=None, filters=None):
+        """Box plot statistics of ``metric`` per ``by`` group for the selected partitions
+
+        Whiskers (fences) end at the most extreme values within 1.5 IQR of the
+        quartiles, as in a regular box plot, read from the bucket counts.
+        """
+        labels, dense, merged = self._merge(metric, by, start_date, end_date, filters)
+        q1, median, q3 = self._quantiles_from_counts(dense, merged, [0.25, 0.5, 0.75]).T
+        iqr = q3 - q1
+        lowest, highest = merged['min'].to_numpy(), merged['max'].to_numpy()
+
+        values = self.bucket_values(np.arange(dense.shape[1]) - self.offset)[None, :]
+        occupied = dense > 0
+        lowerfence = np.where(occupied & (values >= (q1 - 1.5 * iqr)[:, None]), values, np.inf).min(axis=1)
+        upperfence = np.where(occupied & (values <= (q3 + 1.5 * iqr)[:, None]), values, -np.inf).max(axis=1)
+        # The exact extremes are the whiskers whenever they fall inside the fences
+        lowerfence = np.where(lowest >= q1 - 1.5 * iqr, lowest, np.maximum(lowerfence, lowest))
+        upperfence = np.where(highest <= q3 + 1.5 * iqr, highest, np.minimum(upperfence, highest))
+
+        stats = pd.DataFrame({
+            'count': merged['count'].fillna(0).astype('int64').to_numpy(),
+            'mean': (merged['sum'] / merged['count']).to_numpy(),
+            'min': lowest,
+            'lowerfence': lowerfence,
+            'q1': q1,
+            'median': median,
+            'q3': q3,
+            'upperfence': upperfence,
+            'max': highest,
+        }, index=pd.Index(labels, name=by))
+        return stats[stats['count'] > 0].reset_index(drop=by is None)
+
+
+def _metric_rows(frame, metric_code):
+    """One metric's rows: tables are built metric by metric, so each is a contiguous slice"""
+    start, stop = np.searchsorted(frame['metric'].to_numpy(), [metric_code, metric_code + 1])
+    return frame.iloc[start:stop]
+
+
+def partition_ids(frame, keys):
+    """Dense partition id per row and the partitions table (one row per distinct key combination)
+
+    Text keys are combined through their categorical codes and dates through
+    day offsets, so rows are partitioned by factorizing one int64 per row.
+    """
+    codes, sizes, decoders = [], [], []
+    for column in keys:
+        if pd.api.types.is_datetime64_any_dtype(frame[column]):
+            days = frame[column].to_numpy().astype('datetime64[D]').astype(np.int64)
+            first_day = days.min() if len(days) else 0
+            codes.append(days - first_day)
+            sizes.append(int(days.max() - first_day) + 1 if len(days) else 1)
+            decoders.append(lambda day_codes, first_day=first_day:
+                            (day_codes + first_day).astype('datetime64[D]').astype('datetime64[ns]'))
+        else:
+            values = pd.Categorical(frame[column])
+            codes.append(values.codes.astype(np.int64))
+            sizes.append(len(values.categories))
+            decoders.append(lambda category_codes, dtype=values.dtype:
+                            pd.Categorical.from_codes(category_codes, dtype=dtype))
+
+    combined = np.zeros(len(frame), dtype=np.int64)
+    for column_codes, size in zip(codes, sizes):
+        combined = combined * size + column_codes
+    partition, uniques = pd.factorize(combined, sort=True)
+
+    # Decode each partition's key back into its columns
+    columns = {}
+    remainder = uniques.astype(np.int64)
+    for column, size, decode in reversed(list(zip(keys, sizes, decoders))):
+        remainder, column_codes = np.divmod(remainder, size)
+        columns[column] = decode(column_codes)
+    return partition.astype(np.int32), pd.DataFrame({column: columns[column] for column in keys})
+
+
+def splice_partitions(partitions, tables, drop, new_partitions, new_tables, id_column='partition', sort_columns=()):
+    """Drop the partitions flagged in ``drop`` and append ``new_partitions``, renumbering ids in ``tables``
+
+    ``tables`` and ``new_tables`` are {name: frame} whose ``id_column`` holds
+    partition ids; rows stay sorted by ``sort_columns`` then partition id.
+    """
+    kept = np.flatnonzero(~drop)
+    renumbered = np.full(len(partitions), -1, dtype=np.int64)
+    renumbered[kept] = np.arange(len(kept))
+
+    spliced = {}
+    for name, table in tables.items():
+        ids = table[id_column].to_numpy()
+        old = table[~drop[ids]]
+        old = old.assign(**{id_column: renumbered[ids[~drop[ids]]].astype(table[id_column].dtype)})
+        new = new_tables[name]
+        new = new.assign(**{id_column: (new[id_column] + len(kept)).astype(table[id_column].dtype)})
+        spliced[name] = pd.concat([old, new], ignore_index=True).sort_values(
+            [*sort_columns, id_column], kind='stable', ignore_index=True
+        )
+    return concat_aligned([partitions[~drop], new_partitions], ignore_index=True), spliced
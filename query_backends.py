@@ -0,0 +1,302 @@
+"""
+Pluggable query backends for the group-by aggregations
+The dashboard's create_* functions and MarketingAnalyzer's marketing
+aggregations are all "group by keys, sum/mean some columns" queries. A backend
+runs them over an in-memory DataFrame or directly over Parquet/CSV files
+(``ScanSource``):
+
+- ``pandas`` (default): single-threaded, in memory
+- ``duckdb``: embedded, multi-threaded, streams files out of core
+- ``polars``: lazy frames, multi-threaded, streaming engine for files
+
+DuckDB and Polars are optional. Every backend returns the pandas backend's
+columns, dtypes and row order; values match up to floating-point summation
+order. Choose the default with DASHBOARD_QUERY_BACKEND.
+"""
+
+import os
+import threading
+from pathlib import Path
+
+import pandas as pd
+
+from lazy_imports import find_missing_packages, lazy_import
+
+duckdb = lazy_import('duckdb')
+pl = lazy_import('polars')
+pq = lazy_import('pyarrow.parquet')
+
+BACKEND_ENV_VAR = 'DASHBOARD_QUERY_BACKEND'
+DEFAULT_BACKEND = 'pandas'
+AGGREGATIONS = ('sum', 'mean')
+
+# Per-row marketing ratios: name -> (numerator, denominator, scale), rounded to 2 places
+RATIO_METRICS = {
+    'ctr': ('clicks', 'impression', 100),
+    'cpc': ('spend', 'clicks', 1),
+    'roas': ('attributed revenue', 'spend', 1),
+    'cpm': ('spend', 'impression', 1000),
+}
+
+
+class ScanSource:
+    """Parquet/CSV files to aggregate without loading them into pandas first
+
+    ``files`` is a list of paths, or a dict mapping each path to constant
+    columns to add (e.g. ``{'Facebook.csv': {'platform': 'Facebook'}}`` for the
+    raw exports). Ratio metrics missing from the files are computed while
+    scanning. Scans do not re-run ingest validation, so point them at
+    validated data for results identical to the in-memory path.
+    """
+
+    def __init__(self, files):
+        if not isinstance(files, dict):
+            files = {path: {} for path in files}
+        self.files = {Path(path): dict(constants) for path, constants in files.items()}
+
+    @classmethod
+    def from_platform_files(cls, data_dir, platform_files):
+        """Scan the raw per-platform exports, tagging rows with their platform"""
+        return cls({
+            Path(data_dir) / filename: {'platform': platform}
+            for platform, filename in platform_files.items()
+        })
+
+    @staticmethod
+    def is_parquet(path):
+        return path.suffix.lower() in ('.parquet', '.pq')
+
+    def __repr__(self):
+        return f"ScanSource({[str(path) for path in self.files]})"
+
+
+def _check_aggregations(aggs):
+    unsupported = {func for func in aggs.values() if func not in AGGREGATIONS}
+    if unsupported:
+        raise ValueError(f"Unsupported aggregations {sorted(unsupported)}; use one of {AGGREGATIONS}")
+
+
+def _encode_categories(frame, keys):
+    """Swap categorical keys for their integer codes (NaN when missing)
+
+    Engines then group on plain numbers instead of converting and hashing
+    strings; _match_pandas maps the codes back.
+    """
+    encoded = {}
+    for key in keys:
+        if isinstance(frame[key].dtype, pd.CategoricalDtype):
+            codes = frame[key].cat.codes
+            encoded[key] = codes.where(codes >= 0)
+    return frame.assign(**encoded) if encoded else frame
+
+
+def _match_pandas(result, data, keys, aggs):
+    """Give another engine's result the pandas backend's column order, dtypes and row order"""
+    result = result[keys + list(aggs)]
+    for key in keys:
+        if isinstance(data, pd.DataFrame):
+            dtype = data[key].dtype
+            if isinstance(dtype, pd.CategoricalDtype):
+                result[key] = pd.Categorical.from_codes(result[key].astype('int64'), dtype=dtype)
+            else:
+                result[key] = result[key].astype(dtype)
+        elif pd.api.types.is_datetime64_any_dtype(result[key]):
+            result[key] = result[key].astype('datetime64[ns]')
+        else:
+            result[key] = result[key].astype(str)
+    for column, func in aggs.items():
+        if func == 'mean' or not pd.api.types.is_integer_dtype(result[column]):
+            result[column] = result[column].astype('float64')
+        else:
+            result[column] = result[column].astype('int64')
+    return result.sort_values(keys, kind='stable', ignore_index=True)
+
+
+class PandasBackend:
+    """In-memory pandas group-by; the reference implementation"""
+
+    name = 'pandas'
+
+    def aggregate(self, data, keys, aggs):
+        """Group ``data`` by ``keys`` and aggregate {column: 'sum'|'mean'} like DataFrame.groupby().agg()"""
+        _check_aggregations(aggs)
+        if isinstance(data, pd.DataFrame):
+            return data.groupby(keys, observed=True).agg(aggs).reset_index()
+        frame = self.load(data, keys + list(aggs))
+        return _match_pandas(frame.groupby(keys, observed=True).agg(aggs).reset_index(), data, keys, aggs)
+
+    def load(self, source, columns):
+        """Read the columns a query needs from every file of a ScanSource"""
+        # Ratio inputs are read too, in case the files don't carry the ratio itself
+        needed = set(columns).union(*(RATIO_METRICS[name][:2] for name in columns if name in RATIO_METRICS))
+        frames = []
+        for path, constants in source.files.items():
+            if ScanSource.is_parquet(path):
+                present = pq.read_schema(path).names
+                frame = pd.read_parquet(path, columns=[column for column in present if column in needed])
+            else:
+                frame = pd.read_csv(path, usecols=lambda column: column in needed)
+                if 'date' in frame.columns:
+                    frame['date'] = pd.to_datetime(frame['date'], errors='coerce')
+            for column, value in constants.items():
+                frame[column] = value
+            frames.append(frame)
+        frame = pd.concat(frames, ignore_index=True)
+
+        for name, (numerator, denominator, scale) in RATIO_METRICS.items():
+            if name in columns and name not in frame.columns:
+                frame[name] = (frame[numerator] / frame[denominator].where(frame[denominator] != 0) * scale).round(2)
+        return frame[list(dict.fromkeys(columns))]
+
+
+class DuckDBBackend:
+    """Embedded DuckDB: parallel hash aggregation over DataFrames (zero-copy) or files"""
+
+    name = 'duckdb'
+
+    def __init__(self, threads=None):
+        _require('duckdb')
+        self.connection = duckdb.connect()
+        if threads:
+            self.connection.execute(f"SET threads TO {int(threads)}")
+
+    @staticmethod
+    def _quote(identifier):
+        return '"' + identifier.replace('"', '""') + '"'
+
+    def _scan_sql(self, cursor, source, columns):
+        selects = []
+        for path, constants in source.files.items():
+            reader = 'read_parquet' if ScanSource.is_parquet(path) else 'read_csv'
+            literals = ''.join(
+                f", {self._literal(value)} AS {self._quote(column)}" for column, value in constants.items()
+            )
+            selects.append(f"SELECT *{literals} FROM {reader}({self._literal(str(path))})")
+        union = ' UNION ALL BY NAME '.join(selects)
+
+        present = {row[0] for row in cursor.execute(f"DESCRIBE {union}").fetchall()}
+        ratios = ''.join(
+            f", round_even({self._quote(numerator)} / nullif({self._quote(denominator)}, 0) * {scale}, 2)"
+            f" AS {self._quote(name)}"
+            for name, (numerator, denominator, scale) in RATIO_METRICS.items()
+            if name in columns and name not in present
+        )
+        return f"SELECT *{ratios} FROM ({union})" if ratios else union
+
+    @staticmethod
+    def _literal(value):
+        return "'" + str(value).replace("'", "''") + "'"
+
+    def aggregate(self, data, keys, aggs):
+        _check_aggregations(aggs)
+        # Cursors share the database but are safe to use from separate threads
+        cursor = self.connection.cursor()
+        try:
+            if isinstance(data, pd.DataFrame):
+                # Registering binds every column, so hand over only the ones the query reads
+                cursor.register('source', _encode_categories(data[list(dict.fromkeys(keys + list(aggs)))], keys))
+            else:
+                cursor.execute(f"CREATE TEMP VIEW source AS {self._scan_sql(cursor, data, keys + list(aggs))}")
+            types = dict(cursor.execute("SELECT column_name, column_type FROM (DESCRIBE source)").fetchall())
+
+            expressions = []
+            for column, func in aggs.items():
+                quoted = self._quote(column)
+                if func == 'mean':
+                    expressions.append(f"avg({quoted}) AS {quoted}")
+                elif types[column] in ('BIGINT', 'INTEGER', 'SMALLINT', 'TINYINT'):
+                    expressions.append(f"CAST(coalesce(sum({quoted}), 0) AS BIGINT) AS {quoted}")
+                else:
+                    # fsum is Kahan-compensated like pandas' groupby sum
+                    expressions.append(f"coalesce(fsum({quoted}), 0) AS {quoted}")
+            key_list = ', '.join(self._quote(key) for key in keys)
+            not_null = ' AND '.join(f"{self._quote(key)} IS NOT NULL" for key in keys)
+
+            result = cursor.execute(
+                f"SELECT {key_list}, {', '.join(expressions)} FROM source WHERE {not_null} GROUP BY {key_list}"
+            ).df()
+        finally:
+            cursor.close()
+        return _match_pandas(result, data, keys, aggs)
+
+
+class PolarsBackend:
+    """Polars lazy queries: multi-threaded, with the streaming engine for file scans"""
+
+    name = 'polars'
+
+    def __init__(self):
+        _require('polars')
+
+    def _lazy(self, data, columns):
+        if isinstance(data, pd.DataFrame):
+            columns = list(dict.fromkeys(columns))
+            return pl.from_pandas(_encode_categories(data[columns], columns)).lazy()
+
+        frames = []
+        for path, constants in data.files.items():
+            if ScanSource.is_parquet(path):
+                frame = pl.scan_parquet(path)
+            else:
+                frame = pl.scan_csv(path, try_parse_dates=True)
+            frames.append(frame.with_columns([pl.lit(value).alias(column) for column, value in constants.items()]))
+        lazy = pl.concat(frames, how='diagonal_relaxed')
+
+        present = set(lazy.collect_schema().names())
+        ratios = [
+            pl.when(pl.col(denominator) != 0)
+            .then(pl.col(numerator) / pl.col(denominator) * scale)
+            .otherwise(None)
+            .round(2, mode='half_to_even')
+            .alias(name)
+            for name, (numerator, denominator, scale) in RATIO_METRICS.items()
+            if name in columns and name not in present
+        ]
+        return lazy.with_columns(ratios) if ratios else lazy
+
+    def aggregate(self, data, keys, aggs):
+        _check_aggregations(aggs)
+        expressions = [
+            pl.col(column).mean() if func == 'mean' else pl.col(column).sum()
+            for column, func in aggs.items()
+        ]
+        query = self._lazy(data, keys + list(aggs)).drop_nulls(keys).group_by(keys).agg(expressions)
+        engine = 'in-memory' if isinstance(data, pd.DataFrame) else 'streaming'
+        return _match_pandas(query.collect(engine=engine).to_pandas(), data, keys, aggs)
+
+
+BACKENDS = {
+    'pandas': PandasBackend,
+    'duckdb': DuckDBBackend,
+    'polars': PolarsBackend,
+}
+_instances = {}
+_instances_lock = threading.Lock()
+
+
+def _require(package):
+    if find_missing_packages([package]):
+        raise ImportError(f"The {package} query backend needs the optional package: pip install {package}")
+
+
+def available_backends():
+    """Names of backends whose packages are installed"""
+    return [name for name in BACKENDS if name == 'pandas' or not find_missing_packages([name])]
+
+
+def get_backend(backend=None):
+    """Backend instance by name, defaulting to DASHBOARD_QUERY_BACKEND or pandas
+
+    Backend instances are passed through, so functions can accept either.
+    """
+    if backend is None:
+        backend = os.environ.get(BACKEND_ENV_VAR, DEFAULT_BACKEND)
+    if not isinstance(backend, str):
+        return backend
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown query backend '{backend}'; choose from {', '.join(BACKENDS)}")
+
+    with _instances_lock:
+        if backend not in _instances:
+            _instances[backend] = BACKENDS[backend]()
+        return _instances[backend]
@@ -0,0 +1,364 @@
+#!/usr/bin/env python3
+"""
+Asyncio connectors for the ad platforms' reporting APIs
+Each platform has a connector that knows its report endpoint, paging
+parameters and field names, and turns report pages into rows of the platform
+CSV schema that data_processing loads. Pulling a report:
+
+- reads page 1 to learn the page count, then fetches the remaining pages
+  concurrently (at most ``max_concurrency`` requests in flight per platform)
+- paces requests with a per-platform token bucket (``requests_per_second``)
+- retries timeouts, connection errors, 429 and 5xx responses with exponential
+  backoff and jitter, honouring Retry-After
+- streams pages, in page order, into ``<Platform>.csv`` and (with pyarrow)
+  one Parquet row group per page in ``<Platform>.parquet``
+
+Only a window of pages past the next one to write is fetched ahead, so memory
+stays bounded by the window rather than the report size. Files are written
+to temporary names and renamed when the pull completes, so the dashboard's
+source watcher sees one finished change per platform.
+
+HTTP requests use urllib on a per-pull thread pool sized to
+``max_concurrency``, so no extra dependencies are needed. mock_report_server
+serves the same endpoints locally for tests and dry runs.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import time
+import urllib.error
+import urllib.request
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from pathlib import Path
+from urllib.parse import urlencode
+
+import pandas as pd
+
+from data_processing import PLATFORM_FILES
+from lazy_imports import find_missing_packages, lazy_import
+
+pa = lazy_import('pyarrow')
+pq = lazy_import('pyarrow.parquet')
+
+TOKEN_ENV_VAR = 'REPORT_API_TOKEN'
+# Platform CSV schema read by data_processing.load_platform_data
+REPORT_COLUMNS = {
+    'date': 'string',
+    'tactic': 'string',
+    'state': 'string',
+    'campaign': 'string',
+    'impression': 'Int64',
+    'clicks': 'Int64',
+    'spend': 'float64',
+    'attributed revenue': 'float64',
+}
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class ConnectorError(RuntimeError):
+    """A report request failed permanently (non-retryable status or retries exhausted)"""
+
+
+class RateLimiter:
+    """Token bucket: at most ``rate`` acquisitions per second after an initial ``burst``"""
+
+    def __init__(self, rate, burst=1):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = burst
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class ReportConnector(ABC):
+    """Paginated report pulls from one platform's API; subclasses describe the endpoint"""
+
+    platform = None
+    path = None
+    # API field -> REPORT_COLUMNS column
+    fields = {}
+
+    def __init__(self, base_url, token=None, page_size=500, max_concurrency=4, requests_per_second=10,
+                 max_retries=5, backoff_seconds=0.5, timeout=30):
+        self.base_url = base_url.rstrip('/')
+        self.token = token
+        self.page_size = page_size
+        self.max_concurrency = max_concurrency
+        self.requests_per_second = requests_per_second
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self.timeout = timeout
+        self.stats = {'requests': 0, 'retries': 0, 'pages': 0, 'rows': 0}
+
+    @abstractmethod
+    def page_params(self, start_date, end_date, page):
+        """Query parameters for one (1-based) page"""
+
+    @abstractmethod
+    def parse_page(self, payload):
+        """(list of API row dicts, total page count) from one response body"""
+
+    def page_url(self, start_date, end_date, page):
+        return f"{self.base_url}{self.path}?{urlencode(self.page_params(start_date, end_date, page))}"
+
+    def to_frame(self, rows):
+        """API rows as a frame with REPORT_COLUMNS' names, order and dtypes"""
+        frame = pd.DataFrame.from_records(rows, columns=list(self.fields)).rename(columns=self.fields)
+        for column, dtype in REPORT_COLUMNS.items():
+            if dtype != 'string':
+                frame[column] = pd.to_numeric(frame[column], errors='coerce')
+        return frame[list(REPORT_COLUMNS)].astype(REPORT_COLUMNS)
+
+    def _get(self, url):
+        """Blocking GET returning the decoded JSON body; runs on the pull's thread pool"""
+        request = urllib.request.Request(url, headers={'Accept': 'application/json'})
+        if self.token:
+            request.add_header('Authorization', f"Bearer {self.token}")
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            return json.loads(response.read())
+
+    def _retry_delay(self, attempt, error):
+        retry_after = error.headers.get('Retry-After') if isinstance(error, urllib.error.HTTPError) else None
+        try:
+            return float(retry_after)
+        except (TypeError, ValueError):
+            return self.backoff_seconds * 2 ** attempt * (1 + random.random())
+
+    async def fetch_page(self, start_date, end_date, page, limiter, semaphore, executor=None):
+        """(frame, total pages) for one page, retrying transient failures with backoff"""
+        url = self.page_url(start_date, end_date, page)
+        loop = asyncio.get_running_loop()
+        for attempt in range(self.max_retries + 1):
+            async with semaphore:
+                await limiter.acquire()
+                self.stats['requests'] += 1
+                try:
+                    payload = await loop.run_in_executor(executor, self._get, url)
+                    rows, total_pages = self.parse_page(payload)
+                    return self.to_frame(rows), total_pages
+                except urllib.error.HTTPError as e:
+                    if e.code not in RETRY_STATUSES:
+                        raise ConnectorError(f"{self.platform} page {page}: HTTP {e.code} {e.reason}")
+                    error = e
+                except (urllib.error.URLError, OSError, ValueError) as e:
+                    # Timeouts, dropped connections and truncated bodies are retried
+                    error = e
+            if attempt == self.max_retries:
+                raise ConnectorError(f"{self.platform} page {page}: giving up after {attempt + 1} attempts ({error})")
+            self.stats['retries'] += 1
+            await asyncio.sleep(self._retry_delay(attempt, error))
+
+    async def iter_pages(self, start_date, end_date):
+        """Yield each page's frame in page order while later pages are fetched concurrently"""
+        limiter = RateLimiter(self.requests_per_second, burst=self.max_concurrency)
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        executor = ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix=f"report-{self.platform}")
+        pending = {}
+        try:
+            frame, total_pages = await self.fetch_page(start_date, end_date, 1, limiter, semaphore, executor)
+            yield frame
+
+            window = 2 * self.max_concurrency
+            next_page = 2
+            for page in range(2, total_pages + 1):
+                while next_page <= total_pages and len(pending) < window:
+                    pending[next_page] = asyncio.ensure_future(
+                        self.fetch_page(start_date, end_date, next_page, limiter, semaphore, executor)
+                    )
+                    next_page += 1
+                frame, _ = await pending.pop(page)
+                yield frame
+        finally:
+            for task in pending.values():
+                task.cancel()
+            executor.shutdown(wait=False)
+
+
+class FacebookConnector(ReportConnector):
+    """Insights-style endpoint: offset paging, rows under 'data', row count in 'summary'"""
+
+    platform = 'Facebook'
+    path = '/facebook/insights'
+    fields = {
+        'date_start': 'date', 'objective': 'tactic', 'region': 'state', 'campaign_name': 'campaign',
+        'impressions': 'impression', 'clicks': 'clicks', 'spend': 'spend', 'purchase_value': 'attributed revenue',
+    }
+
+    def page_params(self, start_date, end_date, page):
+        return {'since': start_date, 'until': end_date, 'limit': self.page_size, 'offset': (page - 1) * self.page_size}
+
+    def parse_page(self, payload):
+        total_count = payload['summary']['total_count']
+        return payload['data'], max(1, -(-total_count // self.page_size))
+
+
+class GoogleConnector(ReportConnector):
+    """Reporting-style endpoint: numbered pages, rows under 'results'"""
+
+    platform = 'Google'
+    path = '/google/reports'
+    fields = {
+        'segments.date': 'date', 'campaign.advertising_channel': 'tactic', 'geo.state': 'state',
+        'campaign.name': 'campaign', 'metrics.impressions': 'impression', 'metrics.clicks': 'clicks',
+        'metrics.cost': 'spend', 'metrics.conversions_value': 'attributed revenue',
+    }
+
+    def page_params(self, start_date, end_date, page):
+        return {'startDate': start_date, 'endDate': end_date, 'pageSize': self.page_size, 'page': page}
+
+    def parse_page(self, payload):
+        return payload['results'], payload['totalPages']
+
+
+class TikTokConnector(ReportConnector):
+    """Integrated-report-style endpoint: rows under data.list, page count in data.page_info"""
+
+    platform = 'TikTok'
+    path = '/tiktok/report'
+    fields = {
+        'stat_time_day': 'date', 'promotion_type': 'tactic', 'province': 'state', 'campaign_name': 'campaign',
+        'impressions': 'impression', 'clicks': 'clicks', 'spend': 'spend',
+        'total_complete_payment_value': 'attributed revenue',
+    }
+
+    def page_params(self, start_date, end_date, page):
+        return {'start_date': start_date, 'end_date': end_date, 'page_size': self.page_size, 'page': page}
+
+    def parse_page(self, payload):
+        return payload['data']['list'], payload['data']['page_info']['total_page']
+
+
+CONNECTORS = {connector.platform: connector for connector in (FacebookConnector, GoogleConnector, TikTokConnector)}
+
+
+class ReportWriter:
+    """Appends report pages to a platform CSV and, if requested, a Parquet file, renamed into place on close"""
+
+    def __init__(self, csv_path, parquet_path=None):
+        self.paths = {'csv': Path(csv_path)}
+        if parquet_path is not None:
+            self.paths['parquet'] = Path(parquet_path)
+        self.temporary = {kind: path.with_name(f".{path.name}.tmp") for kind, path in self.paths.items()}
+        self.rows = 0
+        self._csv = open(self.temporary['csv'], 'w', newline='', encoding='utf-8')
+        self._csv.write(','.join(REPORT_COLUMNS) + '\n')
+        self._parquet = None
+
+    def write(self, frame):
+        frame.to_csv(self._csv, header=False, index=False)
+        if 'parquet' in self.paths:
+            table = pa.Table.from_pandas(frame, preserve_index=False)
+            if self._parquet is None:
+                self._parquet = pq.ParquetWriter(self.temporary['parquet'], table.schema)
+            self._parquet.write_table(table)
+        self.rows += len(frame)
+
+    def close(self, commit=True):
+        """Finish the files and move them into place, or discard them when ``commit`` is False"""
+        self._csv.close()
+        if self._parquet is not None:
+            self._parquet.close()
+        for kind, temporary in self.temporary.items():
+            if commit and temporary.exists():
+                os.replace(temporary, self.paths[kind])
+            else:
+                temporary.unlink(missing_ok=True)
+
+
+async def pull_report(connector, start_date, end_date, output_dir='.', parquet=None):
+    """Stream one platform's report for [start_date, end_date] into its CSV (and Parquet) file"""
+    output_dir = Path(output_dir)
+    if parquet is None:
+        parquet = not find_missing_packages(['pyarrow'])
+    writer = ReportWriter(
+        output_dir / PLATFORM_FILES[connector.platform],
+        output_dir / f"{connector.platform}.parquet" if parquet else None
+    )
+    started = time.perf_counter()
+    try:
+        async for frame in connector.iter_pages(str(start_date), str(end_date)):
+            writer.write(frame)
+            connector.stats['pages'] += 1
+    except BaseException:
+        writer.close(commit=False)
+        raise
+    writer.close()
+    connector.stats['rows'] = writer.rows
+    return {'platform': connector.platform, **connector.stats, 'seconds': round(time.perf_counter() - started, 2)}
+
+
+async def pull_reports(connectors, start_date, end_date, output_dir='.', parquet=None):
+    """Pull every connector's report concurrently; returns one summary dict per platform"""
+    return list(await asyncio.gather(*(
+        pull_report(connector, start_date, end_date, output_dir, parquet) for connector in connectors
+    )))
+
+
+def build_connectors(base_url, platforms=None, **kwargs):
+    """One connector per platform (all by default), sharing connection settings"""
+    return [CONNECTORS[platform](base_url, **kwargs) for platform in (platforms or CONNECTORS)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pull ad platform reports into the dashboard's CSV files")
+    parser.add_argument("--base-url", help="Reporting API base URL")
+    parser.add_argument("--mock", action="store_true", help="Pull from a local mock server (see mock_report_server.py)")
+    parser.add_argument("--mock-data-dir", default=".", help="CSV files the mock server serves")
+    parser.add_argument("--start-date", required=True, type=date.fromisoformat, help="First report day (YYYY-MM-DD)")
+    parser.add_argument("--end-date", required=True, type=date.fromisoformat, help="Last report day (YYYY-MM-DD)")
+    parser.add_argument("--platform", action="append", choices=list(CONNECTORS), help="Platform to pull (repeatable, default all)")
+    parser.add_argument("--output-dir", default=".", help="Directory to write the platform files to")
+    parser.add_argument("--page-size", type=int, default=500, help="Rows per report page")
+    parser.add_argument("--concurrency", type=int, default=4, help="Concurrent requests per platform")
+    parser.add_argument("--rate", type=float, default=10, help="Requests per second per platform")
+    parser.add_argument("--no-parquet", action="store_true", help="Write only the CSV files")
+    args = parser.parse_args()
+    if not args.base_url and not args.mock:
+        parser.error("--base-url or --mock is required")
+
+    server = None
+    base_url = args.base_url
+    if args.mock:
+        from mock_report_server import start_mock_server
+        server, base_url = start_mock_server(args.mock_data_dir)
+        print(f"🧪 Mock report server at {base_url}")
+
+    connectors = build_connectors(
+        base_url, args.platform, token=os.environ.get(TOKEN_ENV_VAR), page_size=args.page_size,
+        max_concurrency=args.concurrency, requests_per_second=args.rate
+    )
+    try:
+        summaries = asyncio.run(pull_reports(
+            connectors, args.start_date, args.end_date, args.output_dir, parquet=False if args.no_parquet else None
+        ))
+    except ConnectorError as e:
+        print(f"❌ Report pull failed: {e}")
+        raise SystemExit(1)
+    finally:
+        if server is not None:
+            server.shutdown()
+            server.server_close()
+
+    for summary in summaries:
+        print(f"✅ {summary['platform']}: {summary['rows']:,} rows in {summary['pages']} pages, "
+              f"{summary['requests']} requests ({summary['retries']} retried) in {summary['seconds']}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,28 +4,24 @@ Marketing Intelligence Dashboard Runner
 This script provides an easy way to run the dashboard with different configurations
 """
 
-import streamlit as st
 import subprocess
 import sys
 import os
 from pathlib import Path
+from lazy_imports import find_missing_packages
 
 def check_dependencies():
-    """Check if all required dependencies are installed"""
+    """Check if all required dependencies are installed (from package metadata, without importing them)"""
     required_packages = [
         'streamlit',
         'pandas',
         'numpy',
+        'scipy',
         'plotly',
         'openpyxl'
     ]
     
-    missing_packages = []
-    for package in required_packages:
-        try:
-            __import__(package)
-        except ImportError:
-            missing_packages.append(package)
+    missing_packages = find_missing_packages(required_packages)
     
     if missing_packages:
         print(f"Missing packages: {', '.join(missing_packages)}")
@@ -0,0 +1,155 @@
+"""
+Cross-platform Shapley attribution
+Explains daily business revenue from the platform spend mix instead of relying on
+each platform's self-reported attributed revenue, which double-counts.
+
+Coalitions of channels are indexed by bitmask. The value of a coalition is the
+per-day revenue its channels' spend explains above the zero-spend intercept of a
+linear model fitted on that coalition only. Each coalition is fitted at most
+once; Shapley values are then combined across all days at once.
+"""
+
+from math import factorial
+
+import numpy as np
+import pandas as pd
+
+from daily_facts import build_daily_facts, channel_columns
+
+MAX_EXACT_CHANNELS = 12
+DEFAULT_PERMUTATIONS = 2000
+
+
+def build_daily_spend_matrix(business_df, marketing_df, channel_col='platform',
+                             revenue_col='total revenue', facts=None):
+    """Align daily spend per channel (wide) with daily business revenue on days present in both
+
+    ``facts`` is a daily fact table built for ``channel_col``; it is built here if omitted.
+    """
+    if facts is None:
+        facts = build_daily_facts(business_df, marketing_df, channel_col)
+    daily = facts[facts['business_observed'] & facts['marketing_observed']]
+    channels = channel_columns(facts, 'spend')
+    return (
+        pd.DatetimeIndex(daily['date']),
+        list(channels),
+        daily[list(channels.values())].to_numpy(dtype=float),
+        daily[revenue_col].to_numpy(dtype=float),
+    )
+
+
+class CoalitionValue:
+    """Memoized per-day value function over bitmask-indexed channel coalitions"""
+
+    def __init__(self, spend, revenue):
+        self.spend = spend
+        self.revenue = revenue
+        self.intercepts = {}
+        self._cache = {0: np.zeros(len(revenue))}
+
+    def __call__(self, mask):
+        value = self._cache.get(mask)
+        if value is None:
+            value = self._fit(mask)
+            self._cache[mask] = value
+        return value
+
+    @property
+    def evaluations(self):
+        return len(self._cache)
+
+    def baseline(self, mask):
+        """Fitted zero-spend revenue of the model trained on ``mask``"""
+        self(mask)
+        return self.intercepts.get(mask, self.revenue.mean())
+
+    def _fit(self, mask):
+        columns = [i for i in range(self.spend.shape[1]) if mask >> i & 1]
+        design = np.column_stack([np.ones(len(self.revenue)), self.spend[:, columns]])
+        coef, *_ = np.linalg.lstsq(design, self.revenue, rcond=None)
+        self.intercepts[mask] = coef[0]
+        # Revenue explained by the coalition's spend, on top of that model's baseline
+        return design[:, 1:] @ coef[1:]
+
+
+def exact_shapley(value, n_channels):
+    """Exact Shapley values, shape (n_channels, n_days)"""
+    n_masks = 1 << n_channels
+    values = np.stack([value(mask) for mask in range(n_masks)])
+
+    masks = np.arange(n_masks)
+    sizes = np.array([bin(mask).count('1') for mask in range(n_masks)])
+    weights = np.array([
+        factorial(size) * factorial(n_channels - size - 1) / factorial(n_channels)
+        for size in range(n_channels)
+    ])
+
+    shapley = np.zeros((n_channels, values.shape[1]))
+    for i in range(n_channels):
+        bit = 1 << i
+        without = masks[(masks & bit) == 0]
+        marginal = values[without | bit] - values[without]
+        shapley[i] = weights[sizes[without]] @ marginal
+    return shapley
+
+
+def sampled_shapley(value, n_channels, n_permutations=DEFAULT_PERMUTATIONS, random_state=None):
+    """Monte Carlo permutation-sampling Shapley values, shape (n_channels, n_days)"""
+    rng = np.random.default_rng(random_state)
+    shapley = np.zeros((n_channels, len(value(0))))
+
+    for _ in range(n_permutations):
+        mask = 0
+        previous = value(0)
+        for i in rng.permutation(n_channels):
+            mask |= 1 << i
+            current = value(mask)
+            shapley[i] += current - previous
+            previous = current
+    return shapley / n_permutations
+
+
+def shapley_attribution(business_df, marketing_df, channel_col='platform',
+                        revenue_col='total revenue', method='auto',
+                        n_permutations=DEFAULT_PERMUTATIONS, random_state=None, facts=None):
+    """Per-day Shapley attribution of business revenue to marketing channels
+
+    ``method`` is 'exact', 'sampled' or 'auto' (exact up to MAX_EXACT_CHANNELS
+    channels). Returns (daily, summary): ``daily`` has one row per date with the
+    full model's baseline and each channel's contribution, which together sum to
+    the full model's fitted revenue; ``summary`` totals contributions per channel
+    against spend.
+    """
+    dates, channels, spend, revenue = build_daily_spend_matrix(
+        business_df, marketing_df, channel_col, revenue_col, facts
+    )
+    n_channels = len(channels)
+
+    if method == 'auto':
+        method = 'exact' if n_channels <= MAX_EXACT_CHANNELS else 'sampled'
+    if method == 'exact' and n_channels > MAX_EXACT_CHANNELS:
+        raise ValueError(f"Exact Shapley supports at most {MAX_EXACT_CHANNELS} channels, got {n_channels}")
+
+    value = CoalitionValue(spend, revenue)
+    if method == 'exact':
+        shapley = exact_shapley(value, n_channels)
+    elif method == 'sampled':
+        shapley = sampled_shapley(value, n_channels, n_permutations, random_state)
+    else:
+        raise ValueError(f"Unknown Shapley method: {method}")
+
+    daily = pd.DataFrame(shapley.T, columns=channels, index=dates).reset_index()
+    daily.insert(1, 'baseline', value.baseline((1 << n_channels) - 1))
+    daily[revenue_col] = revenue
+
+    total_spend = spend.sum(axis=0)
+    contribution = shapley.sum(axis=1)
+    summary = pd.DataFrame({
+        channel_col: channels,
+        'spend': total_spend,
+        'shapley_revenue': contribution,
+    })
+    summary['shapley_roas'] = (summary['shapley_revenue'] / summary['spend']).replace([np.inf, -np.inf], 0)
+    summary['revenue_share'] = (summary['shapley_revenue'] / contribution.sum() * 100).round(2)
+
+    return daily, summary.sort_values('shapley_revenue', ascending=False, ignore_index=True)
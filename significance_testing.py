@@ -0,0 +1,197 @@
+"""
+Pairwise significance testing between campaigns
+Runs Welch t-tests or Mann-Whitney U tests on daily ROAS for every pair of
+campaigns sharing a platform/tactic, working from per-campaign summary arrays
+instead of raw rows so the number of pairs can grow into the tens of millions.
+"""
+
+import numpy as np
+import pandas as pd
+
+from lazy_imports import lazy_import
+
+stats = lazy_import('scipy.stats')
+
+DEFAULT_GROUP_COLS = ['platform', 'tactic']
+DEFAULT_CHUNK_SIZE = 1_000_000
+
+
+def daily_campaign_roas(marketing_df, group_cols=None):
+    """Collapse marketing rows to one ROAS value per campaign per day"""
+    group_cols = group_cols or DEFAULT_GROUP_COLS
+    daily = marketing_df.groupby(group_cols + ['campaign', 'date'], observed=True).agg({
+        'spend': 'sum',
+        'attributed revenue': 'sum'
+    }).reset_index()
+
+    daily = daily[daily['spend'] > 0]
+    daily['roas'] = daily['attributed revenue'] / daily['spend']
+    return daily
+
+
+def campaign_sufficient_stats(daily_roas, group_cols=None):
+    """Per-campaign count, mean and sample variance of daily ROAS"""
+    group_cols = group_cols or DEFAULT_GROUP_COLS
+    campaign_stats = daily_roas.groupby(group_cols + ['campaign'], observed=True)['roas'].agg(
+        ['count', 'mean', 'var']
+    ).reset_index()
+    campaign_stats['var'] = campaign_stats['var'].fillna(0.0)
+    return campaign_stats.sort_values(group_cols + ['campaign'], ignore_index=True)
+
+
+def _iter_pair_chunks(group_sizes, chunk_size):
+    """Yield (left, right) index arrays for all within-group pairs, in bounded chunks
+
+    Row i of a group pairs with i+1..size-1, so the pairs are numbered row by row
+    and each chunk maps its pair numbers back to (i, j) from the rows' first pair
+    number; only one chunk of indices exists at a time.
+    """
+    offset = 0
+    for size in group_sizes:
+        if size >= 2:
+            rows = np.arange(size - 1, dtype=np.int64)
+            row_starts = rows * (2 * size - rows - 1) // 2
+            n_pairs = size * (size - 1) // 2
+            for start in range(0, n_pairs, chunk_size):
+                pair = np.arange(start, min(start + chunk_size, n_pairs), dtype=np.int64)
+                left = np.searchsorted(row_starts, pair, side='right') - 1
+                right = pair - row_starts[left] + left + 1
+                yield left + offset, right + offset
+        offset += size
+
+
+def welch_t_test(n1, mean1, var1, n2, mean2, var2):
+    """Vectorized two-sided Welch t-test from summary statistics"""
+    se1 = var1 / n1
+    se2 = var2 / n2
+    se = se1 + se2
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        t_stat = (mean1 - mean2) / np.sqrt(se)
+        df = se ** 2 / (se1 ** 2 / (n1 - 1) + se2 ** 2 / (n2 - 1))
+
+    p_value = 2 * stats.t.sf(np.abs(t_stat), df)
+    # Zero variance on both sides: identical means are not different, anything else is
+    p_value = np.where(se == 0, np.where(mean1 == mean2, 1.0, 0.0), p_value)
+    t_stat = np.where(se == 0, 0.0, t_stat)
+    # A single observation has no variance estimate, so the pair cannot be tested
+    untestable = (np.asarray(n1) < 2) | (np.asarray(n2) < 2)
+    return np.where(untestable, np.nan, t_stat), np.where(untestable, np.nan, p_value)
+
+
+def _padded_samples(daily_roas, campaign_stats, group_cols):
+    """Sorted ROAS samples per campaign as a NaN-padded (campaigns x max_days) matrix"""
+    keys = group_cols + ['campaign']
+    order = daily_roas.sort_values(keys + ['roas'])
+    codes = order.groupby(keys, observed=True, sort=True).ngroup().to_numpy()
+    counts = campaign_stats['count'].to_numpy()
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    positions = np.arange(len(codes)) - starts[codes]
+
+    samples = np.full((len(campaign_stats), counts.max() if len(counts) else 0), np.nan)
+    samples[codes, positions] = order['roas'].to_numpy()
+    return samples
+
+
+def mann_whitney_test(samples, n, left, right):
+    """Vectorized two-sided Mann-Whitney U test (normal approximation) for index pairs"""
+    a = samples[left][:, :, None]
+    b = samples[right][:, None, :]
+    # NaN padding compares False on both sides, so it never contributes
+    u_stat = (a > b).sum(axis=(1, 2)) + 0.5 * (a == b).sum(axis=(1, 2))
+
+    n1 = n[left].astype(float)
+    n2 = n[right].astype(float)
+    mu = n1 * n2 / 2
+    sigma = np.sqrt(n1 * n2 * (n1 + n2 + 1) / 12)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        z = (np.abs(u_stat - mu) - 0.5).clip(min=0) / sigma
+    p_value = np.where(sigma > 0, 2 * stats.norm.sf(z), 1.0)
+    return u_stat, np.minimum(p_value, 1.0)
+
+
+def benjamini_hochberg(p_values):
+    """Benjamini-Hochberg adjusted p-values (false discovery rate); NaN (untested) p-values stay NaN"""
+    p_values = np.asarray(p_values, dtype=float)
+    adjusted = np.full(len(p_values), np.nan)
+    tested = np.flatnonzero(np.isfinite(p_values))
+    m = len(tested)
+    if m == 0:
+        return adjusted
+
+    order = tested[np.argsort(p_values[tested])]
+    ranked = p_values[order] * m / np.arange(1, m + 1)
+    ranked = np.minimum.accumulate(ranked[::-1])[::-1]
+
+    adjusted[order] = np.minimum(ranked, 1.0)
+    return adjusted
+
+
+def pairwise_campaign_tests(marketing_df, method='welch', group_cols=None,
+                            alpha=0.05, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Test every pair of campaigns within each platform/tactic for a ROAS difference
+
+    Pairs are processed in chunks of at most ``chunk_size`` so peak memory stays
+    bounded regardless of how many campaigns share a group. Returns one row per
+    pair with the test statistic, raw p-value and BH-adjusted p-value. The group
+    and campaign columns are categoricals, integer codes into a table of the
+    campaigns, so tens of millions of pairs hold no per-row strings.
+    """
+    if method not in ('welch', 'mannwhitney'):
+        raise ValueError(f"Unknown test method: {method}")
+
+    group_cols = group_cols or DEFAULT_GROUP_COLS
+    daily_roas = daily_campaign_roas(marketing_df, group_cols)
+    campaign_stats = campaign_sufficient_stats(daily_roas, group_cols)
+
+    n = campaign_stats['count'].to_numpy()
+    means = campaign_stats['mean'].to_numpy()
+    variances = campaign_stats['var'].to_numpy()
+    group_sizes = campaign_stats.groupby(group_cols, observed=True, sort=True).size().to_numpy()
+
+    if method == 'mannwhitney':
+        samples = _padded_samples(daily_roas, campaign_stats, group_cols)
+        # Each pair materializes an (n_i x n_j) comparison, so shrink chunks accordingly
+        max_n = max(int(n.max()), 1) if len(n) else 1
+        chunk_size = max(1, chunk_size // (max_n * max_n))
+
+    lefts, rights, statistics, p_values = [], [], [], []
+    for left, right in _iter_pair_chunks(group_sizes, chunk_size):
+        if method == 'welch':
+            statistic, p_value = welch_t_test(
+                n[left], means[left], variances[left],
+                n[right], means[right], variances[right]
+            )
+        else:
+            statistic, p_value = mann_whitney_test(samples, n, left, right)
+
+        lefts.append(left)
+        rights.append(right)
+        statistics.append(statistic)
+        p_values.append(p_value)
+
+    if lefts:
+        left = np.concatenate(lefts)
+        right = np.concatenate(rights)
+        statistic = np.concatenate(statistics)
+        p_value = np.concatenate(p_values)
+    else:
+        left = right = np.array([], dtype=np.int64)
+        statistic = p_value = np.array([], dtype=float)
+
+    def labels(column, index):
+        codes, uniques = pd.factorize(campaign_stats[column], sort=True)
+        return pd.Categorical.from_codes(codes[index], categories=uniques)
+
+    results = pd.DataFrame({column: labels(column, left) for column in group_cols})
+    results['campaign_a'] = labels('campaign', left)
+    results['campaign_b'] = labels('campaign', right)
+    results['mean_roas_a'] = means[left]
+    results['mean_roas_b'] = means[right]
+    results['statistic'] = statistic
+    results['p_value'] = p_value
+    results['p_adjusted'] = benjamini_hochberg(p_value)
+    results['significant'] = results['p_adjusted'] < alpha
+
+    return results
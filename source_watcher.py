@@ -0,0 +1,213 @@
+"""
+Source file watcher with per-platform partial refresh
+SourceWatcher polls the business and platform CSVs for (mtime, size) changes
+on a background thread. refresh_frames then re-reads only the changed
+sources and splices them into the prepared frames:
+
+- a changed platform file is parsed and validated on its own, and only that
+  platform's rows, rollup periods, campaign index block and sketch partitions
+  are rebuilt; the other platforms' data is reused without being re-read
+- a changed business file re-reads the business data and its rollups; if its
+  date range moved, every platform's date-range validation changes with it,
+  so everything is rebuilt
+- the daily fact table is rebuilt from the (spliced) daily rollup, and the
+  bitmap index and stratified sample (whose row numbers shift with the
+  splice) from the spliced rows
+
+Polling is used rather than inotify so the watcher works the same on every
+platform and on network or container-mounted volumes.
+"""
+
+import threading
+from pathlib import Path
+
+import numpy as np
+
+from approximate_query import stratified_sample
+from bitmap_index import BitmapIndex
+from campaign_index import CampaignIndex
+from daily_facts import build_daily_facts
+from data_processing import (
+    BUSINESS_FILE,
+    PLATFORM_FILES,
+    add_business_metrics,
+    add_marketing_metrics,
+    concat_aligned,
+    load_business_data,
+    load_platform_data,
+)
+from data_snapshot import build_frames
+from data_validation import combine_quarantine, validate_business, validate_marketing
+from distinct_sketches import DISTINCT_FRAMES, DistinctSketches
+from instrumentation import traced
+from quantile_sketches import SKETCH_FRAMES, QuantileSketches
+from time_rollups import GRAINS, MARKETING_MEASURES, replace_platform_rollups, rollup_name, source_rollups
+
+SOURCES = ['business', *PLATFORM_FILES]
+DEFAULT_POLL_SECONDS = 2.0
+
+
+def source_files(data_dir='.'):
+    """{source: path} for the business file and each platform file"""
+    data_dir = Path(data_dir)
+    return {
+        'business': data_dir / BUSINESS_FILE,
+        **{platform: data_dir / filename for platform, filename in PLATFORM_FILES.items()},
+    }
+
+
+def source_signatures(data_dir='.'):
+    """{source: (mtime_ns, size)}, or None for a missing file"""
+    signatures = {}
+    for source, path in source_files(data_dir).items():
+        try:
+            stat = path.stat()
+        except OSError:
+            signatures[source] = None
+        else:
+            signatures[source] = (stat.st_mtime_ns, stat.st_size)
+    return signatures
+
+
+class SourceWatcher:
+    """Reports which sources changed since the last poll, optionally polling on a background thread
+
+    A change is only reported once the file's signature has been the same for
+    two polls in a row, so a file that is still being written is not read half-way.
+    """
+
+    def __init__(self, data_dir='.', interval=DEFAULT_POLL_SECONDS):
+        self.data_dir = data_dir
+        self.interval = interval
+        self.signatures = source_signatures(data_dir)
+        self.last_error = None
+        self._pending = {}
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def poll(self):
+        """Sources whose files changed (and have settled) since they were last reported"""
+        changed = []
+        for source, signature in source_signatures(self.data_dir).items():
+            if signature == self.signatures[source]:
+                self._pending.pop(source, None)
+            elif self._pending.get(source) == signature and signature is not None:
+                self.signatures[source] = signature
+                del self._pending[source]
+                changed.append(source)
+            else:
+                self._pending[source] = signature
+        return changed
+
+    def start(self, on_change):
+        """Poll every ``interval`` seconds on a daemon thread, calling ``on_change(changed)`` on changes"""
+        def run():
+            while not self._stop_event.wait(self.interval):
+                changed = self.poll()
+                if not changed:
+                    continue
+                try:
+                    on_change(changed)
+                    self.last_error = None
+                except Exception as e:
+                    # Keep watching; the next change gets another chance
+                    self.last_error = e
+
+        self._thread = threading.Thread(target=run, name=f"source-watcher-{self.data_dir}", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+
+
+def _date_bounds(business_df):
+    return (business_df['date'].min(), business_df['date'].max()) if not business_df.empty else (None, None)
+
+
+def _replace_platform_rows(marketing_df, quarantine_df, platform, platform_df, platform_quarantine, raw_rows):
+    """Splice one platform's validated rows and quarantined rows in at the platform's position
+
+    Quarantine row numbers count rows of the combined raw marketing data, so
+    the new platform's rows are offset by the raw rows before it and later
+    platforms' rows shift by the change in its raw row count.
+    """
+    position = list(PLATFORM_FILES).index(platform)
+    codes = marketing_df['platform'].cat.codes.to_numpy()
+    marketing_df = concat_aligned(
+        [marketing_df[codes < position], platform_df, marketing_df[codes > position]], ignore_index=True
+    )
+    for column in marketing_df.select_dtypes('category').columns:
+        if column != 'platform':
+            marketing_df[column] = marketing_df[column].cat.remove_unused_categories()
+
+    business_quarantine = quarantine_df[quarantine_df['source'] != 'marketing']
+    marketing_quarantine = quarantine_df[quarantine_df['source'] == 'marketing']
+    quarantine_platforms = marketing_quarantine['platform'] if 'platform' in marketing_quarantine else []
+    quarantine_codes = np.array([list(PLATFORM_FILES).index(value) for value in quarantine_platforms], dtype=np.int64)
+    raw_before = (codes < position).sum() + (quarantine_codes < position).sum()
+    old_raw_rows = (codes == position).sum() + (quarantine_codes == position).sum()
+
+    after = marketing_quarantine[quarantine_codes > position]
+    quarantine_df = combine_quarantine([
+        business_quarantine,
+        marketing_quarantine[quarantine_codes < position],
+        platform_quarantine.assign(row=platform_quarantine['row'] + raw_before),
+        after.assign(row=after['row'] + raw_rows - old_raw_rows),
+    ])
+    return marketing_df, quarantine_df
+
+
+@traced
+def refresh_frames(frames, changed, data_dir='.'):
+    """``frames`` (as built by data_snapshot.build_frames) with only the ``changed`` sources re-read"""
+    frames = dict(frames)
+    business_df, quarantine_df = frames['business_df'], frames['quarantine_df']
+    if 'business' in changed:
+        new_business, business_quarantine = validate_business(load_business_data(data_dir))
+        if _date_bounds(new_business) != _date_bounds(business_df):
+            return build_frames(data_dir)
+        business_df = add_business_metrics(new_business)
+        quarantine_df = combine_quarantine([business_quarantine, quarantine_df[quarantine_df['source'] != 'business']])
+
+    min_date, max_date = _date_bounds(business_df)
+    marketing_df = frames['marketing_df']
+    rollups = {rollup_name(source, grain): frames[rollup_name(source, grain)]
+               for source in ['business', 'marketing'] for grain in GRAINS}
+    campaign_index = CampaignIndex(frames['campaign_rows'], frames['campaign_ranges'])
+    quantile_sketches = QuantileSketches.from_frames({name: frames[name] for name in SKETCH_FRAMES})
+    distinct_sketches = DistinctSketches.from_frames({name: frames[name] for name in DISTINCT_FRAMES})
+
+    for platform in [source for source in changed if source in PLATFORM_FILES]:
+        raw = load_platform_data(data_dir, platform)
+        platform_df, platform_quarantine = validate_marketing(raw, min_date, max_date)
+        platform_df = add_marketing_metrics(platform_df)
+        marketing_df, quarantine_df = _replace_platform_rows(
+            marketing_df, quarantine_df, platform, platform_df, platform_quarantine, len(raw)
+        )
+        rollups = replace_platform_rollups(rollups, platform, platform_df)
+        campaign_index = campaign_index.replace_platform(platform, platform_df)
+        quantile_sketches = quantile_sketches.replace_platform(platform, platform_df)
+        distinct_sketches = distinct_sketches.replace_platform(platform, platform_df)
+
+    if 'business' in changed:
+        rollups.update(source_rollups('business', business_df))
+    marketing_daily = rollups[rollup_name('marketing', 'day')].rename(columns={'period_start': 'date'})
+    frames.update({
+        'business_df': business_df,
+        'marketing_df': marketing_df,
+        'quarantine_df': quarantine_df,
+        'campaign_rows': campaign_index.rows,
+        'campaign_ranges': campaign_index.ranges,
+        'daily_facts': build_daily_facts(
+            business_df, marketing_df, marketing_daily=marketing_daily[['date', 'platform', *MARKETING_MEASURES]]
+        ),
+        **quantile_sketches.frames,
+        **distinct_sketches.frames,
+        **BitmapIndex.build(marketing_df).frames,
+        'marketing_sample': stratified_sample(marketing_df),
+        **rollups,
+    })
+    return frames
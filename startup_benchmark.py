@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Cold-start benchmark for the dashboard entry points
+Measures, in fresh interpreters, the import time of each entry-point module
+(broken down by the heavy packages it pulls in) and the time until the Streamlit
+app finishes its first render. Results are printed and optionally saved as JSON.
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ENTRY_POINTS = [
+    'data_processing',
+    'advanced_analysis',
+    'marketing_intel',
+    'run_dashboard',
+    'marketing_dashboard',
+]
+HEAVY_PACKAGES = [
+    'streamlit',
+    'pandas',
+    'numpy',
+    'pyarrow',
+    'scipy.stats',
+    'scipy.optimize',
+    'plotly.express',
+    'plotly.graph_objects',
+]
+APP_PATH = Path(__file__).resolve().parent / 'marketing_dashboard.py'
+
+FIRST_RENDER_SCRIPT = """
+import sys
+from streamlit.testing.v1 import AppTest
+app = AppTest.from_file(sys.argv[1], default_timeout=120).run()
+sys.exit(1 if app.exception else 0)
+"""
+
+
+def parse_importtime(stderr):
+    """Cumulative import seconds per module from ``-X importtime`` output
+
+    Each module is reported once, when its first import completes, so nested
+    entries (e.g. plotly under marketing_dashboard) are included as well.
+    """
+    cumulative = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, total, name = line.split('|', 2)
+        cumulative.setdefault(name.strip(), int(total) / 1e6)
+    return cumulative
+
+
+def measure_import(module, cwd):
+    """Wall time and per-package import cost of importing ``module`` in a fresh interpreter"""
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=cwd, capture_output=True, text=True
+    )
+    wall = time.perf_counter() - start
+
+    cumulative = parse_importtime(result.stderr)
+    return {
+        'ok': result.returncode == 0,
+        'wall_seconds': wall,
+        'import_seconds': cumulative.get(module, 0.0),
+        'packages': {package: cumulative[package] for package in HEAVY_PACKAGES if package in cumulative},
+    }
+
+
+def measure_first_render(cwd):
+    """Wall time from interpreter start until the app's first script run completes"""
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, '-c', FIRST_RENDER_SCRIPT, str(APP_PATH)],
+        cwd=cwd, capture_output=True, text=True
+    )
+    return {'ok': result.returncode == 0, 'wall_seconds': time.perf_counter() - start}
+
+
+def run_benchmark(repeat=3, modules=None, include_render=True, cwd=None):
+    """Run each measurement ``repeat`` times and keep the median"""
+    cwd = cwd or APP_PATH.parent
+    modules = modules or ENTRY_POINTS
+    results = {'python': sys.version.split()[0], 'repeat': repeat, 'imports': {}}
+
+    for module in modules:
+        runs = [measure_import(module, cwd) for _ in range(repeat)]
+        median_run = sorted(runs, key=lambda run: run['wall_seconds'])[len(runs) // 2]
+        median_run['wall_seconds'] = statistics.median(run['wall_seconds'] for run in runs)
+        results['imports'][module] = median_run
+
+    if include_render:
+        runs = [measure_first_render(cwd) for _ in range(repeat)]
+        results['first_render'] = {
+            'ok': all(run['ok'] for run in runs),
+            'wall_seconds': statistics.median(run['wall_seconds'] for run in runs),
+        }
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark dashboard cold-start time")
+    parser.add_argument("--repeat", type=int, default=3, help="Fresh-interpreter runs per measurement")
+    parser.add_argument("--modules", nargs='+', help="Entry-point modules to import")
+    parser.add_argument("--skip-render", action="store_true", help="Skip the time-to-first-render measurement")
+    parser.add_argument("--output", help="Write results to this JSON file")
+    args = parser.parse_args()
+
+    results = run_benchmark(args.repeat, args.modules, not args.skip_render)
+
+    print("⏱️  Import time per entry point (median of fresh interpreters)")
+    for module, run in results['imports'].items():
+        packages = ', '.join(f"{name} {seconds:.2f}s" for name, seconds in run['packages'].items())
+        status = '✅' if run['ok'] else '❌'
+        print(f"{status} {module}: {run['wall_seconds']:.2f}s wall, {run['import_seconds']:.2f}s import ({packages or 'no heavy packages'})")
+
+    if 'first_render' in results:
+        status = '✅' if results['first_render']['ok'] else '❌'
+        print(f"{status} Time to first render: {results['first_render']['wall_seconds']:.2f}s")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"Results saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+"""
+Deterministic synthetic data generator
+Produces Facebook/Google/TikTok and business data in the same schema as the real
+CSV exports, scalable from a few thousand to hundreds of millions of rows. The
+same seed, parameters and chunk size always produce identical output, and large
+datasets are streamed to disk chunk by chunk without holding them in memory.
+"""
+
+import argparse
+import math
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from data_processing import BUSINESS_FILE, PLATFORM_FILES
+
+PLATFORM_TACTICS = {
+    'Facebook': ['ASC', 'Prospecting'],
+    'Google': ['Non-Branded Search', 'Display'],
+    'TikTok': ['Retargeting', 'Spark Ads'],
+}
+US_STATES = [
+    'AL', 'AK', 'AZ', 'AR', 'CA', 'CO', 'CT', 'DE', 'FL', 'GA', 'HI', 'ID', 'IL', 'IN', 'IA', 'KS', 'KY',
+    'LA', 'ME', 'MD', 'MA', 'MI', 'MN', 'MS', 'MO', 'MT', 'NE', 'NV', 'NH', 'NJ', 'NM', 'NY', 'NC', 'ND',
+    'OH', 'OK', 'OR', 'PA', 'RI', 'SC', 'SD', 'TN', 'TX', 'UT', 'VT', 'VA', 'WA', 'WV', 'WI', 'WY',
+]
+DEFAULT_START_DATE = '2025-05-16'
+DEFAULT_CHUNK_ROWS = 2_000_000
+
+
+class SyntheticDataset:
+    """Layout of a synthetic dataset: rows are (day, campaign, state slot) combinations
+
+    Each platform gets ``n_rows / 3`` rows. Campaigns have a fixed tactic and run
+    every day; when there are more rows than campaign-days, each campaign is
+    spread over several states so (date, campaign, state) stays unique.
+    """
+
+    def __init__(self, n_rows, n_campaigns=None, n_states=2, n_days=120,
+                 start_date=DEFAULT_START_DATE, seed=42):
+        if n_states > len(US_STATES):
+            raise ValueError(f"At most {len(US_STATES)} states are supported")
+
+        self.n_rows = int(n_rows)
+        self.n_days = int(n_days)
+        self.n_states = int(n_states)
+        self.seed = seed
+        self.dates = pd.date_range(start_date, periods=self.n_days, freq='D')
+        self.date_strings = np.array(self.dates.strftime('%Y-%m-%d'))
+        self.states = np.array(US_STATES[:self.n_states])
+
+        rows_per_platform = math.ceil(self.n_rows / len(PLATFORM_FILES))
+        if n_campaigns is None:
+            n_campaigns = math.ceil(self.n_rows / self.n_days)
+        self.campaigns_per_platform = max(1, math.ceil(int(n_campaigns) / len(PLATFORM_FILES)))
+        self.states_per_campaign = math.ceil(rows_per_platform / (self.campaigns_per_platform * self.n_days))
+        if self.states_per_campaign > self.n_states:
+            raise ValueError(
+                f"{self.n_rows} rows need {self.states_per_campaign} states per campaign "
+                f"but only {self.n_states} states are available; raise n_states, n_campaigns or n_days"
+            )
+        self.rows_per_platform = rows_per_platform
+
+    def campaign_names(self, platform):
+        """Campaign names in the real data's "Platform - Tactic - C01" pattern"""
+        tactics = PLATFORM_TACTICS[platform]
+        width = max(2, len(str(self.campaigns_per_platform)))
+        numbers = np.arange(1, self.campaigns_per_platform + 1)
+        return np.array([
+            f"{platform} - {tactics[number % len(tactics)]} - C{number:0{width}d}" for number in numbers
+        ]), np.array([tactics[number % len(tactics)] for number in numbers])
+
+    def iter_platform_chunks(self, platform, chunk_rows=DEFAULT_CHUNK_ROWS):
+        """Yield the platform's rows as DataFrames of at most ``chunk_rows`` rows"""
+        platform_index = list(PLATFORM_FILES).index(platform)
+        names, tactics = self.campaign_names(platform)
+
+        for chunk_index, start in enumerate(range(0, self.rows_per_platform, chunk_rows)):
+            row = np.arange(start, min(start + chunk_rows, self.rows_per_platform), dtype=np.int64)
+            rng = np.random.default_rng([self.seed, platform_index, chunk_index])
+
+            # Row index -> (day, campaign, state slot), day-major so output is date ordered
+            day = row // (self.campaigns_per_platform * self.states_per_campaign)
+            campaign = (row // self.states_per_campaign) % self.campaigns_per_platform
+            state = (campaign * 7 + row % self.states_per_campaign) % self.n_states
+
+            impressions = rng.lognormal(11.5, 0.6, len(row)).astype(np.int64)
+            ctr = rng.beta(2, 90, len(row))
+            clicks = (impressions * ctr).astype(np.int64)
+            cpc = rng.lognormal(-0.5, 0.4, len(row))
+            spend = np.round(clicks * cpc, 2)
+            roas = rng.lognormal(1.0, 0.3, len(row))
+            revenue = np.round(spend * roas, 2)
+
+            yield pd.DataFrame({
+                'date': self.date_strings[day],
+                'tactic': tactics[campaign],
+                'state': self.states[state],
+                'campaign': names[campaign],
+                'impression': impressions,
+                'clicks': clicks,
+                'spend': spend,
+                'attributed revenue': revenue,
+            })
+
+    def platform_frame(self, platform):
+        return pd.concat(self.iter_platform_chunks(platform), ignore_index=True)
+
+    def business_frame(self, daily_spend=None):
+        """One row per day, loosely driven by total daily ad spend"""
+        rng = np.random.default_rng([self.seed, 99])
+        if daily_spend is None:
+            daily_spend = np.full(self.n_days, 40_000.0)
+
+        revenue = np.round(120_000 + daily_spend * rng.normal(3.0, 0.3, self.n_days), 2)
+        orders = (revenue / rng.normal(95, 5, self.n_days)).astype(np.int64)
+        new_orders = (orders * rng.uniform(0.3, 0.45, self.n_days)).astype(np.int64)
+        new_customers = (new_orders * rng.uniform(0.9, 1.0, self.n_days)).astype(np.int64)
+        gross_profit = np.round(revenue * rng.uniform(0.45, 0.6, self.n_days), 2)
+
+        return pd.DataFrame({
+            'date': self.date_strings,
+            '# of orders': orders,
+            '# of new orders': new_orders,
+            'new customers': new_customers,
+            'total revenue': revenue,
+            'gross profit': gross_profit,
+            'COGS': np.round(revenue - gross_profit, 2),
+        })
+
+    def frames(self):
+        """Return (business_df, {platform: df}) in memory, in the raw CSV schema"""
+        platform_frames = {platform: self.platform_frame(platform) for platform in PLATFORM_FILES}
+        daily_spend = sum(
+            frame.groupby('date')['spend'].sum().reindex(self.date_strings, fill_value=0).to_numpy()
+            for frame in platform_frames.values()
+        )
+        return self.business_frame(daily_spend), platform_frames
+
+    def write_csv(self, output_dir, chunk_rows=DEFAULT_CHUNK_ROWS):
+        """Stream the dataset to CSV files named like the real exports"""
+        output_dir = Path(output_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        daily_spend = np.zeros(self.n_days)
+
+        for platform, filename in PLATFORM_FILES.items():
+            path = output_dir / filename
+            for chunk_index, chunk in enumerate(self.iter_platform_chunks(platform, chunk_rows)):
+                chunk.to_csv(path, mode='w' if chunk_index == 0 else 'a', header=chunk_index == 0, index=False)
+                day = np.searchsorted(self.date_strings, chunk['date'].to_numpy())
+                daily_spend += np.bincount(day, weights=chunk['spend'].to_numpy(), minlength=self.n_days)
+
+        self.business_frame(daily_spend).to_csv(output_dir / BUSINESS_FILE, index=False)
+        return output_dir
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate synthetic marketing & business CSVs")
+    parser.add_argument("output_dir", help="Directory to write the CSV files to")
+    parser.add_argument("--rows", type=float, default=1e5, help="Total marketing rows across platforms")
+    parser.add_argument("--campaigns", type=int, help="Total campaigns across platforms")
+    parser.add_argument("--states", type=int, default=2, help="Number of distinct states")
+    parser.add_argument("--days", type=int, default=120, help="Number of days")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed")
+    args = parser.parse_args()
+
+    dataset = SyntheticDataset(args.rows, args.campaigns, args.states, args.days, seed=args.seed)
+    dataset.write_csv(args.output_dir)
+    print(f"✅ Wrote {dataset.rows_per_platform * len(PLATFORM_FILES):,} marketing rows to {args.output_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""
+Streaming Excel/CSV export of analysis tables
+Tables are written chunk by chunk straight from their column arrays: an
+openpyxl write-only workbook (one sheet per table) or a zip of CSV files. No
+formatted copy of a table is built, and a write-only workbook keeps only the
+current row in memory, so export size is bounded by the output file rather
+than by the number of tables.
+
+``submit_export`` runs an export on a background thread and returns a Future
+of the file bytes, so the dashboard session stays interactive while large
+exports are written.
+"""
+
+import csv
+import io
+import re
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from instrumentation import traced
+from lazy_imports import lazy_import
+
+openpyxl = lazy_import('openpyxl')
+
+EXPORT_FORMATS = {
+    'xlsx': ('Excel workbook', 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'),
+    'csv': ('CSV files (zip)', 'application/zip'),
+}
+CHUNK_ROWS = 10_000
+# Rows per sheet including the header; longer tables continue on "name (2)", ...
+EXCEL_MAX_ROWS = 1_048_576
+EXCEL_MAX_TITLE = 31
+EXPORT_WORKERS = 2
+
+_executor = ThreadPoolExecutor(max_workers=EXPORT_WORKERS, thread_name_prefix='table-export')
+
+
+def _columns(frame):
+    """(name, values) of each column, preceded by the index levels if they are named
+
+    Unnamed indexes are left over from sorting or filtering and carry no information.
+    """
+    columns = []
+    if any(name is not None for name in frame.index.names):
+        for level, name in enumerate(frame.index.names):
+            columns.append((name if name is not None else f'level_{level}', frame.index.get_level_values(level)))
+    columns.extend((column, frame[column]) for column in frame.columns)
+    return [(str(name), pd.Series(values, copy=False)) for name, values in columns]
+
+
+def _cells(values):
+    """Plain Python cell values for one column chunk: missing values become None"""
+    if isinstance(values.dtype, pd.PeriodDtype):
+        values = values.astype(str)
+    elif pd.api.types.is_datetime64_any_dtype(values):
+        if getattr(values.dt, 'tz', None) is not None:
+            values = values.dt.tz_localize(None)
+        observed = values.dropna()
+        if (observed == observed.dt.normalize()).all():
+            values = values.dt.date
+    return values.astype(object).where(values.notna(), None).tolist()
+
+
+def iter_row_chunks(frame, chunk_rows=CHUNK_ROWS):
+    """Header row, then lists of up to ``chunk_rows`` row tuples read from the column arrays"""
+    columns = _columns(frame)
+    yield [name for name, _ in columns]
+    for start in range(0, len(frame), chunk_rows):
+        stop = min(start + chunk_rows, len(frame))
+        yield list(zip(*(_cells(values.iloc[start:stop]) for _, values in columns)))
+
+
+def _sheet_title(name, part=1):
+    """Excel-safe, at most 31-character sheet title; later parts of a long table get ' (n)'"""
+    suffix = f" ({part})" if part > 1 else ''
+    title = re.sub(r'[\[\]:*?/\\]', '_', str(name))
+    return title[:EXCEL_MAX_TITLE - len(suffix)] + suffix
+
+
+@traced
+def write_workbook(tables, target, chunk_rows=CHUNK_ROWS):
+    """Write {name: frame} to ``target`` (path or binary file) as a write-only workbook, one sheet per table"""
+    workbook = openpyxl.Workbook(write_only=True)
+    for name, frame in tables.items():
+        chunks = iter_row_chunks(frame, chunk_rows)
+        header = next(chunks)
+        part = 1
+        sheet = workbook.create_sheet(_sheet_title(name, part))
+        sheet.append(header)
+        sheet_rows = 1
+        for chunk in chunks:
+            for row in chunk:
+                if sheet_rows == EXCEL_MAX_ROWS:
+                    part += 1
+                    sheet = workbook.create_sheet(_sheet_title(name, part))
+                    sheet.append(header)
+                    sheet_rows = 1
+                sheet.append(row)
+                sheet_rows += 1
+    workbook.save(target)
+
+
+@traced
+def write_csv_zip(tables, target, chunk_rows=CHUNK_ROWS):
+    """Write {name: frame} to ``target`` (path or binary file) as a zip with one CSV per table"""
+    with zipfile.ZipFile(target, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        for name, frame in tables.items():
+            with archive.open(f"{name}.csv", 'w') as member, \
+                    io.TextIOWrapper(member, encoding='utf-8', newline='') as text:
+                writer = csv.writer(text)
+                chunks = iter_row_chunks(frame, chunk_rows)
+                writer.writerow(next(chunks))
+                for chunk in chunks:
+                    writer.writerows(chunk)
+
+
+def export_tables(tables, fmt='xlsx', target=None, chunk_rows=CHUNK_ROWS):
+    """Write ``tables`` ({name: frame}, or a callable returning one) as ``fmt``
+
+    Returns the file bytes when no ``target`` is given. A callable is
+    evaluated here, so tables that still need computing are built by
+    whichever thread runs the export.
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format '{fmt}'; use one of {', '.join(EXPORT_FORMATS)}")
+    tables = tables() if callable(tables) else tables
+    output = target if target is not None else io.BytesIO()
+    writer = write_workbook if fmt == 'xlsx' else write_csv_zip
+    writer(tables, output, chunk_rows)
+    return output.getvalue() if target is None else target
+
+
+def submit_export(tables, fmt='xlsx', chunk_rows=CHUNK_ROWS):
+    """Run export_tables on a background thread; returns a Future of the file bytes"""
+    return _executor.submit(export_tables, tables, fmt, None, chunk_rows)
+
+
+def export_file_name(fmt, stem='marketing_analysis'):
+    return f"{stem}.{'xlsx' if fmt == 'xlsx' else 'zip'}"
@@ -112,6 +112,827 @@ def test_dashboard_import():
         print(f"❌ Dashboard import error: {e}")
         return False
 
+def test_significance_testing():
+    """Test vectorized pairwise campaign tests against scipy"""
+    print("\n🧪 Testing campaign significance tests...")
+    
+    try:
+        from scipy import stats
+        from significance_testing import pairwise_campaign_tests, daily_campaign_roas
+        
+        marketing_df = pd.read_csv('Facebook.csv')
+        marketing_df['platform'] = 'Facebook'
+        
+        results = pairwise_campaign_tests(marketing_df, chunk_size=3)
+        daily_roas = daily_campaign_roas(marketing_df)
+        
+        pair = results.iloc[0]
+        expected = stats.ttest_ind(
+            daily_roas.loc[daily_roas['campaign'] == pair['campaign_a'], 'roas'],
+            daily_roas.loc[daily_roas['campaign'] == pair['campaign_b'], 'roas'],
+            equal_var=False
+        ).pvalue
+        
+        if not np.isclose(pair['p_value'], expected):
+            print(f"❌ Welch p-value mismatch: {pair['p_value']} vs {expected}")
+            return False
+        
+        print(f"✅ {len(results)} campaign pairs tested")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Significance testing error: {e}")
+        return False
+
+def test_significance_single_day_campaign():
+    """Test a campaign with one daily observation does not turn every adjusted p-value into NaN"""
+    print("\n🧪 Testing significance tests with a single-day campaign...")
+    
+    try:
+        from significance_testing import benjamini_hochberg, pairwise_campaign_tests
+        
+        dates = pd.to_datetime(['2025-01-01', '2025-01-02', '2025-01-03'])
+        marketing_df = pd.DataFrame({
+            'platform': 'Facebook',
+            'tactic': 'ASC',
+            'campaign': ['A'] * 3 + ['B'] * 3 + ['C'],
+            'date': list(dates) * 2 + [dates[0]],
+            'spend': 100.0,
+            'attributed revenue': [100.0, 110.0, 105.0, 300.0, 310.0, 305.0, 200.0],
+        })
+        
+        results = pairwise_campaign_tests(marketing_df).set_index(['campaign_a', 'campaign_b'])
+        tested = results.loc[('A', 'B')]
+        untested = results.drop(index=('A', 'B'))
+        
+        if not (np.isfinite(tested['p_adjusted']) and tested['significant']):
+            print(f"❌ Testable pair lost its result: p_adjusted={tested['p_adjusted']}")
+            return False
+        if not (untested['p_value'].isna().all() and untested['p_adjusted'].isna().all()) or untested['significant'].any():
+            print("❌ Pairs with a single-day campaign were tested")
+            return False
+        
+        adjusted = benjamini_hochberg([0.01, np.nan, 0.04])
+        if not (np.allclose(adjusted[[0, 2]], [0.02, 0.04]) and np.isnan(adjusted[1])):
+            print(f"❌ Benjamini-Hochberg with NaN p-values: {adjusted}")
+            return False
+        
+        print(f"✅ {len(untested)} single-day pairs left untested, A vs B p_adjusted={tested['p_adjusted']:.4f}")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Single-day significance error: {e}")
+        return False
+
+def test_shapley_attribution():
+    """Test Shapley attribution is efficient, sampled agrees with exact, and coalitions are fitted once"""
+    print("\n🧪 Testing Shapley attribution...")
+    
+    try:
+        from data_processing import prepare_data
+        from shapley_attribution import (
+            CoalitionValue, build_daily_spend_matrix, exact_shapley, sampled_shapley, shapley_attribution
+        )
+        
+        business_df, marketing_df = prepare_data()
+        _, channels, spend, revenue = build_daily_spend_matrix(business_df, marketing_df)
+        n_channels = len(channels)
+        all_channels = (1 << n_channels) - 1
+        
+        value = CoalitionValue(spend, revenue)
+        fits = []
+        fit = value._fit
+        value._fit = lambda mask: fits.append(mask) or fit(mask)
+        
+        # Efficiency: per day, the attributions add up to v(all) - v(empty)
+        exact = exact_shapley(value, n_channels)
+        if not np.allclose(exact.sum(axis=0), value(all_channels) - value(0)):
+            print("❌ Exact Shapley values do not sum to v(all) - v(empty)")
+            return False
+        
+        sampled = sampled_shapley(value, n_channels, n_permutations=500, random_state=0)
+        if not np.allclose(sampled.sum(axis=0), value(all_channels) - value(0)):
+            print("❌ Sampled Shapley values do not sum to v(all) - v(empty)")
+            return False
+        tolerance = 0.05 * np.abs(exact.sum(axis=1)).sum()
+        if np.abs(sampled.sum(axis=1) - exact.sum(axis=1)).max() > tolerance:
+            print(f"❌ Sampled totals {sampled.sum(axis=1)} differ from exact {exact.sum(axis=1)}")
+            return False
+        
+        # Every non-empty coalition is fitted exactly once across both passes
+        if sorted(fits) != list(range(1, all_channels + 1)) or value.evaluations != all_channels + 1:
+            print(f"❌ Coalitions fitted {len(fits)} times for {all_channels} coalitions")
+            return False
+        
+        daily, summary = shapley_attribution(business_df, marketing_df)
+        full_fit = value(all_channels) + value.baseline(all_channels)
+        if not np.allclose(daily[channels].sum(axis=1) + daily['baseline'], full_fit):
+            print("❌ Daily attributions plus baseline do not match the full model's fit")
+            return False
+        
+        print(f"✅ {n_channels} channels attributed, {len(fits)} coalition fits, shares {summary['revenue_share'].tolist()}")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Shapley attribution error: {e}")
+        return False
+
+def test_batch_report():
+    """Test the headless report writes tables without importing Streamlit"""
+    print("\n🧪 Testing headless batch report...")
+    
+    try:
+        import tempfile
+        from marketing_intel import run_report
+        
+        with tempfile.TemporaryDirectory() as output_dir:
+            manifest = run_report(output_dir=output_dir, fmt='json', analyses=['dashboard', 'advanced'])
+            missing = [name for name in manifest['tables'] if not (Path(output_dir) / f"{name}.json").exists()]
+        
+        if missing:
+            print(f"❌ Missing report tables: {', '.join(missing)}")
+            return False
+        
+        print(f"✅ {len(manifest['tables'])} report tables written")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Batch report error: {e}")
+        return False
+
+def test_memory_governor():
+    """Test the memory governor stays within budget and reloads spilled data"""
+    print("\n🧪 Testing memory governor...")
+    
+    try:
+        import tempfile
+        from data_processing import prepare_data, filter_data, calculate_kpis
+        from memory_governor import MemoryGovernor
+        
+        business_df, marketing_df = prepare_data()
+        full_size = marketing_df.memory_usage(deep=True).sum()
+        
+        with tempfile.TemporaryDirectory() as spill_dir:
+            governor = MemoryGovernor(budget_bytes=full_size // 4, spill_dir=spill_dir, hot_days=14)
+            governor.load_frames(
+                lambda: {'business_df': business_df, 'marketing_df': marketing_df},
+                date_cols={'marketing_df': 'date'}
+            )
+            stats = governor.stats()
+            reloaded = governor.get_frame('marketing_df', business_df['date'].min(), business_df['date'].max())
+            expected = calculate_kpis(*filter_data(business_df, marketing_df))
+            actual = calculate_kpis(*filter_data(business_df, reloaded))
+        
+        # Checked after load: the reloaded partitions are kept in the cache while they are in use
+        usage = sum(stats['usage_bytes'].values())
+        if usage > governor.budget_bytes or not stats['spilled_partitions']:
+            print(f"❌ Governor over budget: {usage:,} > {governor.budget_bytes:,} bytes")
+            return False
+        if len(reloaded) != len(marketing_df) or abs(actual['total_spend'] - expected['total_spend']) > 1e-6:
+            print("❌ Reloaded data does not match the original")
+            return False
+        
+        print(f"✅ Governor within budget after {', '.join(action['action'] for action in stats['actions'])}")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Memory governor error: {e}")
+        return False
+
+def test_memory_governor_pressure():
+    """Test repeated cache misses over budget compact each frame once, keep results and bound the action log"""
+    print("\n🧪 Testing memory governor under sustained pressure...")
+    
+    try:
+        import tempfile
+        import time
+        from data_processing import prepare_data
+        from memory_governor import MAX_ACTIONS, MemoryGovernor
+        
+        business_df, marketing_df = prepare_data()
+        
+        with tempfile.TemporaryDirectory() as spill_dir:
+            governor = MemoryGovernor(budget_bytes=1, spill_dir=spill_dir)
+            governor.load_frames(lambda: {'business_df': business_df, 'marketing_df': marketing_df})
+            start = time.time()
+            for i in range(50):
+                governor.cached(('result', i), lambda: marketing_df['spend'].sum())
+            elapsed = time.time() - start
+            compactions = [action['target'] for action in governor.stats()['actions'] if action['action'] == 'compact']
+            for i in range(MAX_ACTIONS):
+                governor.cached(('more', i), lambda: i)
+            
+            # Frames alone over budget: results stay cached instead of being recomputed on every call
+            computed = []
+            for _ in range(3):
+                governor.cached(('filtered',), lambda: computed.append(1) or marketing_df.head(100))
+            
+            # Frames within budget: older results are evicted, never the one just stored
+            small = MemoryGovernor(budget_bytes=10_000, spill_dir=spill_dir)
+            small.cached(('old',), lambda: marketing_df.head(10))
+            small.cached(('big',), lambda: marketing_df)
+        
+        if len(computed) != 1:
+            print(f"❌ Result recomputed {len(computed)} times while the frames were over budget")
+            return False
+        if not small.has_result(('big',)) or small.has_result(('old',)):
+            print("❌ The result being stored was evicted")
+            return False
+        if sorted(compactions) != ['business_df', 'marketing_df']:
+            print(f"❌ Frames compacted {len(compactions)} times: {compactions[:5]}")
+            return False
+        if len(governor.actions) > MAX_ACTIONS:
+            print(f"❌ Action log grew to {len(governor.actions)} entries")
+            return False
+        
+        print(f"✅ 50 over-budget cache misses in {elapsed:.3f}s with one compaction per frame")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Memory governor pressure error: {e}")
+        return False
+
+def test_data_validation():
+    """Test invalid rows are quarantined with reason codes"""
+    print("\n🧪 Testing ingest validation...")
+    
+    try:
+        import shutil
+        import tempfile
+        from data_processing import prepare_validated_data
+        
+        with tempfile.TemporaryDirectory() as data_dir:
+            for filename in ['business.csv', 'Facebook.csv', 'Google.csv', 'TikTok.csv']:
+                shutil.copy(filename, data_dir)
+            facebook_df = pd.read_csv('Facebook.csv')
+            bad_rows = facebook_df.head(4).copy()
+            bad_rows.loc[bad_rows.index[0], 'spend'] = 0
+            bad_rows.loc[bad_rows.index[1], 'clicks'] = -5
+            bad_rows.loc[bad_rows.index[2], 'date'] = '2030-01-01'
+            pd.concat([facebook_df, bad_rows]).to_csv(Path(data_dir) / 'Facebook.csv', index=False)
+            
+            business_df, marketing_df, quarantine_df = prepare_validated_data(data_dir)
+        
+        expected = ['zero_spend;duplicate_key', 'negative_value;duplicate_key', 'date_out_of_range', 'duplicate_key']
+        if quarantine_df['reason'].tolist() != expected:
+            print(f"❌ Unexpected reasons: {quarantine_df['reason'].tolist()}")
+            return False
+        if len(marketing_df) != 3600 or np.isinf(marketing_df['roas']).any():
+            print("❌ Invalid rows reached the clean data")
+            return False
+        
+        print(f"✅ {len(quarantine_df)} invalid rows quarantined")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Data validation error: {e}")
+        return False
+
+def test_query_backends():
+    """Test installed DuckDB/Polars backends match the pandas aggregations"""
+    print("\n🧪 Testing query backends...")
+    
+    try:
+        from data_processing import prepare_data, create_campaign_analysis, create_tactic_analysis
+        from query_backends import available_backends
+        
+        business_df, marketing_df = prepare_data()
+        backends = [backend for backend in available_backends() if backend != 'pandas']
+        if not backends:
+            print("⚠️  DuckDB/Polars not installed, only pandas checked")
+            return True
+        
+        for backend in backends:
+            for create_analysis in [create_campaign_analysis, create_tactic_analysis]:
+                pd.testing.assert_frame_equal(
+                    create_analysis(marketing_df),
+                    create_analysis(marketing_df, backend),
+                    rtol=1e-9
+                )
+        
+        print(f"✅ {', '.join(backends)} match pandas")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Query backend error: {e}")
+        return False
+
+def test_time_rollups():
+    """Test rollups keep years apart and match group-bys over the filtered rows"""
+    print("\n🧪 Testing time-grain rollups...")
+    
+    try:
+        from data_processing import prepare_data
+        from time_rollups import GRAINS, build_rollups, calendar_keys, select_rollup
+        
+        dates = pd.Series(pd.to_datetime(['2024-06-15', '2025-06-15', '2024-12-30']))
+        assert list(calendar_keys(dates, 'month')) == [202406, 202506, 202412]
+        assert list(calendar_keys(dates, 'week')) == [202424, 202524, 202501]  # ISO week of Dec 30, 2024
+        
+        business_df, marketing_df = prepare_data()
+        rollups = build_rollups(business_df, marketing_df)
+        start_date, end_date = pd.Timestamp('2025-05-20'), pd.Timestamp('2025-07-03')
+        in_range = marketing_df[marketing_df['date'].between(start_date, end_date) & (marketing_df['platform'] == 'Google')]
+        
+        for grain in GRAINS:
+            trend = select_rollup(rollups, 'marketing', grain, start_date, end_date, ['Google'])
+            expected = in_range.groupby(calendar_keys(in_range['date'], grain))['spend'].sum()
+            assert np.allclose(trend['spend'], expected.to_numpy()), grain
+        
+        print(f"✅ {len(rollups)} rollup tables match the filtered group-bys")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Time rollup error: {e}")
+        return False
+
+def test_campaign_index():
+    """Test campaign drill-down slices match filtering the marketing data"""
+    print("\n🧪 Testing campaign index...")
+    
+    try:
+        from data_processing import prepare_data
+        from campaign_index import CampaignIndex
+        
+        business_df, marketing_df = prepare_data()
+        campaign_index = CampaignIndex.build(marketing_df)
+        platform, campaign = marketing_df[['platform', 'campaign']].iloc[0]
+        
+        rows = campaign_index.lookup(platform, campaign, '2025-06-01', '2025-06-30')
+        expected = marketing_df[
+            (marketing_df['platform'] == platform) & (marketing_df['campaign'] == campaign) &
+            marketing_df['date'].between('2025-06-01', '2025-06-30')
+        ]
+        assert len(rows) == len(expected) and rows['date'].is_monotonic_increasing
+        assert np.isclose(rows['spend'].sum(), expected['spend'].sum())
+        assert np.shares_memory(rows['spend'].to_numpy(), campaign_index.rows['spend'].to_numpy())
+        assert campaign_index.lookup(platform, 'No such campaign').empty
+        
+        state_mix = campaign_index.state_mix(platform, campaign)
+        assert np.isclose(state_mix['spend_share'].sum(), 100, atol=0.1)
+        
+        print(f"✅ {len(campaign_index)} campaigns indexed")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Campaign index error: {e}")
+        return False
+
+def test_daily_facts():
+    """Test the daily fact table keeps a complete date index and flags gaps"""
+    print("\n🧪 Testing daily fact table...")
+    
+    try:
+        from data_processing import prepare_data
+        from daily_facts import build_daily_facts, channel_columns, fill_business_gaps
+        
+        business_df, marketing_df = prepare_data()
+        missing_day = business_df['date'].iloc[10]
+        facts = build_daily_facts(business_df[business_df['date'] != missing_day], marketing_df)
+        
+        assert facts['date'].diff().dropna().eq(pd.Timedelta(days=1)).all()
+        gap = facts[facts['date'] == missing_day].iloc[0]
+        assert not gap['business_observed'] and gap['marketing_observed']
+        assert pd.isna(gap['total revenue']) and gap['spend'] > 0
+        
+        spend_columns = channel_columns(facts, 'spend')
+        assert sorted(spend_columns) == sorted(marketing_df['platform'].unique())
+        assert np.allclose(facts[list(spend_columns.values())].sum(axis=1), facts['spend'])
+        assert fill_business_gaps(facts)['total revenue'].notna().all()
+        
+        print(f"✅ {len(facts)} days, {len(spend_columns)} channels")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Daily fact table error: {e}")
+        return False
+
+def test_quantile_sketches():
+    """Test merged sketch quartiles stay within the relative accuracy of exact ones"""
+    print("\n🧪 Testing quantile sketches...")
+    
+    try:
+        from data_processing import prepare_data
+        from quantile_sketches import QuantileSketches
+        
+        business_df, marketing_df = prepare_data()
+        sketches = QuantileSketches.build(marketing_df)
+        selected = marketing_df[marketing_df['date'].between('2025-06-01', '2025-07-15')]
+        
+        for metric in ['roas', 'cpc']:
+            stats = sketches.box_stats(metric, 'platform', '2025-06-01', '2025-07-15').set_index('platform')
+            exact = selected.groupby('platform', observed=True)[metric]
+            quartiles = exact.quantile([0.25, 0.5, 0.75]).unstack()
+            assert np.allclose(stats[['q1', 'median', 'q3']].to_numpy(), quartiles.to_numpy(), rtol=0.02)
+            assert np.allclose(stats['mean'], exact.mean()) and (stats['count'] == exact.count()).all()
+        
+        # Merging is adding counts, so per-platform and overall sketches agree
+        overall = sketches.box_stats('roas')
+        assert overall['count'].iloc[0] == sketches.box_stats('roas', 'platform')['count'].sum()
+        assert sketches.box_stats('roas', 'platform', filters={'platform': []}).empty
+        
+        print(f"✅ {len(sketches.partitions)} partitions sketched in {len(sketches.buckets)} buckets")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Quantile sketch error: {e}")
+        return False
+
+def test_distinct_sketches():
+    """Test unioned HyperLogLog counts against exact distinct counts"""
+    print("\n🧪 Testing distinct sketches...")
+    
+    try:
+        from data_processing import prepare_data
+        from distinct_sketches import DistinctSketches
+        
+        business_df, marketing_df = prepare_data()
+        sketches = DistinctSketches.build(marketing_df)
+        selected = marketing_df[marketing_df['date'].between('2025-06-01', '2025-07-15')]
+        
+        # Small counts use linear counting, which is exact at these sizes
+        estimate = sketches.estimate('campaign_states', 'platform', '2025-06-01', '2025-07-15').set_index('platform')
+        exact = selected.groupby('platform', observed=True)[['campaign', 'state']].apply(lambda rows: len(rows.drop_duplicates()))
+        assert (estimate['campaign_states'] == exact).all()
+        
+        # A week is the union of its days, not their sum
+        weekly = sketches.estimate('campaigns', ['date', 'platform'], grain='week')
+        daily = sketches.estimate('campaigns', ['date', 'platform'])
+        assert weekly['campaigns'].sum() < daily['campaigns'].sum()
+        total = sketches.estimate('campaigns')['campaigns'].iloc[0]
+        assert total == marketing_df[['platform', 'campaign']].drop_duplicates().shape[0]
+        assert sketches.estimate('campaigns', 'platform', filters={'platform': []}).empty
+        
+        print(f"✅ {total:.0f} campaigns across {len(sketches.slices)} slices (±{sketches.relative_standard_error:.1%} RSE)")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Distinct sketch error: {e}")
+        return False
+
+def test_data_snapshot():
+    """Test a compiled snapshot loads back the same frames and is ignored once the CSVs change"""
+    print("\n🧪 Testing data snapshot...")
+    
+    try:
+        import shutil
+        import tempfile
+        from pathlib import Path
+        from data_processing import BUSINESS_FILE, PLATFORM_FILES
+        from data_snapshot import build_frames, compile_snapshot, load_snapshot
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            manifest = compile_snapshot(output_dir=Path(tmp) / 'snapshot')
+            frames, results = load_snapshot(input_dir=Path(tmp) / 'snapshot')
+            expected = build_frames()
+            assert set(frames) == set(expected)
+            for name, frame in expected.items():
+                pd.testing.assert_frame_equal(frames[name], frame)
+            assert len(results) == manifest['results'] and ('load_media_mix_model',) in results
+            
+            # Truncated or missing snapshot files fall back to preparing the CSVs
+            version_dir = Path(tmp) / 'snapshot' / manifest['version']
+            results_pickle = (version_dir / 'results.pkl').read_bytes()
+            (version_dir / 'results.pkl').write_bytes(results_pickle[:len(results_pickle) // 2])
+            assert load_snapshot(input_dir=Path(tmp) / 'snapshot') is None
+            (version_dir / manifest['files']['marketing_df']).unlink()
+            assert load_snapshot(input_dir=Path(tmp) / 'snapshot') is None
+            
+            # Changed source data makes the snapshot stale
+            for filename in [BUSINESS_FILE, *PLATFORM_FILES.values()]:
+                shutil.copy(filename, tmp)
+            with open(Path(tmp) / BUSINESS_FILE, 'a') as f:
+                f.write('\n')
+            assert load_snapshot(data_dir=tmp, input_dir=Path(tmp) / 'snapshot') is None
+        
+        print(f"✅ Snapshot {manifest['version']} round-trips {len(frames)} frames and {len(results)} results")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Data snapshot error: {e}")
+        return False
+
+def test_table_export():
+    """Test streamed workbook and CSV exports match the tables they were written from"""
+    print("\n🧪 Testing table export...")
+    
+    try:
+        import io
+        import zipfile
+        import openpyxl
+        from data_processing import prepare_data, create_campaign_analysis, create_tactic_analysis
+        from table_export import export_tables, submit_export
+        
+        business_df, marketing_df = prepare_data()
+        tables = {
+            'campaign_analysis': create_campaign_analysis(marketing_df),
+            'tactic_analysis': create_tactic_analysis(marketing_df),
+            'business': business_df,
+        }
+        
+        # Small chunks so every table spans several of them
+        workbook = openpyxl.load_workbook(io.BytesIO(submit_export(tables, 'xlsx', chunk_rows=7).result()), read_only=True)
+        assert workbook.sheetnames == list(tables)
+        rows = list(workbook['campaign_analysis'].values)
+        assert rows[0] == tuple(tables['campaign_analysis'].columns)
+        assert len(rows) == len(tables['campaign_analysis']) + 1
+        assert rows[1][1] == tables['campaign_analysis']['campaign'].iloc[0]
+        
+        archive = zipfile.ZipFile(io.BytesIO(export_tables(tables, 'csv', chunk_rows=7)))
+        business = pd.read_csv(archive.open('business.csv'), parse_dates=['date'])
+        pd.testing.assert_frame_equal(business, business_df.reset_index(drop=True), check_dtype=False)
+        
+        print(f"✅ {len(tables)} tables exported to Excel and CSV in row chunks")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Table export error: {e}")
+        return False
+
+def test_dataset_catalog():
+    """Test tenant manifests load and idle tenants are unloaded when the shared budget is exceeded"""
+    print("\n🧪 Testing dataset catalog...")
+    
+    try:
+        import json
+        import shutil
+        import tempfile
+        from pathlib import Path
+        from data_processing import BUSINESS_FILE, PLATFORM_FILES
+        from data_snapshot import build_frames
+        from dataset_catalog import CatalogError, TenantCache, load_catalog
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            for tenant_id, manifest in [('brand-a', {'name': 'Brand A', 'memory_budget_mb': 1}), ('brand-b', {})]:
+                tenant_dir = Path(tmp) / tenant_id
+                tenant_dir.mkdir()
+                (tenant_dir / 'manifest.json').write_text(json.dumps(manifest))
+                for filename in [BUSINESS_FILE, *PLATFORM_FILES.values()]:
+                    shutil.copy(filename, tenant_dir)
+            
+            tenants = load_catalog(tmp)
+            assert list(tenants) == ['brand-a', 'brand-b']
+            assert tenants['brand-a'].name == 'Brand A' and tenants['brand-b'].name == 'brand-b'
+            
+            # A budget that fits one tenant: loading the second unloads the idle first one
+            cache = TenantCache(tenants, total_budget_bytes=1024 ** 2, idle_seconds=0)
+            for tenant_id in tenants:
+                governor = cache.governor(tenant_id)
+                governor.load_frames(lambda: build_frames(tenants[tenant_id].data_dir))
+                cache.enforce(keep=tenant_id)
+            assert cache.loaded_tenants() == ['brand-b']
+            assert cache.evictions[0]['tenant'] == 'brand-a'
+            assert cache.governor('brand-a').budget_bytes == 1024 ** 2
+            
+            (Path(tmp) / 'brand-b' / 'manifest.json').write_text('not json')
+            try:
+                load_catalog(tmp)
+                assert False, "invalid manifest was accepted"
+            except CatalogError:
+                pass
+        
+        print(f"✅ {len(tenants)} tenants cataloged, {len(cache.evictions)} idle tenant unloaded")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Dataset catalog error: {e}")
+        return False
+
+def test_source_watcher():
+    """Test a changed platform file is reported once settled and refreshes to the same frames as a full rebuild"""
+    print("\n🧪 Testing source watcher...")
+    
+    try:
+        import shutil
+        import tempfile
+        from pathlib import Path
+        from data_processing import BUSINESS_FILE, PLATFORM_FILES
+        from data_snapshot import build_frames
+        from quantile_sketches import SKETCH_FRAMES, QuantileSketches
+        from source_watcher import SourceWatcher, refresh_frames
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            for filename in [BUSINESS_FILE, *PLATFORM_FILES.values()]:
+                shutil.copy(filename, tmp)
+            frames = build_frames(tmp)
+            watcher = SourceWatcher(tmp)
+            
+            tiktok = pd.read_csv(Path(tmp) / PLATFORM_FILES['TikTok']).iloc[20:]
+            tiktok['spend'] *= 1.5
+            tiktok.to_csv(Path(tmp) / PLATFORM_FILES['TikTok'], index=False)
+            # Reported only once the file looks the same on two polls
+            assert watcher.poll() == []
+            changed = watcher.poll()
+            assert changed == ['TikTok'] and watcher.poll() == []
+            
+            refreshed = refresh_frames(frames, changed, tmp)
+            expected = build_frames(tmp)
+            for name in ['business_df', 'marketing_df', 'daily_facts', 'campaign_rows', 'campaign_ranges',
+                         'marketing_by_week']:
+                pd.testing.assert_frame_equal(refreshed[name], expected[name])
+            # Sketch partitions are renumbered, so compare what they answer
+            sketches = [QuantileSketches.from_frames({name: result[name] for name in SKETCH_FRAMES})
+                        for result in (refreshed, expected)]
+            pd.testing.assert_frame_equal(sketches[0].box_stats('roas', 'platform'), sketches[1].box_stats('roas', 'platform'))
+        
+        print(f"✅ Refreshed {changed[0]} only: {len(refreshed['marketing_df'])} marketing rows match a full rebuild")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Source watcher error: {e}")
+        return False
+
+def test_report_connectors():
+    """Test concurrent paginated pulls from the mock report server recreate the platform CSVs despite injected failures"""
+    print("\n🧪 Testing report connectors...")
+    
+    try:
+        import asyncio
+        import tempfile
+        from pathlib import Path
+        from data_processing import PLATFORM_FILES
+        from mock_report_server import start_mock_server
+        from report_connectors import ReportConnector, build_connectors, pull_reports
+        
+        # A connector missing part of its endpoint description fails when created
+        class HalfConnector(ReportConnector):
+            def page_params(self, start_date, end_date, page):
+                return {'page': page}
+        try:
+            HalfConnector('http://localhost')
+        except TypeError:
+            pass
+        else:
+            raise AssertionError("connector without parse_page was created")
+        
+        # Every 5th request fails with 503 and bursts over 200 requests/s get 429
+        server, base_url = start_mock_server(fail_every=5, requests_per_second=200)
+        try:
+            with tempfile.TemporaryDirectory() as tmp:
+                connectors = build_connectors(base_url, page_size=100, backoff_seconds=0.01, requests_per_second=100)
+                summaries = asyncio.run(pull_reports(connectors, '2025-01-01', '2025-12-31', tmp, parquet=False))
+                for platform, filename in PLATFORM_FILES.items():
+                    pd.testing.assert_frame_equal(pd.read_csv(Path(tmp) / filename), pd.read_csv(filename))
+        finally:
+            server.shutdown()
+            server.server_close()
+        
+        rows = sum(summary['rows'] for summary in summaries)
+        retries = sum(summary['retries'] for summary in summaries)
+        assert retries > 0
+        print(f"✅ Pulled {rows:,} rows in {sum(s['pages'] for s in summaries)} pages ({retries} requests retried)")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Report connectors error: {e}")
+        return False
+
+def test_campaign_dimensions():
+    """Test campaign names are parsed into dimensions and tactic mismatches are flagged"""
+    print("\n🧪 Testing campaign dimensions...")
+    
+    try:
+        from campaign_dimensions import add_campaign_dimensions, mismatched_campaigns
+        from data_processing import filter_data
+        
+        marketing_df = pd.DataFrame({
+            'platform': ['Google', 'Google', 'Google', 'TikTok'],
+            'campaign': pd.Categorical(['Google - Display - C01', 'Google - Display - C01',
+                                        'Google - Non-Branded Search - C02', 'Unstructured name']),
+            'tactic': pd.Categorical(['Display', 'Non-Branded Search', 'Non-Branded Search', 'Spark Ads']),
+            'spend': [10.0, 20.0, 30.0, 40.0],
+        })
+        marketing_df = add_campaign_dimensions(marketing_df)
+        
+        assert list(marketing_df['campaign_type'].astype(object).fillna('-')) == [
+            'Display', 'Display', 'Non-Branded Search', '-'
+        ]
+        assert list(marketing_df['campaign_sequence'].cat.categories) == ['C01', 'C02']
+        assert list(marketing_df['tactic_mismatch']) == [False, True, False, False]
+        
+        mismatches = mismatched_campaigns(marketing_df)
+        assert len(mismatches) == 1 and mismatches['spend'].iloc[0] == 20.0
+        
+        _, filtered = filter_data(marketing_df, marketing_df, filters={'campaign_type': ['Display']})
+        assert len(filtered) == 2
+        
+        print(f"✅ Parsed {marketing_df['campaign'].nunique()} campaign names, {len(mismatches)} tactic mismatch flagged")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Campaign dimensions error: {e}")
+        return False
+
+def test_bitmap_index():
+    """Test bitmap-index selections match chained isin filters, including on relabelled slices"""
+    print("\n🧪 Testing bitmap index...")
+    
+    try:
+        from bitmap_index import BitmapIndex
+        from data_processing import filter_data, prepare_data
+        
+        _, marketing_df = prepare_data()
+        index = BitmapIndex.build(marketing_df)
+        campaigns = index.column_values('campaign')
+        filters = {
+            'platform': ['Google', 'TikTok'],
+            'state': index.column_values('state')[:1],
+            'campaign': campaigns[::2] + ['Not a campaign'],
+        }
+        _, expected = filter_data(marketing_df, marketing_df, filters=filters)
+        pd.testing.assert_frame_equal(index.take(marketing_df, filters), expected)
+        
+        # Row labels survive slicing and reordering, as after a memory governor spill
+        recent = marketing_df[marketing_df['date'] >= marketing_df['date'].median()]
+        recent = pd.concat([recent.iloc[100:], recent.iloc[:100]])
+        _, expected = filter_data(recent, recent, filters={'tactic_mismatch': [True], 'campaign': campaigns[:5]})
+        pd.testing.assert_frame_equal(
+            index.take(recent, {'tactic_mismatch': [True], 'campaign': campaigns[:5]}), expected
+        )
+        assert index.take(marketing_df, {'tactic': []}).empty
+        
+        # Spread-out row labels make every value sparse
+        spread = marketing_df.set_axis(marketing_df.index * 64)
+        sparse_index = BitmapIndex.build(spread)
+        assert not sparse_index.values['dense'].any()
+        _, expected = filter_data(spread, spread, filters=filters)
+        pd.testing.assert_frame_equal(sparse_index.take(spread, filters), expected)
+        
+        dense = int(index.values['dense'].sum())
+        print(f"✅ {len(index.values)} values indexed ({dense} dense, {len(index.values) - dense} sparse)")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Bitmap index error: {e}")
+        return False
+
+def test_approximate_query():
+    """Test stratified-sample estimates are exact on a full sample and their margins cover the exact totals"""
+    print("\n🧪 Testing approximate query estimates...")
+    
+    try:
+        from approximate_query import estimate, stratified_sample
+        from data_processing import calculate_platform_metrics, filter_data, prepare_data
+        
+        _, marketing_df = prepare_data()
+        exact = calculate_platform_metrics(marketing_df).set_index('platform')
+        
+        # A sample as large as the data is the data: estimates are exact with zero margins
+        full = estimate(stratified_sample(marketing_df, len(marketing_df)), ['platform']).set_index('platform')
+        pd.testing.assert_frame_equal(full[exact.columns], exact, check_dtype=False)
+        assert (full.filter(like='_margin') == 0).all().all()
+        
+        # Subsamples keep row labels and every stratum; 95% margins cover the exact values most of the time
+        _, retargeting = filter_data(marketing_df, marketing_df, filters={'tactic': ['Retargeting']})
+        exact_retargeting = calculate_platform_metrics(retargeting).set_index('platform')
+        covered = checks = 0
+        for seed in range(20):
+            sample = stratified_sample(marketing_df, len(marketing_df) // 3, seed)
+            assert sample.index.isin(marketing_df.index).all()
+            assert sample.groupby(['platform', 'date'], observed=True).size().min() >= 2
+            _, sample_retargeting = filter_data(sample, sample, filters={'tactic': ['Retargeting']})
+            for estimates, expected in [(estimate(sample, ['platform']), exact),
+                                        (estimate(sample_retargeting, ['platform']), exact_retargeting)]:
+                estimates = estimates.set_index('platform')
+                for metric in ['spend', 'roas', 'ctr']:
+                    error = (estimates[metric] - expected[metric]).abs()
+                    covered += (error <= estimates[f'{metric}_margin']).sum()
+                    checks += len(expected)
+        assert covered / checks >= 0.85, f"margins covered {covered / checks:.0%} of exact values"
+        
+        print(f"✅ 95% margins covered {covered / checks:.0%} of {checks} exact values")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Approximate query error: {e}")
+        return False
+
+def test_api_empty_selection():
+    """Test an API response for a selection with no rows is valid JSON, with null for undefined ratios"""
+    print("\n🧪 Testing API responses for an empty selection...")
+    
+    try:
+        import json
+        from api_server import AggregationService
+        
+        def reject_constant(name):
+            raise ValueError(f"Non-JSON constant {name}")
+        
+        service = AggregationService()
+        _, body = service.respond('/api/kpis', {'start_date': ['2030-01-01'], 'end_date': ['2030-01-31']})
+        kpis = json.loads(body, parse_constant=reject_constant)['data']
+        
+        if kpis['overall_roas'] is not None:
+            print(f"❌ ROAS of an empty selection should be null: {kpis['overall_roas']}")
+            return False
+        
+        print("✅ Empty selection KPIs serialize as valid JSON")
+        return True
+        
+    except Exception as e:
+        print(f"❌ API empty selection error: {e}")
+        return False
+
 def run_performance_test():
     """Run basic performance test"""
     print("\n🧪 Running performance test...")
@@ -163,6 +984,28 @@ def main():
         ("Package Imports", test_imports),
         ("Data Processing", test_data_processing),
         ("Dashboard Imports", test_dashboard_import),
+        ("Significance Testing", test_significance_testing),
+        ("Significance Single-Day Campaign", test_significance_single_day_campaign),
+        ("Shapley Attribution", test_shapley_attribution),
+        ("Batch Report", test_batch_report),
+        ("Memory Governor", test_memory_governor),
+        ("Memory Governor Pressure", test_memory_governor_pressure),
+        ("Data Validation", test_data_validation),
+        ("Query Backends", test_query_backends),
+        ("Time Rollups", test_time_rollups),
+        ("Campaign Index", test_campaign_index),
+        ("Daily Facts", test_daily_facts),
+        ("Quantile Sketches", test_quantile_sketches),
+        ("Distinct Sketches", test_distinct_sketches),
+        ("Data Snapshot", test_data_snapshot),
+        ("Table Export", test_table_export),
+        ("Dataset Catalog", test_dataset_catalog),
+        ("Source Watcher", test_source_watcher),
+        ("Report Connectors", test_report_connectors),
+        ("Campaign Dimensions", test_campaign_dimensions),
+        ("Bitmap Index", test_bitmap_index),
+        ("Approximate Query", test_approximate_query),
+        ("API Empty Selection", test_api_empty_selection),
         ("Performance Test", run_performance_test)
     ]
     
@@ -0,0 +1,182 @@
+"""
+Day/week/month/quarter rollups of the business and marketing data
+The daily totals are computed once at load time and rolled up to every grain,
+so switching the dashboard's granularity is a table swap rather than a new
+group-by over the raw marketing rows. Periods are identified by compact
+integer calendar keys that sort chronologically and never merge years:
+
+- day: YYYYMMDD
+- week: ISO year * 100 + ISO week (YYYYWW)
+- month: YYYYMM
+- quarter: YYYYQ
+
+Only additive measures are stored; ratios such as ROAS are derived from the
+period totals (revenue / spend), which stays correct at any grain.
+"""
+
+import numpy as np
+import pandas as pd
+
+from data_processing import BUSINESS_RATIO_METRICS, safe_ratio
+from instrumentation import traced
+from query_backends import RATIO_METRICS, get_backend
+
+GRAINS = ['day', 'week', 'month', 'quarter']
+PERIOD_FREQ = {'day': 'D', 'week': 'W-SUN', 'month': 'M', 'quarter': 'Q'}
+DAY_NAMES = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+
+BUSINESS_MEASURES = ['total revenue', 'gross profit', 'COGS', '# of orders', '# of new orders', 'new customers']
+MARKETING_MEASURES = ['spend', 'attributed revenue', 'clicks', 'impression']
+ROLLUP_SOURCES = {
+    'business': (BUSINESS_MEASURES, BUSINESS_RATIO_METRICS),
+    'marketing': (MARKETING_MEASURES, RATIO_METRICS),
+}
+
+
+def _check_grain(grain):
+    if grain not in GRAINS:
+        raise ValueError(f"Unknown grain '{grain}'; choose from {', '.join(GRAINS)}")
+
+
+def calendar_keys(dates, grain):
+    """int32 calendar key of each date at ``grain``, computed without per-row strings or Periods"""
+    _check_grain(grain)
+    values = pd.Series(dates).to_numpy().astype('datetime64[D]')
+    months = values.astype('datetime64[M]').astype(np.int64)
+    year, month = months // 12 + 1970, months % 12 + 1
+
+    if grain == 'day':
+        day = (values - values.astype('datetime64[M]')).astype(np.int64) + 1
+        keys = year * 10000 + month * 100 + day
+    elif grain == 'week':
+        iso = pd.DatetimeIndex(values).isocalendar()
+        keys = iso['year'].to_numpy(np.int64) * 100 + iso['week'].to_numpy(np.int64)
+    elif grain == 'month':
+        keys = year * 100 + month
+    else:
+        keys = year * 10 + (month - 1) // 3 + 1
+    return keys.astype(np.int32)
+
+
+def period_starts(keys, grain):
+    """First day of each calendar key's period (the inverse of calendar_keys)"""
+    _check_grain(grain)
+    keys = np.asarray(keys, dtype=np.int64)
+    if grain == 'week':
+        return pd.to_datetime((keys * 10 + 1).astype(str), format='%G%V%u')
+    if grain == 'day':
+        parts = {'year': keys // 10000, 'month': keys // 100 % 100, 'day': keys % 100}
+    elif grain == 'month':
+        parts = {'year': keys // 100, 'month': keys % 100, 'day': 1}
+    else:
+        parts = {'year': keys // 10, 'month': (keys % 10 - 1) * 3 + 1, 'day': 1}
+    return pd.DatetimeIndex(pd.to_datetime(pd.DataFrame(parts, index=range(len(keys)))))
+
+
+def day_of_week(dates):
+    """Weekday names as a categorical over int8 codes (Monday = 0) instead of a string per row"""
+    days = pd.Series(dates).to_numpy().astype('datetime64[D]').astype(np.int64)
+    # 1970-01-01 was a Thursday
+    codes = ((days + 3) % 7).astype(np.int8)
+    return pd.Categorical.from_codes(codes, categories=DAY_NAMES, ordered=True)
+
+
+def _roll_up(daily, grain, keys, measures):
+    """Sum a daily table (date[, platform], measures...) into periods of ``grain``"""
+    periods = (
+        daily.assign(period=calendar_keys(daily['date'], grain), days=1)
+        .groupby(['period'] + keys, observed=True)
+        .agg({**{column: 'sum' for column in measures}, 'days': 'sum'})
+        .reset_index()
+    )
+    start = period_starts(periods['period'], grain)
+    periods.insert(1, 'period_start', start)
+    periods.insert(2, 'period_end', pd.PeriodIndex(start, freq=PERIOD_FREQ[grain]).end_time.normalize())
+    return periods
+
+
+def _daily_totals(source, frame, backend=None):
+    measures = ROLLUP_SOURCES[source][0]
+    if source == 'marketing':
+        return get_backend(backend).aggregate(frame, ['date', 'platform'], {column: 'sum' for column in measures})
+    return frame.groupby('date')[measures].sum().reset_index()
+
+
+def rollup_name(source, grain):
+    """Name under which a rollup table is stored, e.g. 'marketing_by_week'"""
+    _check_grain(grain)
+    return f"{source}_by_{grain}"
+
+
+def source_rollups(source, frame, backend=None):
+    """{rollup_name: table} for one source ('business' or 'marketing') at every grain"""
+    daily = _daily_totals(source, frame, backend)
+    keys = ['platform'] if source == 'marketing' else []
+    return {rollup_name(source, grain): _roll_up(daily, grain, keys, ROLLUP_SOURCES[source][0]) for grain in GRAINS}
+
+
+@traced
+def build_rollups(business_df, marketing_df, backend=None):
+    """{rollup_name: table} for both sources at every grain
+
+    Each table has period (calendar key), period_start, period_end, platform
+    for marketing, days (days with data) and the summed measures.
+    """
+    return {
+        **source_rollups('business', business_df, backend),
+        **source_rollups('marketing', marketing_df, backend),
+    }
+
+
+def replace_platform_rollups(rollups, platform, platform_df, backend=None):
+    """Copy of ``rollups`` with one platform's marketing periods recomputed from its rows"""
+    rollups = dict(rollups)
+    for name, table in source_rollups('marketing', platform_df, backend).items():
+        kept = rollups[name][rollups[name]['platform'] != platform]
+        rollups[name] = pd.concat([kept, table], ignore_index=True).sort_values(['period', 'platform'], ignore_index=True)
+    return rollups
+
+
+def add_rollup_ratios(table, source):
+    """Ratio metrics derived from the period totals"""
+    table = table.copy()
+    for name, (numerator, denominator, scale) in ROLLUP_SOURCES[source][1].items():
+        table[name] = safe_ratio(table[numerator], table[denominator], scale)
+    return table
+
+
+def select_rollup(rollups, source, grain, start_date=None, end_date=None, platforms=None, by_platform=True):
+    """One source's rollup at ``grain`` restricted to a date range and platforms, with ratios
+
+    Periods lying entirely inside the range are read from the precomputed
+    table; the (at most two) periods cut by the range edges are re-summed
+    from the daily table. With ``by_platform=False`` marketing periods are
+    summed across the selected platforms.
+    """
+    measures = ROLLUP_SOURCES[source][0]
+    table = rollups[rollup_name(source, grain)]
+    daily = rollups[rollup_name(source, 'day')]
+    keys = ['platform'] if source == 'marketing' else []
+    if keys and platforms is not None:
+        table = table[table['platform'].isin(platforms)]
+        daily = daily[daily['platform'].isin(platforms)]
+
+    if start_date is not None or end_date is not None:
+        start_date = pd.Timestamp(start_date) if start_date is not None else daily['period_start'].min()
+        end_date = pd.Timestamp(end_date) if end_date is not None else daily['period_start'].max()
+        inside = (table['period_start'] >= start_date) & (table['period_end'] <= end_date)
+        overlaps = (table['period_start'] <= end_date) & (table['period_end'] >= start_date)
+        edges = table.loc[overlaps & ~inside, 'period'].unique()
+
+        edge_days = daily[daily['period_start'].between(start_date, end_date)]
+        edge_days = edge_days[np.isin(calendar_keys(edge_days['period_start'], grain), edges)]
+        edge_days = edge_days.drop(columns=['period', 'period_end', 'days']).rename(columns={'period_start': 'date'})
+        table = pd.concat([table[inside], _roll_up(edge_days, grain, keys, measures)], ignore_index=True)
+
+    if keys and not by_platform:
+        # A day counts once however many platforms had data on it
+        table = table.groupby(['period', 'period_start', 'period_end']).agg(
+            {**{column: 'sum' for column in measures}, 'days': 'max'}
+        ).reset_index()
+        keys = []
+    return add_rollup_ratios(table.sort_values(['period'] + keys, ignore_index=True), source)